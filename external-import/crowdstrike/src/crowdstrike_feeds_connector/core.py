@@ -17,6 +17,7 @@ from crowdstrike_feeds_services.utils import (
 )
 from crowdstrike_feeds_services.utils.config_variables import ConfigCrowdstrike
 from crowdstrike_feeds_services.utils.constants import DEFAULT_TLP_MARKING_DEFINITION
+from crowdstrike_feeds_services.utils.report_cache import ReportCache
 from pycti import OpenCTIConnectorHelper  # type: ignore
 
 from .actor.importer import ActorImporter
@@ -177,6 +178,15 @@ class CrowdStrike:
         # Create CrowdStrike client and importers.
         self.connect_cs = BaseCrowdstrikeClient(self.helper)
 
+        # Reports referenced by indicators and rules are cached across runs.
+        report_cache = None
+        if self.config.report_cache_path:
+            report_cache = ReportCache(
+                self.config.report_cache_path,
+                self.config.report_cache_max_size * 1024 * 1024,
+            )
+        report_cache_max_age = self.config.report_cache_max_age * 3600
+
         # Create importers.
         importers: List[BaseImporter] = []
 
@@ -239,6 +249,8 @@ class CrowdStrike:
                 indicator_high_score=indicator_high_score,
                 indicator_high_score_labels=set(indicator_high_score_labels),
                 indicator_unwanted_labels=set(indicator_unwanted_labels),
+                report_cache=report_cache,
+                report_cache_max_age=report_cache_max_age,
             )
 
             indicator_importer = IndicatorImporter(indicator_importer_config)
@@ -251,6 +263,8 @@ class CrowdStrike:
                 tlp_marking,
                 report_status,
                 report_type,
+                report_cache,
+                report_cache_max_age,
             )
 
             importers.append(yara_master_importer)
@@ -262,6 +276,8 @@ class CrowdStrike:
                 tlp_marking,
                 report_status,
                 report_type,
+                report_cache,
+                report_cache_max_age,
             )
 
             importers.append(snort_master_importer)
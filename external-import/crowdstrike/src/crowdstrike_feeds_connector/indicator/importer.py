@@ -8,6 +8,7 @@ from crowdstrike_feeds_services.utils import (
     datetime_to_timestamp,
     timestamp_to_datetime,
 )
+from crowdstrike_feeds_services.utils.report_cache import ReportCache
 from crowdstrike_feeds_services.utils.report_fetcher import FetchedReport, ReportFetcher
 from pycti.connector.opencti_connector_helper import (  # type: ignore  # noqa: E501
     OpenCTIConnectorHelper,
@@ -38,6 +39,8 @@ class IndicatorImporterConfig(NamedTuple):
     indicator_high_score: int
     indicator_high_score_labels: Set[str]
     indicator_unwanted_labels: Set[str]
+    report_cache: Optional[ReportCache] = None
+    report_cache_max_age: int = 0
 
 
 class IndicatorImporter(BaseImporter):
@@ -76,7 +79,9 @@ class IndicatorImporter(BaseImporter):
             msg = "'create_observables' and 'create_indicators' false at the same time"
             raise ValueError(msg)
 
-        self.report_fetcher = ReportFetcher(config.helper)
+        self.report_fetcher = ReportFetcher(
+            config.helper, config.report_cache, config.report_cache_max_age
+        )
 
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Run importer."""
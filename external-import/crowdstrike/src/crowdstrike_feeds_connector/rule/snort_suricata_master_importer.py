@@ -12,6 +12,7 @@ from crowdstrike_feeds_services.utils import (
     datetime_to_timestamp,
     timestamp_to_datetime,
 )
+from crowdstrike_feeds_services.utils.report_cache import ReportCache
 from crowdstrike_feeds_services.utils.report_fetcher import FetchedReport, ReportFetcher
 from crowdstrike_feeds_services.utils.snort_parser import SnortParser, SnortRule
 from pycti.connector.opencti_connector_helper import (  # type: ignore  # noqa: E501
@@ -51,6 +52,8 @@ class SnortMasterImporter(BaseImporter):
         tlp_marking: MarkingDefinition,
         report_status: int,
         report_type: str,
+        report_cache: Optional[ReportCache] = None,
+        report_cache_max_age: int = 0,
     ) -> None:
         """Initialize CrowdStrike Snort master importer."""
         super().__init__(helper, author, tlp_marking)
@@ -59,7 +62,7 @@ class SnortMasterImporter(BaseImporter):
         self.report_status = report_status
         self.report_type = report_type
 
-        self.report_fetcher = ReportFetcher(helper)
+        self.report_fetcher = ReportFetcher(helper, report_cache, report_cache_max_age)
 
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Run importer."""
@@ -5,6 +5,7 @@ import base64
 import calendar
 import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from io import BytesIO
 from typing import (
@@ -170,45 +171,56 @@ def paginate(func):
         _offset = 0
         _total = None
 
-        while _next_batch(_limit, _offset, _total):
-            response = func(*args, limit=_limit, offset=_offset, **kwargs)
+        # The next page is requested while the current one is processed by the caller
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_response = executor.submit(
+                func, *args, limit=_limit, offset=_offset, **kwargs
+            )
+            while next_response is not None:
+                response = next_response.result()
+                next_response = None
+
+                errors = response["errors"]
+                if errors:
+                    logger.error("Query completed with errors")
+                    for error in errors:
+                        logger.error("Error: %s (code: %s)", error.message, error.code)
 
-            errors = response["errors"]
-            if errors:
-                logger.error("Query completed with errors")
-                for error in errors:
-                    logger.error("Error: %s (code: %s)", error.message, error.code)
+                meta = response["meta"]
+                if meta["pagination"] is not None:
+                    pagination = meta["pagination"]
 
-            meta = response["meta"]
-            if meta["pagination"] is not None:
-                pagination = meta["pagination"]
+                    _meta_limit = pagination["limit"]
+                    _meta_offset = pagination["offset"]
+                    _meta_total = pagination["total"]
 
-                _meta_limit = pagination["limit"]
-                _meta_offset = pagination["offset"]
-                _meta_total = pagination["total"]
+                    logger.info(
+                        "Query pagination info limit: %s, offset: %s, total: %s",
+                        _meta_limit,
+                        _meta_offset,
+                        _meta_total,
+                    )
 
-                logger.info(
-                    "Query pagination info limit: %s, offset: %s, total: %s",
-                    _meta_limit,
-                    _meta_offset,
-                    _meta_total,
-                )
+                    _offset = _offset + _limit
+                    _total = _meta_total
 
-                _offset = _offset + _limit
-                _total = _meta_total
+                if _next_batch(_limit, _offset, _total):
+                    next_response = executor.submit(
+                        func, *args, limit=_limit, offset=_offset, **kwargs
+                    )
 
-            resources = response["resources"]
+                resources = response["resources"]
 
-            if resources is not None:
-                resources_count = len(resources)
+                if resources is not None:
+                    resources_count = len(resources)
 
-                logger.info("Query fetched %s resources", resources_count)
+                    logger.info("Query fetched %s resources", resources_count)
 
-                total_count += resources_count
+                    total_count += resources_count
 
-                yield resources
-            else:
-                total_count = 0
+                    yield resources
+                else:
+                    total_count = 0
 
         logger.info("Fetched %s resources in total", total_count)
 
@@ -202,6 +202,29 @@ class ConfigCrowdstrike:
         if self.indicator_unwanted_labels is not None:
             self.indicator_unwanted_labels = self.indicator_unwanted_labels.lower()
 
+        self.report_cache_path: str = get_config_variable(
+            "CROWDSTRIKE_REPORT_CACHE_PATH",
+            ["crowdstrike", "report_cache_path"],
+            self.load,
+            default=str(Path(__file__).parents[2].joinpath("report_cache.db")),
+        )
+
+        self.report_cache_max_size: int = get_config_variable(
+            "CROWDSTRIKE_REPORT_CACHE_MAX_SIZE",
+            ["crowdstrike", "report_cache_max_size"],
+            self.load,
+            isNumber=True,
+            default=512,
+        )
+
+        self.report_cache_max_age: int = get_config_variable(
+            "CROWDSTRIKE_REPORT_CACHE_MAX_AGE",
+            ["crowdstrike", "report_cache_max_age"],
+            self.load,
+            isNumber=True,
+            default=24,
+        )
+
         self.interval_sec: int = get_config_variable(
             "CROWDSTRIKE_INTERVAL_SEC",
             ["crowdstrike", "interval_sec"],
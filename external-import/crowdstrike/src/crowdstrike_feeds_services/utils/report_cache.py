@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""OpenCTI CrowdStrike report cache module."""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CachedReport(NamedTuple):
+    """Cached report entry."""
+
+    last_modified: Optional[int]
+    report: Optional[dict]
+    files: List[Any]
+    checked_at: float
+    pdf_failed: bool
+
+
+class ReportCache:
+    """
+    Persistent cache of the fetched reports and their PDF, shared across runs.
+
+    Entries are keyed by report code and stored with the last modified date of the
+    report, so the PDF is only downloaded again when the report was modified, or when
+    its download failed.
+    The least recently used entries are evicted once the cache exceeds its size.
+    """
+
+    def __init__(self, path: str, max_size: int) -> None:
+        """Initialize CrowdStrike report cache."""
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reports (
+                code TEXT PRIMARY KEY,
+                last_modified INTEGER,
+                report TEXT,
+                files TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                checked_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                pdf_failed INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = [
+            column[1]
+            for column in self._connection.execute("PRAGMA table_info(reports)")
+        ]
+        if "pdf_failed" not in columns:
+            # Reports cached without a PDF by previous versions are downloaded again once
+            self._connection.execute(
+                "ALTER TABLE reports ADD COLUMN pdf_failed INTEGER NOT NULL DEFAULT 0"
+            )
+            self._connection.execute(
+                "UPDATE reports SET pdf_failed = 1 "
+                "WHERE report IS NOT NULL AND files = '[]'"
+            )
+        self._connection.commit()
+
+    def get(self, code: str) -> Optional[CachedReport]:
+        """Get the cached report of a code, None if not cached."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT last_modified, report, files, checked_at, pdf_failed "
+                "FROM reports "
+                "WHERE code = ?",
+                (code,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE reports SET accessed_at = ? WHERE code = ?",
+                (time.time(), code),
+            )
+            self._connection.commit()
+
+        last_modified, report, files, checked_at, pdf_failed = row
+        return CachedReport(
+            last_modified=last_modified,
+            report=json.loads(report) if report is not None else None,
+            files=json.loads(files),
+            checked_at=checked_at,
+            pdf_failed=bool(pdf_failed),
+        )
+
+    def put(
+        self,
+        code: str,
+        last_modified: Optional[int],
+        report: Optional[dict],
+        files: List[Any],
+        pdf_failed: bool = False,
+    ) -> None:
+        """
+        Store a fetched report, or a report not found if report is None.
+
+        pdf_failed flags a report whose PDF could not be downloaded, as opposed to
+        a report which has no PDF.
+        """
+        report_data = json.dumps(report) if report is not None else None
+        files_data = json.dumps(files)
+        size = len(files_data) + (len(report_data) if report_data else 0)
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    code,
+                    last_modified,
+                    report_data,
+                    files_data,
+                    size,
+                    now,
+                    now,
+                    int(pdf_failed),
+                ),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM reports"
+        ).fetchone()[0]
+        if total_size <= self.max_size:
+            return
+
+        evicted = []
+        for code, size in self._connection.execute(
+            "SELECT code, size FROM reports ORDER BY accessed_at"
+        ).fetchall():
+            if total_size <= self.max_size:
+                break
+            evicted.append((code,))
+            total_size -= size
+
+        self._connection.executemany("DELETE FROM reports WHERE code = ?", evicted)
+        logger.info("Evicted %s reports from the report cache", len(evicted))
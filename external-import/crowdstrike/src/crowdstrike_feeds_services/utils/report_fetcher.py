@@ -2,12 +2,14 @@
 """OpenCTI CrowdStrike report fetcher module."""
 
 import logging
-from typing import Any, Dict, List, Mapping, Optional, Union
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
 from crowdstrike_feeds_services.client.reports import ReportsAPI
 from pydantic.v1 import BaseModel
 
 from . import create_file_from_download
+from .report_cache import ReportCache
 
 logger = logging.getLogger(__name__)
 
@@ -24,13 +26,23 @@ class ReportFetcher:
 
     _NOT_FOUND = object()
 
-    def __init__(self, helper) -> None:
+    def __init__(
+        self,
+        helper,
+        report_cache: Optional[ReportCache] = None,
+        report_cache_max_age: int = 0,
+    ) -> None:
         """Initialize CrowdStrike report fetcher."""
         self.helper = helper
         self.reports_api_cs = ReportsAPI(helper)
 
         self.fetched_report_cache: Dict[str, Union[FetchedReport, object]] = {}
 
+        # Reports cached across runs are trusted for report_cache_max_age seconds,
+        # then checked again against the last modified date of the report.
+        self.report_cache = report_cache
+        self.report_cache_max_age = report_cache_max_age
+
     def _info(self, msg: str, *args: Any) -> None:
         fmt_msg = msg.format(*args)
         self.helper.log_info(fmt_msg)
@@ -75,22 +87,71 @@ class ReportFetcher:
             self._info("Returning cached report for code: {0}", code)
             return fetched_report
 
+        cached_report = None
+        if self.report_cache is not None:
+            cached_report = self.report_cache.get(code)
+
+        if (
+            cached_report is not None
+            and not cached_report.pdf_failed
+            and time.time() - cached_report.checked_at < self.report_cache_max_age
+        ):
+            self._info("Returning persisted report for code: {0}", code)
+            if cached_report.report is None:
+                self._put_cache(code, self._NOT_FOUND)
+                return None
+            fetched_report = FetchedReport(
+                report=cached_report.report, files=cached_report.files
+            )
+            self._put_cache(code, fetched_report)
+            return fetched_report
+
         report = self._fetch_report(code)
         if report is None:
             self._put_cache(code, self._NOT_FOUND)
+            self._persist(code, None, [])
             return None
 
-        files = []
-        file = self._get_report_pdf(report["id"], report["name"])
-        if file is not None:
-            files.append(file)
+        last_modified = report.get("last_modified_date")
+        if (
+            cached_report is not None
+            and cached_report.report is not None
+            and last_modified is not None
+            and cached_report.last_modified == last_modified
+            and not cached_report.pdf_failed
+        ):
+            self._info("Report {0} not modified, reusing persisted PDF", code)
+            files = cached_report.files
+            pdf_failed = False
+        else:
+            files = []
+            file, pdf_failed = self._get_report_pdf(report["id"], report["name"])
+            if file is not None:
+                files.append(file)
 
         fetched_report = FetchedReport(report=report, files=files)
 
         self._put_cache(code, fetched_report)
+        # A report whose PDF download failed is fetched again on the next run
+        self._persist(code, report, files, pdf_failed)
 
         return fetched_report
 
+    def _persist(
+        self,
+        code: str,
+        report: Optional[dict],
+        files: List[Any],
+        pdf_failed: bool = False,
+    ) -> None:
+        if self.report_cache is None:
+            return
+        try:
+            last_modified = report.get("last_modified_date") if report else None
+            self.report_cache.put(code, last_modified, report, files, pdf_failed)
+        except Exception as e:
+            self._error("Unable to persist report {0}: {1}", code, e)
+
     def _fetch_report(self, code: str) -> Optional:
         self._info("Fetching report by code {0}...", code)
 
@@ -121,13 +182,18 @@ class ReportFetcher:
 
     def _get_report_pdf(
         self, report_id: int, report_name: str
-    ) -> Optional[Mapping[str, str]]:
+    ) -> Tuple[Optional[Mapping[str, str]], bool]:
+        """Get the PDF file of a report, along with whether its download failed."""
         self._info("Fetching report PDF by id {0}...", report_id)
 
         download = self.reports_api_cs.get_report_pdf(str(report_id))
 
         if type(download) is dict:
-            self._info("No report PDF for id {0}", report_id)
-            return None
+            # The API answers not found for a report without PDF
+            if download.get("status_code") == 404:
+                self._info("No report PDF for id {0}", report_id)
+                return None, False
+            self._error("Unable to download report PDF for id {0}", report_id)
+            return None, True
         else:
-            return create_file_from_download(download, report_name)
+            return create_file_from_download(download, report_name), False
@@ -1,37 +1,119 @@
 import datetime
 import json
 from abc import ABC, abstractmethod
-from typing import Generator
+from contextlib import AbstractContextManager
+from typing import Callable, Generator
 
 from base_connector import BaseClient
 from google.auth.credentials import TokenState
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from imap_tools.mailbox import MailBox
+from imap_tools.mailbox import BaseMailBox, MailBox
 from imap_tools.message import MailMessage
-from imap_tools.query import AND
-from pydantic import PrivateAttr
+from imap_tools.query import AND, UidRange
+from pydantic import BaseModel, Field, PrivateAttr
+
+
+class MailboxCursor(BaseModel):
+    """
+    Position of the last email ingested in the mailbox.
+
+    IMAP UIDs are strictly ascending in a folder as long as its UIDVALIDITY does not change,
+    so the emails received since the previous run are the ones with a UID above `last_uid`.
+    """
+
+    uid_validity: int | None = Field(default=None)
+    last_uid: int = Field(default=0)
 
 
 class BaseConnectorClient(BaseClient, ABC):
     """
     Base class for connector clients. This class defines the interface for fetching email messages.
-    Subclasses should implement the `fetch_from_relative_import_start_date` method.
+    Subclasses should implement the `login` method.
     """
 
+    mailbox: str
+    fetch_bulk_size: int = Field(default=50)
+
     @abstractmethod
-    def fetch_from_relative_import_start_date(
-        self, since_date: datetime.date
+    def login(self) -> AbstractContextManager[BaseMailBox]:
+        """
+        Abstract method to log in the mailbox, with the configured folder selected.
+
+        Returns:
+            AbstractContextManager[BaseMailBox]: The logged in mailbox, logged out on exit.
+        """
+
+    def _fetch_bodies(
+        self, mailbox: BaseMailBox, uids: list[str]
+    ) -> Generator[MailMessage, None, None]:
+        for i in range(0, len(uids), self.fetch_bulk_size):
+            yield from mailbox.fetch(
+                criteria=AND(uid=uids[i : i + self.fetch_bulk_size]),
+                mark_seen=False,
+                bulk=True,
+            )
+
+    def fetch_new_messages(
+        self,
+        since: datetime.datetime,
+        cursor: MailboxCursor,
+        is_wanted: Callable[[MailMessage], bool],
     ) -> Generator[MailMessage, None, None]:
         """
-        Abstract method to fetch email messages since a given date.
+        Retrieve the email messages received since the cursor position.
+
+        The headers of the new emails are fetched first, so only the bodies (and attachments)
+        of the emails accepted by `is_wanted` are downloaded, in bulk.
+        If the cursor does not match the folder UIDVALIDITY (first run or UIDs reset by the server),
+        the emails are selected by date instead.
+        The cursor is moved to the last email of the folder once all the messages are yielded.
+
+        To understand the AND argument of the fetch method, refer to the imap-tools documentation:
+        https://pypi.org/project/imap-tools/#search-criteria
 
         Args:
-            since_date (datetime.date): The date from which to begin retrieving emails.
+            since (datetime.datetime): The date from which to begin retrieving emails when the cursor is not valid.
+            cursor (MailboxCursor): The position of the last email ingested, updated in place.
+            is_wanted (Callable[[MailMessage], bool]): Filter of the emails, called with their headers only.
 
         Yields:
             MailMessage: A parsed email message object representing one received email.
         """
+        with self.login() as mailbox:
+            status = mailbox.folder.status(self.mailbox, ["UIDVALIDITY", "UIDNEXT"])
+            uid_validity = status["UIDVALIDITY"]
+            resume = cursor.uid_validity == uid_validity
+            if resume:
+                criteria = AND(uid=UidRange(str(cursor.last_uid + 1), "*"))
+                last_uid = cursor.last_uid
+            else:
+                criteria = AND(date_gte=since.date())
+                # Even if no email is selected by date, the next run must resume from the current end of the folder
+                last_uid = status["UIDNEXT"] - 1
+
+            uids = []
+            for message in mailbox.fetch(
+                criteria=criteria,
+                mark_seen=False,
+                headers_only=True,
+                bulk=self.fetch_bulk_size,
+            ):
+                uid = int(message.uid or 0)
+                # A UID range up to * always includes the last email, even when already ingested
+                if resume and uid <= cursor.last_uid:
+                    continue
+                last_uid = max(last_uid, uid)
+                # As the IMAP library filters by date, we need to add this to filter also by time
+                if not resume and message.date <= since:
+                    continue
+                if is_wanted(message):
+                    uids.append(str(uid))
+
+            yield from self._fetch_bodies(mailbox, uids)
+
+        cursor.uid_validity = uid_validity
+        cursor.last_uid = last_uid
 
 
 class ConnectorClient(BaseConnectorClient):
@@ -39,30 +121,14 @@ class ConnectorClient(BaseConnectorClient):
     port: int
     username: str
     password: str
-    mailbox: str
-
-    def fetch_from_relative_import_start_date(
-        self, since_date: datetime.date
-    ) -> Generator[MailMessage, None, None]:
-        """
-        Retrieve email messages received since a given date.
-
-        To understand the AND argument of the fetch method, refer to the imap-tools documentation:
-        https://pypi.org/project/imap-tools/#search-criteria
-
-        Args:
-            since_date (datetime.date): The date from which to begin retrieving emails.
-                Only messages received on or after this date will be yielded.
 
-        Yields:
-            MailMessage: A parsed email message object representing one received email.
-        """
-        with MailBox(host=self.host, port=self.port).login(  # type: ignore
+    def login(self) -> AbstractContextManager[BaseMailBox]:
+        """Implement login method for username and password authentication."""
+        return MailBox(host=self.host, port=self.port).login(  # type: ignore[no-untyped-call]
             username=self.username,
             password=self.password,
             initial_folder=self.mailbox,
-        ) as mailbox:
-            yield from mailbox.fetch(criteria=AND(date_gte=since_date))
+        )
 
 
 class GoogleOAuthClient(BaseConnectorClient):
@@ -70,7 +136,6 @@ class GoogleOAuthClient(BaseConnectorClient):
     port: int
     username: str
     token_json: str
-    mailbox: str
 
     _credentials: Credentials | None = PrivateAttr(default=None)
 
@@ -84,18 +149,15 @@ class GoogleOAuthClient(BaseConnectorClient):
         if self._credentials.token_state != TokenState.FRESH:
             self._credentials.refresh(Request())  # type: ignore[no-untyped-call]
 
-    def fetch_from_relative_import_start_date(
-        self, since_date: datetime.date
-    ) -> Generator[MailMessage, None, None]:
-        """Implement fetch_from_relative_import_start_date method for Google OAuth2 authentication."""
+    def login(self) -> AbstractContextManager[BaseMailBox]:
+        """Implement login method for Google OAuth2 authentication."""
 
         # always try to refresh the credentials before using them
         self._refresh_credentials()
 
-        with MailBox(self.host, self.port).xoauth2(  # type: ignore[no-untyped-call]
+        return MailBox(self.host, self.port).xoauth2(  # type: ignore[no-untyped-call]
             username=self.username,
             # self._credentials should exist as refresh_credentials is called before
             access_token=str(self._credentials.token),  # type: ignore[union-attr]
             initial_folder=self.mailbox,
-        ) as mailbox:
-            yield from mailbox.fetch(criteria=AND(date_gte=since_date))
+        )
@@ -36,6 +36,16 @@ class _EmailIntelConfig(BaseModel):
     attachments_mime_types: ListFromString = Field(
         default=["application/pdf", "text/csv", "text/plain"]
     )
+    max_email_size: int = Field(
+        default=0,
+        description="Maximum size of the emails to import, in bytes (0 for no limit)",
+    )
+    excluded_senders: ListFromString = Field(
+        default=[], description="Email addresses of the senders to ignore"
+    )
+    fetch_bulk_size: int = Field(
+        default=50, description="Number of emails downloaded per IMAP request"
+    )
 
     @model_validator(mode="after")
     def check_auth(self: "_EmailIntelConfig") -> "_EmailIntelConfig":
@@ -2,9 +2,19 @@ import datetime
 
 import stix2
 from base_connector.connector import BaseConnector
-from email_intel_imap.client import BaseConnectorClient
+from email_intel_imap.client import BaseConnectorClient, MailboxCursor
 from email_intel_imap.config import ConnectorSettings
 from email_intel_imap.converter import ConnectorConverter
+from imap_tools.message import MailMessage
+
+# Number of Message-IDs kept in the state to skip the emails already ingested
+SEEN_MESSAGE_IDS_LIMIT = 5000
+
+
+def get_message_id(email: MailMessage) -> str | None:
+    if message_ids := email.headers.get("message-id"):
+        return message_ids[0].strip()
+    return None
 
 
 class Connector(BaseConnector):
@@ -12,6 +22,8 @@ class Connector(BaseConnector):
     converter: ConnectorConverter
     client: BaseConnectorClient
     start_time = datetime.datetime.now(tz=datetime.UTC)
+    cursor = MailboxCursor()
+    seen_message_ids: dict[str, None] = {}
 
     def get_last_email_ingestion(self) -> datetime.datetime | None:
         if last_email_ingestion_str := self.state.get("last_email_ingestion"):
@@ -25,18 +37,42 @@ class Connector(BaseConnector):
         self.helper.connector_logger.info("Connector last email ingestion until: Never")
         return None
 
+    def is_wanted(self, email: MailMessage) -> bool:
+        """Filter an email on its headers, before its body and attachments are downloaded."""
+        max_email_size = self.config.email_intel_imap.max_email_size
+        if max_email_size and email.size_rfc822 > max_email_size:
+            self.helper.connector_logger.info(
+                f"Email '{email.subject}' exceeds the maximum email size, skipping..."
+            )
+            return False
+        excluded_senders = {
+            sender.lower()
+            for sender in self.config.email_intel_imap.excluded_senders
+            if sender
+        }
+        if email.from_.lower() in excluded_senders:
+            return False
+        if message_id := get_message_id(email):
+            if message_id in self.seen_message_ids:
+                return False
+            self.seen_message_ids[message_id] = None
+        return True
+
     def process_data(self) -> list[stix2.Report]:
         since_date = self.get_last_email_ingestion() or (
             datetime.datetime.now(tz=datetime.UTC)
             - self.config.email_intel_imap.relative_import_start_date
         )
+        self.cursor = MailboxCursor(
+            uid_validity=self.state.get("uid_validity"),
+            last_uid=self.state.get("last_uid") or 0,
+        )
+        self.seen_message_ids = dict.fromkeys(self.state.get("seen_message_ids") or [])
         return [
             stix_object
-            for email in self.client.fetch_from_relative_import_start_date(
-                since_date.date()
+            for email in self.client.fetch_new_messages(
+                since=since_date, cursor=self.cursor, is_wanted=self.is_wanted
             )
-            # As the IMAP library filters by date, we need to add this to filter also by time
-            if email.date > since_date
             for stix_object in self.converter.to_stix_objects(email)
         ]
 
@@ -47,5 +83,8 @@ class Connector(BaseConnector):
     def finalize_work(self, work_id: str, message: str) -> None:
         super().finalize_work(work_id=work_id, message=message)
         self.update_state(
-            last_email_ingestion=self.start_time.isoformat(timespec="seconds")
+            last_email_ingestion=self.start_time.isoformat(timespec="seconds"),
+            uid_validity=self.cursor.uid_validity,
+            last_uid=self.cursor.last_uid,
+            seen_message_ids=list(self.seen_message_ids)[-SEEN_MESSAGE_IDS_LIMIT:],
         )
@@ -29,6 +29,7 @@ def client_factory(config: ConnectorSettings) -> BaseConnectorClient:
             username=config.email_intel_imap.username,
             token_json=config.email_intel_imap.google_token_json,
             mailbox=config.email_intel_imap.mailbox,
+            fetch_bulk_size=config.email_intel_imap.fetch_bulk_size,
         )
 
     # elif TODO: Add other authentication methods here
@@ -40,6 +41,7 @@ def client_factory(config: ConnectorSettings) -> BaseConnectorClient:
         username=config.email_intel_imap.username,
         password=config.email_intel_imap.password,
         mailbox=config.email_intel_imap.mailbox,
+        fetch_bulk_size=config.email_intel_imap.fetch_bulk_size,
     )
 
 
@@ -1,6 +1,6 @@
 import os
 from copy import deepcopy
-from typing import Any
+from typing import Any, Callable
 from unittest.mock import MagicMock, Mock
 
 import pytest
@@ -69,9 +69,44 @@ def fixture_mocked_mail_box(mocker: MockerFixture) -> MagicMock:
     mocked_mail_box.return_value.login.return_value.__enter__.return_value = (
         mocked_mail_box_instance
     )
+    mocked_mail_box_instance.folder.status.return_value = {
+        "UIDVALIDITY": 1,
+        "UIDNEXT": 1,
+    }
     return mocked_mail_box_instance
 
 
+@pytest.fixture(name="mailbox_emails")
+def fixture_mailbox_emails(mocked_mail_box: MagicMock) -> list[Mock]:
+    """Emails of the mocked mailbox, the bodies are fetched by their UIDs."""
+    emails: list[Mock] = []
+
+    def fetch(criteria: Any, headers_only: bool = False, **_: Any) -> list[Mock]:
+        if headers_only:
+            return emails
+        # Criteria of the bodies fetch is like "(UID 1,2,3)"
+        uids = str(criteria).strip("()").split(" ")[1].split(",")
+        return [email for email in emails if email.uid in uids]
+
+    mocked_mail_box.fetch.side_effect = fetch
+    return emails
+
+
+@pytest.fixture(name="make_email")
+def fixture_make_email() -> Callable[..., Mock]:
+    def make_email(uid: int, **kwargs: Any) -> Mock:
+        email = Mock(
+            uid=str(uid),
+            headers={"message-id": (f"<{uid}@test.com>",)},
+            size_rfc822=1000,
+            from_=f"sender{uid}@test.com",
+        )
+        email.configure_mock(**kwargs)
+        return email
+
+    return make_email
+
+
 @pytest.fixture(name="test_config")
 def fixture_test_config(
     mock_email_intel_imap_config: None,
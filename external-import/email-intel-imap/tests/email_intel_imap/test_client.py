@@ -1,8 +1,9 @@
 import datetime
+from typing import Callable
 from unittest.mock import Mock
 
 import pytest
-from email_intel_imap.client import ConnectorClient
+from email_intel_imap.client import ConnectorClient, MailboxCursor
 
 
 @pytest.fixture(name="client")
@@ -13,16 +14,108 @@ def fixture_client() -> ConnectorClient:
         username="username",
         password="password",
         mailbox="mailbox",
+        fetch_bulk_size=2,
     )
 
 
-def test_client_fetch_from_relative_import_start_date(
-    client: ConnectorClient, mocked_mail_box: Mock
+def test_client_fetch_new_messages_since_date(
+    client: ConnectorClient,
+    mocked_mail_box: Mock,
+    mailbox_emails: list[Mock],
+    make_email: Callable[..., Mock],
 ) -> None:
-    since_date = datetime.date(2023, 10, 1)
+    since = datetime.datetime(2023, 10, 1, 12, tzinfo=datetime.UTC)
+    mailbox_emails.extend(
+        [
+            make_email(3, date=since - datetime.timedelta(hours=1)),
+            make_email(4, date=since + datetime.timedelta(hours=1)),
+        ]
+    )
+    cursor = MailboxCursor()
 
-    result = client.fetch_from_relative_import_start_date(since_date=since_date)
+    result = client.fetch_new_messages(
+        since=since, cursor=cursor, is_wanted=lambda _: True
+    )
     mocked_mail_box.fetch.assert_not_called()  # Make sure we have a Generator
-    list(result)  # Consume the generator
+    assert [email.uid for email in result] == ["4"]
+
+    headers_call, bodies_call = mocked_mail_box.fetch.call_args_list
+    assert headers_call.kwargs == {
+        "criteria": "(SINCE 1-Oct-2023)",
+        "mark_seen": False,
+        "headers_only": True,
+        "bulk": 2,
+    }
+    assert bodies_call.kwargs == {
+        "criteria": "(UID 4)",
+        "mark_seen": False,
+        "bulk": True,
+    }
+    assert cursor == MailboxCursor(uid_validity=1, last_uid=4)
+
+
+def test_client_fetch_new_messages_since_last_uid(
+    client: ConnectorClient,
+    mocked_mail_box: Mock,
+    mailbox_emails: list[Mock],
+    make_email: Callable[..., Mock],
+) -> None:
+    since = datetime.datetime(2023, 10, 1, 12, tzinfo=datetime.UTC)
+    # The UID range always includes the last email of the folder
+    mailbox_emails.extend([make_email(uid) for uid in (5, 8, 9, 10)])
+    cursor = MailboxCursor(uid_validity=1, last_uid=5)
+
+    result = client.fetch_new_messages(
+        since=since, cursor=cursor, is_wanted=lambda email: email.uid != "9"
+    )
+    assert [email.uid for email in result] == ["8", "10"]
+
+    headers_call, *bodies_calls = mocked_mail_box.fetch.call_args_list
+    assert headers_call.kwargs["criteria"] == "(UID 6:*)"
+    assert [call.kwargs["criteria"] for call in bodies_calls] == ["(UID 8,10)"]
+    assert cursor == MailboxCursor(uid_validity=1, last_uid=10)
+
+
+def test_client_fetch_new_messages_uid_validity_changed(
+    client: ConnectorClient,
+    mocked_mail_box: Mock,
+    mailbox_emails: list[Mock],
+    make_email: Callable[..., Mock],
+) -> None:
+    since = datetime.datetime(2023, 10, 1, 12, tzinfo=datetime.UTC)
+    now = since + datetime.timedelta(days=1)
+    mailbox_emails.extend([make_email(uid, date=now) for uid in (1, 2, 3)])
+    cursor = MailboxCursor(uid_validity=2, last_uid=50)
+
+    result = client.fetch_new_messages(
+        since=since, cursor=cursor, is_wanted=lambda _: True
+    )
+    assert [email.uid for email in result] == ["1", "2", "3"]
+
+    headers_call, *bodies_calls = mocked_mail_box.fetch.call_args_list
+    assert headers_call.kwargs["criteria"] == "(SINCE 1-Oct-2023)"
+    # Bodies are fetched by bulks of fetch_bulk_size emails
+    assert [call.kwargs["criteria"] for call in bodies_calls] == [
+        "(UID 1,2)",
+        "(UID 3)",
+    ]
+    assert cursor == MailboxCursor(uid_validity=1, last_uid=3)
+
+
+def test_client_fetch_new_messages_empty_first_window(
+    client: ConnectorClient,
+    mocked_mail_box: Mock,
+    mailbox_emails: list[Mock],
+) -> None:
+    since = datetime.datetime(2023, 10, 1, 12, tzinfo=datetime.UTC)
+    # Older emails are in the folder but none was received since the date
+    mocked_mail_box.folder.status.return_value = {"UIDVALIDITY": 1, "UIDNEXT": 42}
+    cursor = MailboxCursor()
+
+    result = client.fetch_new_messages(
+        since=since, cursor=cursor, is_wanted=lambda _: True
+    )
+    assert list(result) == []
 
-    mocked_mail_box.fetch.assert_called_once_with(criteria="(SINCE 1-Oct-2023)")
+    # The next run resumes from the end of the folder, not from its first email
+    assert cursor == MailboxCursor(uid_validity=1, last_uid=41)
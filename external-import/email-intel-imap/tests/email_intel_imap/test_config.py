@@ -30,3 +30,6 @@ def test_config() -> None:
     assert config["email_intel_imap"]["attachments_mime_types"] == (
         ["application/pdf", "text/csv", "text/plain"]
     )
+    assert config["email_intel_imap"]["max_email_size"] == 0
+    assert config["email_intel_imap"]["excluded_senders"] == []
+    assert config["email_intel_imap"]["fetch_bulk_size"] == 50
@@ -1,4 +1,5 @@
 import datetime
+from typing import Callable
 from unittest.mock import Mock
 
 import freezegun
@@ -40,16 +41,20 @@ def test_connector_process_data_empty(connector: Connector) -> None:
 
 
 @freezegun.freeze_time("2025-05-21T14:00:00Z")
-def test_connector_process_data(connector: Connector, mocked_mail_box: Mock) -> None:
+def test_connector_process_data(
+    connector: Connector, mailbox_emails: list[Mock], make_email: Callable[..., Mock]
+) -> None:
     now = datetime.datetime.now(tz=datetime.UTC)
-    email1 = Mock(
+    email1 = make_email(
+        1,
         subject="email 1",
         date=now,
         html="email body 1",
         attachments=[],
         from_="em1@il.com",
     )
-    email2 = Mock(
+    email2 = make_email(
+        2,
         subject="email 2",
         date=now,
         html="email body 2",
@@ -57,7 +62,7 @@ def test_connector_process_data(connector: Connector, mocked_mail_box: Mock) ->
         from_="em2@il.com",
     )
 
-    mocked_mail_box.fetch.return_value = [email1, email2]
+    mailbox_emails.extend([email1, email2])
     stix_objects = connector.process_data()
 
     assert len(stix_objects) == 2
@@ -95,20 +100,22 @@ def test_connector_process_data(connector: Connector, mocked_mail_box: Mock) ->
 
 @freezegun.freeze_time("2025-04-22T14:00:00Z")
 def test_connector_process_data_since_relative_from_date(
-    connector: Connector, mocked_mail_box: Mock
+    connector: Connector, mailbox_emails: list[Mock], make_email: Callable[..., Mock]
 ) -> None:
     two_months_ago = datetime.datetime.fromisoformat("2025-02-22T12:00:00Z")
     today = datetime.datetime.fromisoformat("2025-04-22T12:00:00Z")
 
-    email1 = Mock(subject="1", html="body 1", attachments=[], date=two_months_ago)
-    email2 = Mock(subject="2", html="body 2", attachments=[], date=today)
+    email1 = make_email(
+        1, subject="1", html="body 1", attachments=[], date=two_months_ago
+    )
+    email2 = make_email(2, subject="2", html="body 2", attachments=[], date=today)
 
     assert (
         connector.config.email_intel_imap.relative_import_start_date
         == datetime.timedelta(days=30)
     )
 
-    mocked_mail_box.fetch.return_value = [email1, email2]
+    mailbox_emails.extend([email1, email2])
     stix_objects = connector.process_data()
     assert len(stix_objects) == 1
     assert stix_objects[0].name == "2"
@@ -116,15 +123,19 @@ def test_connector_process_data_since_relative_from_date(
 
 @freezegun.freeze_time("2025-04-22T14:00:00Z")
 def test_connector_process_data_since_last_email_ingestion(
-    connector: Connector, mocked_mail_box: Mock
+    connector: Connector, mailbox_emails: list[Mock], make_email: Callable[..., Mock]
 ) -> None:
     two_months_ago = datetime.datetime.fromisoformat("2025-02-22T12:00:00Z")
     two_days_ago = datetime.datetime.fromisoformat("2025-04-20T12:00:00Z")
     today = datetime.datetime.fromisoformat("2025-04-22T12:00:00Z")
 
-    email1 = Mock(subject="1", html="body 1", attachments=[], date=two_months_ago)
-    email2 = Mock(subject="2", html="body 2", attachments=[], date=two_days_ago)
-    email3 = Mock(subject="3", html="body 3", attachments=[], date=today)
+    email1 = make_email(
+        1, subject="1", html="body 1", attachments=[], date=two_months_ago
+    )
+    email2 = make_email(
+        2, subject="2", html="body 2", attachments=[], date=two_days_ago
+    )
+    email3 = make_email(3, subject="3", html="body 3", attachments=[], date=today)
 
     assert (
         connector.config.email_intel_imap.relative_import_start_date
@@ -133,7 +144,7 @@ def test_connector_process_data_since_last_email_ingestion(
     connector.helper.get_state.return_value = {
         "last_email_ingestion": two_days_ago.isoformat()
     }
-    mocked_mail_box.fetch.return_value = [email1, email2, email3]
+    mailbox_emails.extend([email1, email2, email3])
     stix_objects = connector.process_data()
 
     assert len(stix_objects) == 1
@@ -142,12 +153,86 @@ def test_connector_process_data_since_last_email_ingestion(
     assert report.name == "3"
 
 
-def test_connector_known_warning(connector: Connector, mocked_mail_box: Mock) -> None:
+@freezegun.freeze_time("2025-04-22T14:00:00Z")
+def test_connector_process_data_since_last_uid(
+    connector: Connector, mailbox_emails: list[Mock], make_email: Callable[..., Mock]
+) -> None:
+    two_months_ago = datetime.datetime.fromisoformat("2025-02-22T12:00:00Z")
+
+    # Emails are selected by UID, whatever their date
+    email1 = make_email(1, subject="1", html="body 1", attachments=[])
+    email2 = make_email(
+        2, subject="2", html="body 2", attachments=[], date=two_months_ago
+    )
+    connector.helper.get_state.return_value = {
+        "last_email_ingestion": "2025-04-22T12:00:00+00:00",
+        "uid_validity": 1,
+        "last_uid": 1,
+    }
+    mailbox_emails.extend([email1, email2])
+    stix_objects = connector.process_data()
+
+    assert [stix_object.name for stix_object in stix_objects] == ["2"]
+    assert connector.cursor.last_uid == 2
+
+
+def test_connector_process_data_filters_headers(
+    connector: Connector, mailbox_emails: list[Mock], make_email: Callable[..., Mock]
+) -> None:
+    now = datetime.datetime.now(tz=datetime.UTC)
+    connector.config.email_intel_imap.max_email_size = 10_000
+    connector.config.email_intel_imap.excluded_senders = ["Spam@Test.com"]
+    connector.helper.get_state.return_value = {
+        "uid_validity": 1,
+        "last_uid": 0,
+        "seen_message_ids": ["<1@test.com>"],
+    }
+    emails = [
+        make_email(1, subject="seen", date=now),
+        make_email(2, subject="too big", date=now, size_rfc822=20_000),
+        make_email(3, subject="excluded", date=now, from_="spam@test.com"),
+        make_email(4, subject="wanted", html="body", attachments=[], date=now),
+        make_email(5, subject="duplicate", date=now),
+    ]
+    emails[4].headers = {"message-id": ("<4@test.com>",)}
+    mailbox_emails.extend(emails)
+
+    stix_objects = connector.process_data()
+
+    # Only the bodies of the wanted emails are downloaded
+    assert [stix_object.name for stix_object in stix_objects] == ["wanted"]
+    assert connector.cursor.last_uid == 5
+
+
+def test_connector_finalize_work_saves_cursor(
+    connector: Connector, mailbox_emails: list[Mock], make_email: Callable[..., Mock]
+) -> None:
+    now = datetime.datetime.now(tz=datetime.UTC)
+    mailbox_emails.append(
+        make_email(7, subject="7", html="body", attachments=[], date=now)
+    )
+    connector.helper.get_state.return_value = {
+        "uid_validity": 1,
+        "last_uid": 6,
+        "seen_message_ids": ["<6@test.com>"],
+    }
+
+    connector.process_message()
+
+    state = connector.helper.set_state.call_args.kwargs["state"]
+    assert state["uid_validity"] == 1
+    assert state["last_uid"] == 7
+    assert state["seen_message_ids"] == ["<6@test.com>", "<7@test.com>"]
+
+
+def test_connector_known_warning(
+    connector: Connector, mailbox_emails: list[Mock], make_email: Callable[..., Mock]
+) -> None:
     today = datetime.datetime.now(tz=datetime.UTC)
     connector.helper.get_state.return_value = {
         "last_email_ingestion": "1970-01-01T00:00:00Z"
     }
-    mocked_mail_box.fetch.return_value = [Mock(date=today)]
+    mailbox_emails.append(make_email(1, date=today))
 
     assert (
         connector.process()
@@ -1,8 +1,12 @@
-import io
+import heapq
 import os
 import sys
+import tempfile
+import threading
 import time
 from base64 import b64encode
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -14,6 +18,13 @@ from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 from pycti import OpenCTIConnectorHelper, Report, get_config_variable
 
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+FILE_FIELDS = "nextPageToken, files(id, name, modifiedTime, createdTime, mimeType)"
+# Maximum number of parent folders in a single files query
+PARENTS_PER_QUERY = 50
+# Downloaded files larger than this are spooled to disk
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
 
 class GoogleDrive:
     def __init__(self):
@@ -99,12 +110,29 @@ class GoogleDrive:
         self.google_drive_interval = get_config_variable(
             "GOOGLE_DRIVE_INTERVAL", ["google_drive", "interval"], config, True
         )
+        self.google_drive_include_subfolders = get_config_variable(
+            "GOOGLE_DRIVE_INCLUDE_SUBFOLDERS",
+            ["google_drive", "include_subfolders"],
+            config,
+            default=False,
+        )
+        self.google_drive_download_workers = get_config_variable(
+            "GOOGLE_DRIVE_DOWNLOAD_WORKERS",
+            ["google_drive", "download_workers"],
+            config,
+            True,
+            4,
+        )
         self.update_existing_data = get_config_variable(
             "CONNECTOR_UPDATE_EXISTING_DATA",
             ["connector", "update_existing_data"],
             config,
         )
 
+        self.credentials = None
+        # Drive services are not thread safe, each download thread builds its own
+        self._thread_local = threading.local()
+
         # Create the identity
         self.identity = self.helper.api.identity.create(
             type="Organization", name=self.google_drive_report_author
@@ -168,6 +196,90 @@ class GoogleDrive:
             bundle, work_id=work_id, update=self.update_existing_data
         )
 
+    def get_service(self):
+        if getattr(self._thread_local, "service", None) is None:
+            self._thread_local.service = build(
+                "drive", "v3", credentials=self.credentials, cache_discovery=False
+            )
+        return self._thread_local.service
+
+    def list_files(self, q, fields=FILE_FIELDS, order_by=None):
+        """Iterate over all the files matching the query, page by page"""
+        page_token = None
+        while True:
+            results = (
+                self.get_service()
+                .files()
+                .list(
+                    q=q,
+                    pageSize=1000,
+                    fields=fields,
+                    orderBy=order_by,
+                    pageToken=page_token,
+                    supportsAllDrives=True,
+                    includeItemsFromAllDrives=True,
+                )
+                .execute()
+            )
+            yield from results.get("files", [])
+            page_token = results.get("nextPageToken")
+            if page_token is None:
+                return
+
+    def list_folder_ids(self, root_id):
+        """Return the id of the root folder and, if enabled, of all its subfolders"""
+        folder_ids = [root_id]
+        if not self.google_drive_include_subfolders:
+            return folder_ids
+        index = 0
+        while index < len(folder_ids):
+            parents = folder_ids[index : index + PARENTS_PER_QUERY]
+            index += len(parents)
+            q = (
+                "("
+                + " or ".join("'" + parent + "' in parents" for parent in parents)
+                + ") and mimeType = '"
+                + FOLDER_MIME_TYPE
+                + "' and trashed = false"
+            )
+            for folder in self.list_files(q, fields="nextPageToken, files(id)"):
+                folder_ids.append(folder["id"])
+        return folder_ids
+
+    def list_new_files(self, folder_ids, last_file_processed):
+        """Iterate over the files of the folders, ordered by modification time"""
+        queries = []
+        for i in range(0, len(folder_ids), PARENTS_PER_QUERY):
+            q = (
+                "("
+                + " or ".join(
+                    "'" + parent + "' in parents"
+                    for parent in folder_ids[i : i + PARENTS_PER_QUERY]
+                )
+                + ")"
+            )
+            if last_file_processed is not None:
+                q += " and modifiedTime > '" + last_file_processed + "'"
+            self.helper.log_info("Fetching files with query: " + q)
+            queries.append(self.list_files(q, order_by="modifiedTime asc"))
+        # Each query is already ordered, RFC 3339 times in UTC are ordered as strings
+        return heapq.merge(*queries, key=lambda item: item["modifiedTime"])
+
+    def download_file(self, item):
+        """Download a file into a temporary file, spooled to disk when large"""
+        request = self.get_service().files().get_media(fileId=item["id"])
+        file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            downloader = MediaIoBaseDownload(file, request)
+            done = False
+            while done is False:
+                status, done = downloader.next_chunk()
+        except Exception:
+            file.close()
+            raise
+        file.seek(0)
+        return file
+
     def process(self):
         current_state = self.helper.get_state()
         last_file_processed = None
@@ -178,87 +290,86 @@ class GoogleDrive:
             self.helper.log_info("Connector has never run")
 
         self.helper.log_info("Building credentials...")
-        credentials = service_account.Credentials.from_service_account_info(
+        self.credentials = service_account.Credentials.from_service_account_info(
             self.build_credentials(), scopes=["https://www.googleapis.com/auth/drive"]
         )
-        service = build("drive", "v3", credentials=credentials)
+        self._thread_local = threading.local()
         self.helper.log_info("Finding the root folder...")
         folder_id = (
-            service.files()
+            self.get_service()
+            .files()
             .list(
-                q="mimeType = 'application/vnd.google-apps.folder' and name = '"
+                q="mimeType = '"
+                + FOLDER_MIME_TYPE
+                + "' and name = '"
                 + self.google_drive_folder_name
                 + "'",
                 pageSize=10,
                 fields="nextPageToken, files(id, name)",
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
             )
             .execute()
         )
         folder_id_result = folder_id.get("files", [])
         if len(folder_id_result) == 0:
             raise ValueError("Folder not found")
-        id = folder_id_result[0].get("id")
-        if last_file_processed is not None:
-            q = (
-                "'"
-                + id
-                + "' in parents and modifiedTime > '"
-                + last_file_processed
-                + "'"
-            )
-        else:
-            q = "'" + id + "' in parents"
-        self.helper.log_info("Fetching files with query: " + q)
-        results = (
-            service.files()
-            .list(
-                q=q,
-                pageSize=1000,
-                fields="nextPageToken, files(id, name, modifiedTime, createdTime, mimeType)",
-                orderBy="modifiedTime asc",
-            )
-            .execute()
-        )
-        items = results.get("files", [])
-        if len(items) > 0:
-            self.helper.log_info(
-                "Returned " + str(len(items)) + " files, processing..."
-            )
-            now = datetime.now(pytz.UTC)
-            friendly_name = "Google Drive run @ " + now.astimezone(pytz.UTC).isoformat()
-            work_id = self.helper.api.work.initiate_work(
-                self.helper.connect_id, friendly_name
-            )
-            for item in items:
-                if item["mimeType"] in self.google_drive_types:
-                    self.helper.log_info(
-                        "Processing file (name="
-                        + item["name"]
-                        + ", type="
-                        + item["mimeType"]
-                    )
-                    request = service.files().get_media(fileId=item["id"])
-                    file = io.BytesIO()
-                    downloader = MediaIoBaseDownload(file, request)
-                    done = False
-                    while done is False:
-                        status, done = downloader.next_chunk()
-                    self.process_file(work_id, item, file.getvalue())
-                    self.helper.set_state({"last_file_processed": item["modifiedTime"]})
-                    self.helper.log_info(
-                        "File processed, setting last_file_processed state to "
-                        + item["modifiedTime"]
+        folder_ids = self.list_folder_ids(folder_id_result[0].get("id"))
+        self.helper.log_info("Fetching files of " + str(len(folder_ids)) + " folder(s)")
+
+        work_id = None
+        processed = 0
+        workers = max(1, self.google_drive_download_workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Files are downloaded concurrently but processed in modification order,
+            # so last_file_processed never moves past a file which is not processed yet
+            pending = deque()
+
+            def process_next():
+                item, download = pending.popleft()
+                with download.result() as file:
+                    self.process_file(work_id, item, file.read())
+                self.helper.set_state({"last_file_processed": item["modifiedTime"]})
+                self.helper.log_info(
+                    "File processed, setting last_file_processed state to "
+                    + item["modifiedTime"]
+                )
+
+            for item in self.list_new_files(folder_ids, last_file_processed):
+                if item["mimeType"] not in self.google_drive_types:
+                    if item["mimeType"] != FOLDER_MIME_TYPE:
+                        self.helper.log_info(
+                            "Ignoring filtered type file (name="
+                            + item["name"]
+                            + ", type="
+                            + item["mimeType"]
+                        )
+                    continue
+                if work_id is None:
+                    now = datetime.now(pytz.UTC)
+                    friendly_name = (
+                        "Google Drive run @ " + now.astimezone(pytz.UTC).isoformat()
                     )
-                else:
-                    self.helper.log_info(
-                        "Ignoring filtered type file (name="
-                        + item["name"]
-                        + ", type="
-                        + item["mimeType"]
+                    work_id = self.helper.api.work.initiate_work(
+                        self.helper.connect_id, friendly_name
                     )
+                self.helper.log_info(
+                    "Processing file (name="
+                    + item["name"]
+                    + ", type="
+                    + item["mimeType"]
+                )
+                pending.append((item, executor.submit(self.download_file, item)))
+                processed += 1
+                if len(pending) >= 2 * workers:
+                    process_next()
+            while pending:
+                process_next()
+
+        if work_id is not None:
             message = (
                 "Connector successfully run ("
-                + str(len(items))
+                + str(processed)
                 + " file(s) have been processed"
             )
             self.helper.log_info(message)
@@ -20,6 +20,9 @@ from pycti import (
     get_config_variable,
 )
 
+# Maximum number of objects in a bundle
+BUNDLE_SIZE = 50000
+
 
 class GreyNoiseFeed:
     def __init__(self):
@@ -96,6 +99,13 @@ class GreyNoiseFeed:
             isNumber=True,
             default=24,
         )
+        self.greynoise_labels_cache_ttl = get_config_variable(
+            "GREYNOISE_LABELS_CACHE_TTL",
+            ["greynoisefeed", "labels_cache_ttl"],
+            config,
+            isNumber=True,
+            default=24,
+        )
         self.identity = self.helper.api.identity.create(
             type="Organization",
             name=self.greynoise_ent_name,
@@ -106,8 +116,9 @@ class GreyNoiseFeed:
             },
         )
 
-        # Cache for label
+        # Cache for label, kept between runs until it expires
         self.labels_cache = {}
+        self.labels_cache_expiration = 0
 
     def get_feed_query(self, feed_type):
         query = ""
@@ -263,10 +274,9 @@ class GreyNoiseFeed:
 
         return score
 
-    def _process_data(self, work_id, session, ips_list):
+    def _process_data(self, work_id, json_data_tags, ips_list):
         bundle_entities = []
         bundle_relationships = []
-        json_data_tags = session.metadata()
         self.helper.log_info("Building Indicator Bundles")
         for ip in ips_list:
             if "ip" not in ip or "classification" not in ip:
@@ -586,7 +596,7 @@ class GreyNoiseFeed:
             bundle_objects = bundle_entities + bundle_relationships
             batch_count = 0
             bundle_objects_len = len(bundle_objects)
-            batch_size = 50000
+            batch_size = BUNDLE_SIZE
             for i in range(batch_count, bundle_objects_len, batch_size):
                 self.helper.log_info("Batch: " + str(int(i) / int(batch_size)))
                 x = i
@@ -600,10 +610,103 @@ class GreyNoiseFeed:
                     work_id=work_id,
                 )
 
+    def _reset_expired_labels_cache(self):
+        if time.time() >= self.labels_cache_expiration:
+            self.labels_cache = {}
+            self.labels_cache_expiration = (
+                time.time() + self.greynoise_labels_cache_ttl * 3600
+            )
+
+    def _query_pages(self, session, query, scroll=None):
+        """
+        This method allows you to query the feed page by page, following the scroll token.
+
+        :param session: The GreyNoise session.
+        :param query: The GNQL query of the feed.
+        :param scroll: The scroll token of the page to start from, None for the first page.
+        :return: A generator of tuples (page data, scroll token of the next page, complete)
+        """
+        complete = False
+        while not complete:
+            if scroll:
+                self.helper.log_info(
+                    "Query GreyNoise API - Next Results Page (" + query + ")"
+                )
+                response = session.query(query=query, scroll=scroll, exclude_raw=True)
+            else:
+                self.helper.log_info(
+                    "Querying GreyNoise API - First Results Page (" + query + ")"
+                )
+                response = session.query(query=query, exclude_raw=True)
+            complete = response.get("complete", True)
+            scroll = response.get("scroll", "")
+            yield response.get("data") or [], scroll, complete
+
+    def _process_feed(self, session, query, current_state, now):
+        """
+        This method allows you to convert and send the feed page by page.
+        The position in the feed is stored in the state after each page, so a run
+        stopped in the middle of the feed is resumed from the last page sent.
+        """
+        checkpoint = {}
+        if current_state is not None:
+            if "last_run_timestamp" in current_state:
+                checkpoint["last_run_timestamp"] = current_state["last_run_timestamp"]
+            if current_state.get("scroll"):
+                checkpoint["scroll"] = current_state["scroll"]
+                checkpoint["page_count"] = current_state.get("page_count", 0)
+                checkpoint["ip_count"] = current_state.get("ip_count", 0)
+                self.helper.log_info(
+                    "Resuming GreyNoise feed after page "
+                    + str(checkpoint["page_count"])
+                )
+
+        json_data_tags = session.metadata()
+        friendly_name = "GreyNoise Feed connector run"
+        work_id = self.helper.api.work.initiate_work(
+            self.helper.connect_id, friendly_name
+        )
+        page_count = checkpoint.get("page_count", 0)
+        ip_count = checkpoint.get("ip_count", 0)
+        for ips_list, scroll, complete in self._query_pages(
+            session, query, checkpoint.get("scroll")
+        ):
+            if ip_count + len(ips_list) >= self.greynoise_limit:
+                complete = True
+                ips_list = ips_list[0 : self.greynoise_limit - ip_count]
+
+            self._process_data(work_id, json_data_tags, ips_list)
+            page_count += 1
+            ip_count += len(ips_list)
+            if complete:
+                break
+            self.helper.set_state(
+                {
+                    **checkpoint,
+                    "scroll": scroll,
+                    "page_count": page_count,
+                    "ip_count": ip_count,
+                }
+            )
+
+        self.helper.log_info("Query GreyNoise API - Completed")
+        self.helper.log_info("GreyNoise Indicator Count: " + str(ip_count))
+        message = (
+            "Connector successfully run ("
+            + str(ip_count)
+            + " IPs), storing last_run_timestamp as "
+            + now.astimezone(pytz.UTC).isoformat()
+        )
+        self.helper.api.work.to_processed(work_id, message)
+        self.helper.log_info(message)
+        self.helper.set_state(
+            {"last_run_timestamp": now.astimezone(pytz.UTC).isoformat()}
+        )
+
     def run(self):
         self.helper.log_info("GreyNoise feed - Initialization...")
         while True:
-            self.labels_cache = {}
+            self._reset_expired_labels_cache()
             try:
                 # Get the current timestamp and check
                 now = datetime.now(pytz.UTC)
@@ -611,7 +714,8 @@ class GreyNoiseFeed:
                 if current_state is not None and "last_run_timestamp" in current_state:
                     last_run_timestamp = parse(current_state["last_run_timestamp"])
 
-                    pause_run = True
+                    # A run stopped in the middle of the feed is resumed right away
+                    pause_run = not current_state.get("scroll")
 
                     while pause_run:
                         self.helper.log_info(
@@ -636,71 +740,20 @@ class GreyNoiseFeed:
                     + last_run_timestamp.astimezone(pytz.UTC).isoformat()
                 )
                 try:
-                    ips_list = []
                     session = GreyNoise(
                         api_key=self.api_key, integration_name="opencti-feed-v2.4"
                     )
-
                     query = self.get_feed_query(self.feed_type)
-                    self.helper.log_info(
-                        "Querying GreyNoise API - First Results Page (" + query + ")"
-                    )
-                    response = session.query(query=query, exclude_raw=True)
-                    complete = response.get("complete", True)
-                    scroll = response.get("scroll", "")
-
-                    # Process
-                    if "data" in response and len(response["data"]) > 0:
-                        for ip in response["data"]:
-                            ips_list.append(ip)
-
-                    if len(ips_list) >= self.greynoise_limit:
-                        complete = True
-                        ips_list = ips_list[0 : self.greynoise_limit]
-
-                    while not complete:
-                        self.helper.log_info(
-                            "Query GreyNoise API - Next Results Page (" + query + ")"
-                        )
-                        response = session.query(
-                            query=query, scroll=scroll, exclude_raw=True
-                        )
-                        complete = response.get("complete", True)
-                        scroll = response.get("scroll", "")
-
-                        # Process
-                        if "data" in response and len(response["data"]) > 0:
-                            for ip in response["data"]:
-                                ips_list.append(ip)
-
-                            if len(ips_list) >= self.greynoise_limit:
-                                complete = True
-                                ips_list = ips_list[0 : self.greynoise_limit]
-
-                    self.helper.log_info("Query GreyNoise API - Completed")
-                    self.helper.log_info(
-                        "GreyNoise Indicator Count: " + str(len(ips_list))
-                    )
-
-                    # Process
-                    friendly_name = (
-                        "GreyNoise Feed connector run (" + str(len(ips_list)) + " IPs)"
-                    )
-                    work_id = self.helper.api.work.initiate_work(
-                        self.helper.connect_id, friendly_name
-                    )
-                    self._process_data(work_id, session, ips_list)
-                    message = (
-                        "Connector successfully run, storing last_run_timestamp as "
-                        + now.astimezone(pytz.UTC).isoformat()
-                    )
-                    self.helper.api.work.to_processed(work_id, message)
-                    self.helper.log_info(message)
-                    self.helper.set_state(
-                        {"last_run_timestamp": now.astimezone(pytz.UTC).isoformat()}
-                    )
+                    self._process_feed(session, query, current_state, now)
                 except Exception as e:
                     self.helper.log_error(str(e))
+                    # The scroll token may have expired, the next run starts over
+                    if current_state is not None and current_state.get("scroll"):
+                        current_state = self.helper.get_state() or {}
+                        current_state.pop("scroll", None)
+                        current_state.pop("page_count", None)
+                        current_state.pop("ip_count", None)
+                        self.helper.set_state(current_state)
 
                 # Wait
                 # time.sleep(3600 * self.greynoise_interval)
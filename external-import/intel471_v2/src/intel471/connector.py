@@ -1,6 +1,5 @@
 import os
 import signal
-from queue import Queue
 
 import yaml
 from apscheduler.jobstores.memory import MemoryJobStore
@@ -9,9 +8,9 @@ from apscheduler.schedulers.base import BaseScheduler
 from pycti import OpenCTIConnectorHelper, get_config_variable
 from yaml.parser import ParserError
 
-from . import HelperRequest
+from .state_store import StateStore
 from .streams.breach_alerts import Intel471BreachAlertsStream
-from .streams.common import Intel471Stream
+from .streams.common import Intel471Stream, RateLimiter
 from .streams.cves import Intel471CVEsStream
 from .streams.indicators import Intel471IndicatorsStream
 from .streams.malware_reports import Intel471MalwareReportsStream
@@ -25,9 +24,6 @@ class Intel471Connector:
         config: dict = self._init_config()
         self.scheduler: BaseScheduler = self._init_scheduler()
         self.helper = OpenCTIConnectorHelper(config)
-        # We'll use queues to coordinate helper state reads/writes from threaded streams
-        self.in_queue = Queue()
-        self.out_queues: dict[str, Queue] = {}
 
         update_existing_data = bool(
             get_config_variable(
@@ -50,6 +46,30 @@ class Intel471Connector:
             isNumber=True,
             default=70,
         )
+        page_workers = get_config_variable(
+            "INTEL471_PAGE_WORKERS",
+            ["intel471", "page_workers"],
+            config,
+            isNumber=True,
+            default=4,
+        )
+        api_rate_limit = get_config_variable(
+            "INTEL471_API_RATE_LIMIT",
+            ["intel471", "api_rate_limit"],
+            config,
+            isNumber=True,
+            default=5,
+        )
+        state_flush_interval = get_config_variable(
+            "INTEL471_STATE_FLUSH_INTERVAL",
+            ["intel471", "state_flush_interval"],
+            config,
+            isNumber=True,
+            default=10,
+        )
+        # Streams run in their own threads (through self.scheduler) and share the state and the API rate limit
+        self.state_store = StateStore(self.helper, state_flush_interval)
+        rate_limiter = RateLimiter(api_rate_limit)
 
         for stream_class in (
             Intel471IndicatorsStream,
@@ -67,7 +87,6 @@ class Intel471Connector:
                 isNumber=True,
                 default=0,
             ):
-                self.out_queues[stream_class.label] = Queue()
                 initial_history = get_config_variable(
                     f"INTEL471_INITIAL_HISTORY_{stream_class.group_label}".upper(),
                     ["intel471", f"initial_history_{stream_class.group_label}"],
@@ -80,12 +99,13 @@ class Intel471Connector:
                         self.helper,
                         api_username,
                         api_key,
-                        self.out_queues[stream_class.label],
-                        self.in_queue,
+                        self.state_store,
+                        rate_limiter,
                         initial_history,
                         update_existing_data,
                         proxy_url,
                         ioc_score,
+                        page_workers,
                     ),
                     interval,
                 )
@@ -95,32 +115,7 @@ class Intel471Connector:
 
     def run(self) -> None:
         self.scheduler.start()
-        self.handle_helper_state()  # main loop
-
-    def handle_helper_state(self) -> None:
-        """
-        As there are several data streams, each running in its own thread (through self.scheduler), it is necessary to
-        coordinate reads and writes of helper state to avoid race conditions. Each stream class is initialised
-        with IN and OUT queue, so each time it needs to read or write the state it requests it through
-        a shared queue which is then consumed by this method. The result (the state dict, or
-        simple ACK that the state was updated) is being communicated back using a separate queue dedicated for
-        the specific stream.
-        """
-        while True:
-            request: HelperRequest = self.in_queue.get()
-            if request.operation == HelperRequest.Operation.KILL:
-                return
-            out_queue: Queue = self.out_queues[request.stream]
-            self.helper.log_debug(f"Got task {str(request)}")
-            state = self.helper.get_state() or {}
-            if request.operation == HelperRequest.Operation.GET:
-                out_queue.put(state)
-            elif request.operation == HelperRequest.Operation.UPDATE:
-                for k, v in request.data.items():
-                    state[k] = v
-                self.helper.set_state(state)
-                out_queue.put("ACK")
-            self.helper.log_info(f"Put ACK into queue for task {str(request)}")
+        self.state_store.run()  # main loop, flushing the state of the streams
 
     def add_job(self, stream_obj: Intel471Stream, interval: int) -> None:
         self.scheduler.add_job(
@@ -152,5 +147,5 @@ class Intel471Connector:
     def _signal_handler(self, *args) -> None:
         self.helper.log_info("Shutting down")
         self.scheduler.shutdown()
+        self.state_store.stop()
         self.helper.stop()
-        self.in_queue.put(HelperRequest(operation=HelperRequest.Operation.KILL))
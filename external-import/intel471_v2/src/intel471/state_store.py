@@ -0,0 +1,69 @@
+import threading
+from typing import Any
+
+from pycti import OpenCTIConnectorHelper
+
+
+class StateStore:
+    """
+    In-memory cache of the connector state, shared by all the stream threads.
+
+    Each stream reads and writes the keys of its own section without a round-trip to another thread.
+    The state is loaded once from the helper, and the writes are coalesced: the whole state is sent
+    with `helper.set_state` at most every `flush_interval` seconds, and when a stream completes its run.
+    Sections are stored flat in the helper state (keys are already prefixed with the stream label),
+    so the cursors saved by the previous versions of the connector are kept.
+    """
+
+    def __init__(self, helper: OpenCTIConnectorHelper, flush_interval: int) -> None:
+        self.helper = helper
+        self.flush_interval = flush_interval
+        self._sections: dict[str, dict[str, Any]] = {}
+        self._initial_state: dict[str, Any] = dict(helper.get_state() or {})
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._stopped = threading.Event()
+
+    def _section(self, stream: str) -> dict[str, Any]:
+        if (section := self._sections.get(stream)) is None:
+            with self._lock:
+                section = self._sections.setdefault(stream, {})
+        return section
+
+    def get(self, stream: str, key: str) -> Any:
+        section = self._section(stream)
+        if key in section:
+            return section[key]
+        return self._initial_state.get(key)
+
+    def set(self, stream: str, key: str, value: Any) -> None:
+        section = self._section(stream)
+        with self._lock:
+            section[key] = value
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Send the state to OpenCTI if it was updated since the last flush"""
+        with self._flush_lock:
+            if not self._dirty:
+                return
+            with self._lock:
+                self._dirty = False
+                state = dict(self._initial_state)
+                for section in self._sections.values():
+                    state.update(section)
+            self.helper.set_state(state)
+            self.helper.log_debug("State flushed")
+
+    def run(self) -> None:
+        """Flush the state periodically until the store is stopped"""
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                self.helper.log_error(f"Error while flushing the state: {e}")
+        self.flush()
+
+    def stop(self) -> None:
+        self._stopped.set()
@@ -1,11 +1,14 @@
 import datetime
 import os
+import threading
 import time
 from abc import ABC, abstractmethod
-from queue import Queue
-from typing import Any, Iterator, Union
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Union
 
 import titan_client
+from prometheus_client import Counter, Gauge
 from pycti import OpenCTIConnectorHelper
 from stix2 import Bundle
 from titan_client.titan_stix import STIXMapperSettings
@@ -13,12 +16,49 @@ from titan_client.titan_stix.exceptions import EmptyBundle
 from urllib3 import make_headers
 from urllib3.util import parse_url
 
-from .. import HelperRequest
+from ..state_store import StateStore
 
 HERE = os.path.dirname(os.path.realpath(__file__))
 with open(os.path.join(HERE, "..", "..", "__version__")) as fh:
     version = fh.read().strip()
 
+# Exposed with the connector metrics when CONNECTOR_EXPOSE_METRICS is enabled
+STREAM_CURSOR = Gauge(
+    "intel471_stream_cursor",
+    "Cursor of the stream, when numeric (epoch milliseconds)",
+    ["stream"],
+)
+STREAM_CURSOR_UPDATED = Gauge(
+    "intel471_stream_cursor_updated_timestamp",
+    "Time of the last cursor update of the stream",
+    ["stream"],
+)
+STREAM_OBJECTS = Counter(
+    "intel471_stream_objects", "Objects fetched from Titan API", ["stream"]
+)
+STREAM_THROUGHPUT = Gauge(
+    "intel471_stream_objects_per_second",
+    "Objects fetched per second during the last run of the stream",
+    ["stream"],
+)
+
+
+class RateLimiter:
+    """Spaces out the API calls of all the streams, to at most calls_per_second (0 for no limit)"""
+
+    def __init__(self, calls_per_second: float) -> None:
+        self.interval = 1 / calls_per_second if calls_per_second > 0 else 0
+        self.next_call = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
 
 class Intel471Stream(ABC):
     """
@@ -52,16 +92,18 @@ class Intel471Stream(ABC):
         helper: OpenCTIConnectorHelper,
         api_username: str,
         api_key: str,
-        in_queue: Queue,
-        out_queue: Queue,
+        state_store: StateStore,
+        rate_limiter: RateLimiter,
         initial_history: int = None,
         update_existing_data: bool = False,
         proxy_url: Union[str, None] = None,
         ioc_score: Union[int, None] = None,
+        page_workers: int = 1,
     ) -> None:
         self.helper = helper
-        self.in_queue = in_queue
-        self.out_queue = out_queue
+        self.state_store = state_store
+        self.rate_limiter = rate_limiter
+        self.page_workers = max(1, page_workers)
         self.api_config = titan_client.Configuration(
             username=api_username, password=api_key
         )
@@ -80,8 +122,20 @@ class Intel471Stream(ABC):
         return f"{self.label}_cursor"
 
     def run(self) -> None:
-        for bundle in self.get_bundles():
-            self.send_to_server(bundle)
+        started = time.monotonic()
+        self.objects_count = 0
+        try:
+            for bundle in self.get_bundles():
+                self.send_to_server(bundle)
+        finally:
+            self.state_store.flush()
+            elapsed = time.monotonic() - started
+            STREAM_THROUGHPUT.labels(self.label).set(
+                self.objects_count / elapsed if elapsed > 0 else 0
+            )
+            self.helper.log_info(
+                f"{self.__class__.__name__} fetched {self.objects_count} items in {elapsed:.1f} seconds."
+            )
 
     def get_bundles(self) -> Iterator[Bundle]:
         cursor = self._get_cursor()
@@ -91,51 +145,85 @@ class Intel471Stream(ABC):
                 f"{api_client.user_agent}; OpenCTI-Connector/{version}"
             )
             api_instance = getattr(titan_client, self.api_class_name)(api_client)
-        while True:
-            kwargs = self._get_api_kwargs(cursor)
-            for offset in offsets:
-                if offset is not None:
-                    kwargs["offset"] = offset
-                self.helper.log_info(
-                    "{} calls Titan API with arguments: {}.".format(
-                        self.__class__.__name__, str(kwargs)
-                    )
-                )
-                api_response = getattr(api_instance, self.api_method_name)(**kwargs)
-                api_payload_objects = (
-                    getattr(api_response, self.api_payload_objects_key) or []
-                )
-                self.helper.log_info(
-                    "{} got {} items from Titan API.".format(
-                        self.__class__.__name__, len(api_payload_objects)
+        api_method = getattr(api_instance, self.api_method_name)
+        with ThreadPoolExecutor(max_workers=self.page_workers) as executor:
+            while True:
+                kwargs = self._get_api_kwargs(cursor)
+                for api_response in self._fetch_pages(
+                    executor, api_method, kwargs, offsets
+                ):
+                    api_payload_objects = (
+                        getattr(api_response, self.api_payload_objects_key) or []
                     )
-                )
-                if not api_payload_objects:
-                    break
-                cursor = self._get_cursor_value(api_response)
-                try:
-                    bundle = api_response.to_stix(
-                        STIXMapperSettings(
-                            titan_client,
-                            api_client,
-                            ioc_opencti_score=self.ioc_score,
-                            girs_names=True,
-                            report_full_content=True,
-                        )
-                    )
-                except EmptyBundle:
                     self.helper.log_info(
-                        f"{self.__class__.__name__} got empty bundle from STIX converter."
+                        "{} got {} items from Titan API.".format(
+                            self.__class__.__name__, len(api_payload_objects)
+                        )
                     )
+                    if not api_payload_objects:
+                        break
+                    self.objects_count += len(api_payload_objects)
+                    STREAM_OBJECTS.labels(self.label).inc(len(api_payload_objects))
+                    cursor = self._get_cursor_value(api_response)
+                    try:
+                        bundle = api_response.to_stix(
+                            STIXMapperSettings(
+                                titan_client,
+                                api_client,
+                                ioc_opencti_score=self.ioc_score,
+                                girs_names=True,
+                                report_full_content=True,
+                            )
+                        )
+                    except EmptyBundle:
+                        self.helper.log_info(
+                            f"{self.__class__.__name__} got empty bundle from STIX converter."
+                        )
+                    else:
+                        yield bundle
                 else:
-                    yield bundle
-            else:
-                # executes when there was no break in the inner loop, i.e. there are still results to fetch,
-                # but we need to shift dates as the offset was exhausted
+                    # executes when there was no break in the inner loop, i.e. there are still results to fetch,
+                    # but we need to shift dates as the offset was exhausted
+                    self._update_cursor(cursor)
+                    continue
                 self._update_cursor(cursor)
-                continue
-            self._update_cursor(cursor)
-            break
+                break
+
+    def _fetch_pages(
+        self,
+        executor: ThreadPoolExecutor,
+        api_method: Callable,
+        kwargs: dict,
+        offsets: list[Union[None, int]],
+    ) -> Iterator[Any]:
+        """
+        Fetch the pages of all the offsets concurrently, at most `page_workers` ahead of the page being processed.
+        Pages are yielded in the order of the offsets, the ones fetched in advance are dropped when
+        the consumer stops on an empty page.
+        """
+        pending = deque()
+        try:
+            for offset in offsets:
+                page_kwargs = dict(kwargs)
+                if offset is not None:
+                    page_kwargs["offset"] = offset
+                pending.append(executor.submit(self._call_api, api_method, page_kwargs))
+                if len(pending) >= self.page_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _call_api(self, api_method: Callable, kwargs: dict) -> Any:
+        self.rate_limiter.wait()
+        self.helper.log_info(
+            "{} calls Titan API with arguments: {}.".format(
+                self.__class__.__name__, str(kwargs)
+            )
+        )
+        return api_method(**kwargs)
 
     def send_to_server(self, bundle: Bundle) -> None:
         self.helper.log_info(
@@ -153,30 +241,19 @@ class Intel471Stream(ABC):
         return self._get_state(self.cursor_name)
 
     def _update_cursor(self, value: str) -> None:
+        STREAM_CURSOR_UPDATED.labels(self.label).set_to_current_time()
+        try:
+            STREAM_CURSOR.labels(self.label).set(float(value))
+        except (TypeError, ValueError):
+            # Stream endpoints use opaque cursors
+            pass
         return self._set_state(self.cursor_name, value)
 
     def _get_state(self, key: str):
-        self.helper.log_debug("Sending task to helper handler to get the state")
-        self.out_queue.put(
-            HelperRequest(operation=HelperRequest.Operation.GET, stream=self.label)
-        )
-        self.helper.log_debug("Waiting for helper handler to get state")
-        cursor = self.in_queue.get().get(key)
-        self.helper.log_debug("Got data from helper handler")
-        return cursor
+        return self.state_store.get(self.label, key)
 
     def _set_state(self, key: str, value: str):
-        self.helper.log_debug("Sending task to helper handler to save state")
-        self.out_queue.put(
-            HelperRequest(
-                operation=HelperRequest.Operation.UPDATE,
-                stream=self.label,
-                data={key: value},
-            )
-        )
-        self.helper.log_debug("Waiting for ACK from helper handler to save state")
-        self.in_queue.get()
-        self.helper.log_debug("Got ack for save state, proceeding")
+        self.state_store.set(self.label, key, value)
 
     @staticmethod
     def _get_ttl_hash(seconds=10_000):
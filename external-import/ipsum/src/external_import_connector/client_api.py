@@ -1,3 +1,5 @@
+import ipaddress
+
 import requests
 
 from .utils import (
@@ -5,6 +7,8 @@ from .utils import (
     is_full_network,
     is_private_cidr,
     is_private_ip,
+    merge_networks,
+    network_to_str,
     networkcidr_to_list,
 )
 
@@ -49,9 +53,10 @@ class ConnectorClient:
         """
         If params is None, retrieve all IPs in the Github Repository
         :param params: Optional Params to filter what list to return
-        :return: A list of IPs
+        :return: A list of IPs and networks
         """
         ips = []
+        networks = []
         try:
             response = self._request_data(self.config.api_base_url, params=params)
             if response is not None:
@@ -61,11 +66,19 @@ class ConnectorClient:
                         if is_cidr(ip):
                             if is_full_network(ip) or is_private_cidr(ip):
                                 continue
-                            network_ips = networkcidr_to_list(ip)
-                            ips.extend(network_ips)
+                            if self.config.expand_networks:
+                                network_ips = networkcidr_to_list(ip)
+                                ips.extend(network_ips)
+                            else:
+                                networks.append(ipaddress.ip_network(ip))
                         else:
                             if not is_private_ip(ip):
                                 ips.append(ip)
+            if networks:
+                # Single IPs are parsed as networks too, they are dropped when included in a network
+                ips.extend(
+                    network_to_str(network) for network in merge_networks(networks)
+                )
             return ips
         except Exception as err:
             self.helper.connector_logger.error(err)
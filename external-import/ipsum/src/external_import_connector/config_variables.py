@@ -68,3 +68,11 @@ class ConfigConnector:
             required=False,
             default="white",
         )
+
+        self.expand_networks = get_config_variable(
+            "CONNECTOR_IPSUM_EXPAND_NETWORKS",
+            ["connector_ipsum", "expand_networks"],
+            self.load,
+            required=False,
+            default=False,
+        )
@@ -6,6 +6,7 @@ from pycti import OpenCTIConnectorHelper
 from .client_api import ConnectorClient
 from .config_variables import ConfigConnector
 from .converter_to_stix import ConverterToStix
+from .utils import is_network
 
 
 class ConnectorIPSUM:
@@ -64,11 +65,22 @@ class ConnectorIPSUM:
         if entities is None:
             return stix_objects
 
-        stix_objects = [
-            self.converter_to_stix.create_obs(entity)
-            for entity in entities
-            if entity is not None
-        ]
+        for entity in entities:
+            if entity is None:
+                continue
+            stix_observable = self.converter_to_stix.create_obs(entity)
+            if stix_observable is None:
+                continue
+            stix_objects.append(stix_observable)
+            # A network is imported as one observable and one network range indicator
+            if is_network(entity):
+                stix_indicator = self.converter_to_stix.create_network_indicator(entity)
+                stix_objects.append(stix_indicator)
+                stix_objects.append(
+                    self.converter_to_stix.create_relationship(
+                        stix_indicator.id, "based-on", stix_observable.id
+                    )
+                )
 
         if len(stix_objects):
             stix_objects.append(self.converter_to_stix.author)
@@ -2,7 +2,9 @@ import ipaddress
 
 import stix2
 import validators
-from pycti import Identity, MarkingDefinition, StixCoreRelationship
+from pycti import Identity, Indicator, MarkingDefinition, StixCoreRelationship
+
+from .utils import is_network
 
 
 class ConverterToStix:
@@ -130,13 +132,41 @@ class ConverterToStix:
         """
         return validators.domain(value)
 
+    def create_network_indicator(self, value: str) -> stix2.Indicator:
+        """
+        Create a network range indicator
+        :param value: Network in CIDR notation
+        :return: Indicator STIX2 object
+        """
+        observable_type = (
+            "IPv6-Addr" if ipaddress.ip_network(value).version == 6 else "IPv4-Addr"
+        )
+        pattern = f"[{observable_type.lower()}:value = '{value}']"
+        stix_indicator = stix2.Indicator(
+            id=Indicator.generate_id(pattern),
+            name=value,
+            pattern=pattern,
+            pattern_type="stix",
+            created_by_ref=self.author["id"],
+            object_marking_refs=[self.tlp_marking],
+            external_references=self.external_reference,
+            custom_properties={
+                "x_opencti_score": self.config.x_opencti_score,
+                "x_opencti_main_observable_type": observable_type,
+            },
+        )
+        return stix_indicator
+
     def create_obs(self, value: str) -> dict | None:
         """
         Create observable according to value given
         :param value: Value in string
-        :return: Stix object for IPV4, IPV6 or Domain
+        :return: Stix object for IPV4, IPV6 (address or network) or Domain
         """
-        if self._is_ipv6(value) is True:
+        network_version = (
+            ipaddress.ip_network(value).version if is_network(value) else None
+        )
+        if self._is_ipv6(value) is True or network_version == 6:
             stix_ipv6_address = stix2.IPv6Address(
                 value=value,
                 object_marking_refs=[self.tlp_marking],
@@ -147,7 +177,7 @@ class ConverterToStix:
                 },
             )
             return stix_ipv6_address
-        if self._is_ipv4(value) is True:
+        if self._is_ipv4(value) is True or network_version == 4:
             stix_ipv4_address = stix2.IPv4Address(
                 value=value,
                 object_marking_refs=[self.tlp_marking],
@@ -50,6 +50,16 @@ def is_cidr(value):
         return False
 
 
+@staticmethod
+def is_network(value):
+    """
+    Check if the value is a network in CIDR notation, single IPs are not networks
+    :param value: Value in string
+    :return: A boolean
+    """
+    return "/" in value and is_cidr(value)
+
+
 @staticmethod
 def networkcidr_to_list(cidr):
     """
@@ -58,3 +68,37 @@ def networkcidr_to_list(cidr):
     :return: A list of IPs
     """
     return [str(ip) for ip in ipaddress.ip_network(cidr).hosts()]
+
+
+@staticmethod
+def merge_networks(networks):
+    """
+    Merge overlapping networks, the networks and IPs included in a larger network are dropped
+    :param networks: IPv4Network or IPv6Network list
+    :return: A sorted list of disjoint networks
+    """
+    merged = []
+    # Sorted by start address, a network comes right after the networks including it
+    for network in sorted(
+        networks, key=lambda n: (n.version, n.network_address, n.prefixlen)
+    ):
+        if (
+            merged
+            and merged[-1].version == network.version
+            and network.subnet_of(merged[-1])
+        ):
+            continue
+        merged.append(network)
+    return merged
+
+
+@staticmethod
+def network_to_str(network):
+    """
+    Convert a network to its string value, single IPs are not in CIDR notation
+    :param network: IPv4Network or IPv6Network
+    :return: A string
+    """
+    if network.num_addresses == 1:
+        return str(network.network_address)
+    return str(network)
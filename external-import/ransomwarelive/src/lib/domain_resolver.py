@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import validators
+import whois
+
+# Kinds of lookups stored in the cache
+LOOKUP_IP = "ip"
+LOOKUP_WHOIS = "whois"
+
+
+class RateLimiter:
+    """Spaces out the calls to a service, to at most calls_per_second (0 for no limit)"""
+
+    def __init__(self, calls_per_second):
+        self.interval = 1 / calls_per_second if calls_per_second > 0 else 0
+        self.next_call = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+class DomainResolver:
+    """Resolves the IP address and the WHOIS description of the victim domains
+
+    Lookups are kept in a persistent SQLite cache until their TTL expires, a lookup
+    without answer is cached as well but a failed lookup is retried next time.
+    Domains are prefetched concurrently by a pool of threads, the DNS over HTTPS and
+    the WHOIS services each having their own rate limit.
+    """
+
+    def __init__(self, helper, cache_path, ttl, workers, dns_rate, whois_rate):
+        self.helper = helper
+        self.ttl = ttl
+        self.workers = workers
+        self.dns_limiter = RateLimiter(dns_rate)
+        self.whois_limiter = RateLimiter(whois_rate)
+        self.session = requests.Session()
+        self.session.headers.update(
+            {"accept": "application/json", "User-Agent": "OpenCTI"}
+        )
+
+        self._lock = threading.Lock()
+        if os.path.dirname(cache_path):
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lookups (
+                kind TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                value TEXT,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (kind, domain)
+            )
+            """
+        )
+        self._connection.execute(
+            "DELETE FROM lookups WHERE expires_at <= ?", (time.time(),)
+        )
+        self._connection.commit()
+
+    def _get_cached(self, kind, domain):
+        """Returns a tuple (found, value) of a fresh lookup"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM lookups "
+                "WHERE kind = ? AND domain = ? AND expires_at > ?",
+                (kind, domain, time.time()),
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, row[0]
+
+    def _set_cached(self, kind, domain, value):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO lookups VALUES (?, ?, ?, ?)",
+                (kind, domain, value, time.time() + self.ttl),
+            )
+            self._connection.commit()
+
+    # Fetches the IP address of a domain with DNS over HTTPS
+    def _fetch_ip(self, domain):
+        self.dns_limiter.wait()
+        response = self.session.get(
+            "https://dns.google/resolve",
+            params={"name": domain, "type": "A"},
+            timeout=(20000, 20000),
+        )
+        response.raise_for_status()
+        for item in response.json().get("Answer") or []:
+            if item.get("type") == 1 and validators.ipv4(item.get("data")):
+                return item.get("data")
+        return None
+
+    # Fetches the whois information of a domain
+    def _fetch_description(self, domain):
+        self.whois_limiter.wait()
+        w = whois.whois(domain)
+
+        description = f"Domain:{domain}  \n"
+        if w is not None:
+            if w.get("country") is not None:
+                description += f" is registered in {w.get('country')}  \n"
+            if w.get("registrar") is not None:
+                description += f"registered with {w.get('registrar')}  \n"
+            if w.get("creation_date") is not None:
+                description += f" creation_date {w.get('creation_date')}  \n"
+            if w.get("expiration_date") is not None:
+                description += f" expiration_date {w.get('expiration_date')}  \n"
+        return description
+
+    def _lookup(self, kind, domain):
+        found, value = self._get_cached(kind, domain)
+        if found:
+            return value
+        try:
+            if kind == LOOKUP_IP:
+                value = self._fetch_ip(domain)
+            else:
+                value = self._fetch_description(domain)
+        except Exception as e:
+            self.helper.log_error(f"Error fetching {kind} for domain {domain}")
+            self.helper.log_error(str(e))
+            return None
+        self._set_cached(kind, domain, value)
+        return value
+
+    def get_ip(self, domain):
+        """Returns the IPv4 address of a domain, None if not resolved"""
+        return self._lookup(LOOKUP_IP, domain)
+
+    def get_description(self, domain):
+        """Returns the WHOIS description of a domain, None if not available"""
+        return self._lookup(LOOKUP_WHOIS, domain)
+
+    def prefetch(self, domains):
+        """Looks up concurrently the domains which are not in the cache yet"""
+        lookups = [
+            (kind, domain)
+            for domain in set(domains)
+            if domain is not None
+            for kind in (LOOKUP_IP, LOOKUP_WHOIS)
+            if not self._get_cached(kind, domain)[0]
+        ]
+        if not lookups:
+            return
+        self.helper.log_info(
+            f"Resolving {len({domain for _, domain in lookups})} victim domains"
+        )
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(lambda lookup: self._lookup(*lookup), lookups))
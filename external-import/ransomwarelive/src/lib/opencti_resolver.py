@@ -0,0 +1,100 @@
+import re
+
+import pycti
+
+ENTITY_ATTRIBUTES = """
+    standard_id
+    name
+    x_opencti_aliases
+    x_opencti_stix_ids
+"""
+
+# Words of the ransomware.live activities which are not part of a sector name
+SECTOR_STOP_WORDS = {"and", "or", "&", ",", "other", "not", "found"}
+
+
+def normalize_name(name):
+    """Lower case name, without punctuation and with single spaces"""
+    return " ".join(re.split(r"[\s,;/&]+", name.lower())).strip()
+
+
+class OpenCTIResolver:
+    """Resolves the countries and sectors of the victims to existing OpenCTI entities
+
+    All the countries and sectors are loaded once per run, so no request is sent to
+    OpenCTI while the STIX objects of the victims are generated. Sectors are matched
+    on their normalized name or aliases, then on each word of the victim activity.
+    """
+
+    def __init__(self, helper):
+        self.helper = helper
+        self.country_ids = {}
+        self.sector_ids = {}
+        self.sector_matches = {}
+
+    def _list_all(self, list_method, entity_type):
+        entities = []
+        after = None
+        while True:
+            result = list_method(
+                types=[entity_type],
+                first=500,
+                after=after,
+                withPagination=True,
+                customAttributes=ENTITY_ATTRIBUTES,
+            )
+            entities.extend(result["entities"])
+            if not result["pagination"]["hasNextPage"]:
+                return entities
+            after = result["pagination"]["endCursor"]
+
+    def load(self):
+        """Loads the countries and sectors of the platform"""
+        self.country_ids = {}
+        self.sector_ids = {}
+        self.sector_matches = {}
+        try:
+            for country in self._list_all(self.helper.api.location.list, "Country"):
+                # Countries are referenced by the id generated from the victim country
+                names = [country["name"]] + (country.get("x_opencti_aliases") or [])
+                ids = [pycti.Location.generate_id(name, "Country") for name in names]
+                ids += [country["standard_id"]] + (
+                    country.get("x_opencti_stix_ids") or []
+                )
+                for country_id in ids:
+                    self.country_ids[country_id] = country["standard_id"]
+
+            for sector in self._list_all(self.helper.api.identity.list, "Sector"):
+                names = [sector["name"]] + (sector.get("x_opencti_aliases") or [])
+                for name in names:
+                    self.sector_ids.setdefault(
+                        normalize_name(name), sector["standard_id"]
+                    )
+        except Exception as e:
+            self.helper.log_error("Error loading countries and sectors")
+            self.helper.log_error(str(e))
+        self.helper.log_info(
+            f"Loaded {len(self.country_ids)} country ids and {len(self.sector_ids)} sector names"
+        )
+
+    def country_id(self, country):
+        """Returns the standard id of an existing country, None if not found"""
+        return self.country_ids.get(pycti.Location.generate_id(country, "Country"))
+
+    def sector_id(self, sector):
+        """Returns the standard id of an existing sector, None if not found"""
+        if not sector:
+            return None
+        if sector in self.sector_matches:
+            return self.sector_matches[sector]
+
+        name = normalize_name(sector)
+        sector_id = self.sector_ids.get(name)
+        if sector_id is None:
+            for word in name.split(" "):
+                if word not in SECTOR_STOP_WORDS and word in self.sector_ids:
+                    sector_id = self.sector_ids[word]
+                    break
+        # Misses are kept as well
+        self.sector_matches[sector] = sector_id
+        return sector_id
@@ -2,13 +2,14 @@ import datetime as dt
 import os
 import sys
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import pycti
 import requests
 import tldextract
 import validators
-import whois
 from pycti import OpenCTIConnectorHelper
 from pydantic import TypeAdapter, ValidationError
 from stix2 import (
@@ -26,6 +27,12 @@ from stix2 import (
     ThreatActor,
 )
 
+from .domain_resolver import DomainResolver
+from .opencti_resolver import OpenCTIResolver
+
+# Number of monthly victim lists downloaded at once during the historic collection
+HISTORIC_MONTH_WORKERS = 4
+
 
 class RansomwareAPIConnector:
     """Specific external-import connector
@@ -98,6 +105,18 @@ class RansomwareAPIConnector:
             self.helper.log_warning(msg)
             self.create_threat_actor = "false"
 
+        self.opencti_resolver = OpenCTIResolver(self.helper)
+        self.domain_resolver = DomainResolver(
+            self.helper,
+            cache_path=os.environ.get(
+                "CONNECTOR_DOMAIN_CACHE_PATH", "/data/domain_cache.db"
+            ),
+            ttl=int(os.environ.get("CONNECTOR_DOMAIN_CACHE_TTL", 168)) * 3600,
+            workers=int(os.environ.get("CONNECTOR_DOMAIN_RESOLVER_WORKERS", 8)),
+            dns_rate=float(os.environ.get("CONNECTOR_DNS_RATE_LIMIT", 10)),
+            whois_rate=float(os.environ.get("CONNECTOR_WHOIS_RATE_LIMIT", 2)),
+        )
+
     # Generates a group description from the ransomware.live API data
     def threat_description_generator(self, group_name, group_data):
 
@@ -156,61 +175,19 @@ class RansomwareAPIConnector:
 
     # Fetches the IP address of a domain
     def ip_fetcher(self, domain):
-
-        try:
-            params = {"name": domain, "type": "A"}
-
-            headers = {"accept": "application/json", "User-Agent": "OpenCTI"}
-
-            response = requests.get(
-                "https://dns.google/resolve",
-                headers=headers,
-                params=params,
-                timeout=(20000, 20000),
-            )
-
-            if response.status_code == 200:
-                response_json = response.json()
-                if response_json.get("Answer") is not None:
-                    for item in response_json.get("Answer"):
-                        if item.get("type") == 1 and self.is_ipv4(item.get("data")):
-                            ip_address = item.get("data")
-                            return ip_address
-            return None
-        except Exception as e:
-
-            self.helper.log_error(f"Error fetching IP address{domain}")
-            self.helper.log_error(str(e))
-            return None
+        return self.domain_resolver.get_ip(domain)
 
     # Fetches the whois information of a domain
     def fetch_country_domain(self, domain):
-        try:
-            w = whois.whois(domain)
-        except Exception as e:
-            self.helper.log_error(f"Error fetching WHOIS for domain {domain}")
-            self.helper.log_error(str(e))
-            return None
-
-        try:
-            description = f"Domain:{domain}  \n"
-            # Using whois data from w instead of response_json
-            if w is not None:
-                if w.get("country") is not None:
-                    description += f" is registered in {w.get('country')}  \n"
-                if w.get("registrar") is not None:
-                    description += f"registered with {w.get('registrar')}  \n"
-                if w.get("creation_date") is not None:
-                    description += f" creation_date {w.get('creation_date')}  \n"
-                if w.get("expiration_date") is not None:
-                    description += f" expiration_date {w.get('expiration_date')}  \n"
-
-        except Exception as e:
-            self.helper.log_error(f"Error fetching whois for domain {domain}")
-            self.helper.log_error(str(e))
-            return None
+        return self.domain_resolver.get_description(domain)
 
-        return description
+    # Extracts the domain name of a victim, as done when generating its STIX objects
+    def victim_domain(self, item):
+        if self.is_domain(item.get("victim")):
+            return self.domain_extractor(item.get("victim"))
+        if item.get("domain") != "" and item.get("domain") is not None:
+            return self.domain_extractor(item.get("domain"))
+        return None
 
     # Extracts the domain from a URL
     def domain_extractor(self, url):
@@ -228,85 +205,11 @@ class RansomwareAPIConnector:
 
     # Fetches the location object from OpenCTI
     def opencti_location_check(self, country):
-        country_id = pycti.Location.generate_id(country, "Country")
-        try:
-            country_out = self.helper.api.stix_domain_object.read(id=country_id)
-            if country_out and country_out.get("standard_id").startswith("location--"):
-                return country_out.get("standard_id")
-            return None
-        except Exception as e:
-            self.helper.log_error(f"Error fetching location{country}")
-            self.helper.log_error(str(e))
-            return None
+        return self.opencti_resolver.country_id(country)
 
+    # Fetches the sector object from OpenCTI
     def sector_fetcher(self, sector):
-        if sector == "":
-            return None
-        try:
-            sectors_split = []
-            rubbish = [" and ", " or ", " ", ";"]
-            for item in rubbish:
-                sector = " ".join(sector.split(item))
-
-            sectors_split = sector.split()
-            for item in sectors_split:
-                if item in ("and", "or", ",", ", "):
-                    sectors_split.remove(item)
-                else:
-                    item2 = item.strip()
-                    sectors_split.remove(item)
-                    sectors_split.append(item2)
-
-            filtered_sectors = [
-                {"key": "entity_type", "values": ["Sector"], "operator": "eq"},
-            ]
-            for sub_sector in sectors_split:
-                sub_filter = {
-                    "key": "name",
-                    "values": [sub_sector],
-                    "mode": "or",
-                    "operator": "eq",
-                }
-                filtered_sectors.append(sub_filter)
-
-            sector_out = self.helper.api.identity.read(
-                filters={
-                    "mode": "and",
-                    "filters": [
-                        {
-                            "key": "entity_type",
-                            "values": ["Sector"],
-                            "operator": "eq",
-                        },
-                    ],
-                    "filterGroups": [
-                        {
-                            "mode": "or",
-                            "filters": [
-                                {
-                                    "key": "name",
-                                    "values": sector,
-                                    "operator": "eq",
-                                },
-                                {
-                                    "key": "x_opencti_aliases",
-                                    "values": sector,
-                                    "operator": "eq",
-                                },
-                            ],
-                            "filterGroups": [],
-                        }
-                    ],
-                },
-            )
-            if sector_out and sector_out.get("standard_id").startswith("identity--"):
-                return sector_out.get("standard_id")
-            return None
-
-        except Exception as e:
-            self.helper.log_error(f"Error fetching sector{sector}")
-            self.helper.log_error(str(e))
-            return None
+        return self.opencti_resolver.sector_id(sector)
 
     def ip_object_creator(self, ip):
         try:
@@ -711,6 +614,9 @@ class RansomwareAPIConnector:
             self.helper.log_error(str(e))
             group_data = []
 
+        # fetching existing countries and sectors
+        self.opencti_resolver.load()
+
         current_year = int(dt.date.today().year)
         # Checking if the historic year is less than 2020 as there is no data past 2020
         if int(self.get_historic_year) < 2020:
@@ -721,16 +627,39 @@ class RansomwareAPIConnector:
         stix_objects = []
         bundle = []
 
-        for year in range(year, current_year + 1):  # Looping through the years
-            year_url = base_url + str(year)
-            for month in range(1, 13):  # Looping through the months
-                url = year_url + "/" + str(month)
-                response = requests.get(url, headers=headers, timeout=(20000, 20000))
+        # Looping through the months of the years, downloaded in advance
+        urls = [
+            base_url + str(year) + "/" + str(month)
+            for year in range(year, current_year + 1)
+            for month in range(1, 13)
+        ]
+
+        def fetch_month(url):
+            return requests.get(url, headers=headers, timeout=(20000, 20000))
+
+        def iter_months(executor):
+            # Only a bounded number of months are downloaded ahead of the one
+            # being processed, so responses do not pile up in memory
+            pending = deque()
+            for url in urls:
+                pending.append(executor.submit(fetch_month, url))
+                if len(pending) > HISTORIC_MONTH_WORKERS:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+        with ThreadPoolExecutor(max_workers=HISTORIC_MONTH_WORKERS) as executor:
+            for response in iter_months(executor):
 
                 try:
                     if response.status_code == 200:
                         response_json = response.json()
 
+                        # Resolving the victim domains of the month concurrently
+                        self.domain_resolver.prefetch(
+                            self.victim_domain(item) for item in response_json
+                        )
+
                         for item in response_json:
 
                             try:
@@ -792,12 +721,16 @@ class RansomwareAPIConnector:
             self.helper.log_error(str(e))
             group_data = []
 
+        # fetching existing countries and sectors
+        self.opencti_resolver.load()
+
         # fetching recent requests
         try:
             response = requests.get(url, headers=headers, timeout=(20000, 20000))
             if response.status_code == 200:
                 response_json = response.json()
                 stix_objects = []
+                new_items = []
                 for item in response_json:
                     created = datetime.strptime(
                         item.get("discovered"), "%Y-%m-%d %H:%M:%S.%f"
@@ -809,36 +742,42 @@ class RansomwareAPIConnector:
                             int(last_run) - 84600
                         )  # pushing all the data from the last 24 hours
                     if time_diff > 0:
-                        bundle_list = self.stix_object_generator(
-                            item, group_data
-                        )  # calling the stix_object_generator method to create stix objects
+                        new_items.append(item)
 
-                        stix_objects.extend(bundle_list)
-                        bundle = None
-                        if bundle_list is None:
-                            self.helper.log_info("No new data to process")
+                # Resolving the victim domains concurrently
+                self.domain_resolver.prefetch(
+                    self.victim_domain(item) for item in new_items
+                )
 
-                        else:
+                for item in new_items:
+                    bundle_list = self.stix_object_generator(
+                        item, group_data
+                    )  # calling the stix_object_generator method to create stix objects
 
-                            # Deduplicate the objects
-                            bundle_list = self.helper.stix2_deduplicate_objects(
-                                bundle_list
-                            )
+                    stix_objects.extend(bundle_list)
+                    bundle = None
+                    if bundle_list is None:
+                        self.helper.log_info("No new data to process")
 
-                            self.helper.log_info(
-                                f"Sending {len(bundle_list)} STIX objects to OpenCTI..."
-                            )
+                    else:
 
-                            # Creating Bundle
-                            bundle = Bundle(
-                                objects=bundle_list, allow_custom=True
-                            ).serialize()
+                        # Deduplicate the objects
+                        bundle_list = self.helper.stix2_deduplicate_objects(bundle_list)
 
-                        if bundle is not None:
-                            self.helper.send_stix2_bundle(
-                                bundle,
-                                work_id=self.work_id,
-                            )
+                        self.helper.log_info(
+                            f"Sending {len(bundle_list)} STIX objects to OpenCTI..."
+                        )
+
+                        # Creating Bundle
+                        bundle = Bundle(
+                            objects=bundle_list, allow_custom=True
+                        ).serialize()
+
+                    if bundle is not None:
+                        self.helper.send_stix2_bundle(
+                            bundle,
+                            work_id=self.work_id,
+                        )
                 self.helper.log_info(
                     f"Sending {len(stix_objects)} STIX objects to OpenCTI..."
                 )
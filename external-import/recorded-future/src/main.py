@@ -16,6 +16,7 @@ import yaml
 from pycti import OpenCTIConnectorHelper, get_config_variable
 from rflib import (
     APP_VERSION,
+    DROPPED_ACTIONS,
     AnalystNote,
     RecordedFutureAlertConnector,
     RecordedFutureApiClient,
@@ -94,6 +95,57 @@ class BaseRFConnector:
             config,
             True,
         )
+        self.risk_list_store_path = get_config_variable(
+            "RECORDED_FUTURE_RISK_LIST_STORE_PATH",
+            ["rf", "risk_list_store_path"],
+            config,
+            default="/data/risk_list_fingerprints.db",
+        )
+        self.risk_list_dropped_action = get_config_variable(
+            "RECORDED_FUTURE_RISK_LIST_DROPPED_ACTION",
+            ["rf", "risk_list_dropped_action"],
+            config,
+            default="revoke",
+        ).lower()
+        if self.risk_list_dropped_action not in DROPPED_ACTIONS:
+            raise ValueError(
+                "Incorrect value in configuration parameter 'Risk list dropped action', "
+                "possible values: " + ",".join(DROPPED_ACTIONS)
+            )
+        self.risk_list_max_dropped_percent = get_config_variable(
+            "RECORDED_FUTURE_RISK_LIST_MAX_DROPPED_PERCENT",
+            ["rf", "risk_list_max_dropped_percent"],
+            config,
+            isNumber=True,
+            default=50,
+        )
+        self.risk_list_full_sync_interval = get_config_variable(
+            "RECORDED_FUTURE_RISK_LIST_FULL_SYNC_INTERVAL",
+            ["rf", "risk_list_full_sync_interval"],
+            config,
+            isNumber=True,
+            default=168,  # in Hours
+        )
+        self.risk_list_bundle_size = get_config_variable(
+            "RECORDED_FUTURE_RISK_LIST_BUNDLE_SIZE",
+            ["rf", "risk_list_bundle_size"],
+            config,
+            isNumber=True,
+            default=5000,
+        )
+        self.risk_list_workers = get_config_variable(
+            "RECORDED_FUTURE_RISK_LIST_WORKERS",
+            ["rf", "risk_list_workers"],
+            config,
+            isNumber=True,
+            default=os.cpu_count() or 1,
+        )
+        self.risk_list_below_threshold_as_dropped = get_config_variable(
+            "RECORDED_FUTURE_RISK_LIST_BELOW_THRESHOLD_AS_DROPPED",
+            ["rf", "risk_list_below_threshold_as_dropped"],
+            config,
+            default=False,
+        )
         self.rfapi = RFClient(
             self.rf_token,
             self.helper,
@@ -249,6 +301,13 @@ class RFConnector:
                 self.RF.risk_list_threshold,
                 self.RF.risklist_related_entities,
                 self.RF.rf_riskrules_as_label,
+                self.RF.risk_list_store_path,
+                self.RF.risk_list_dropped_action,
+                self.RF.risk_list_full_sync_interval,
+                self.RF.risk_list_bundle_size,
+                self.RF.risk_list_workers,
+                self.RF.risk_list_below_threshold_as_dropped,
+                self.RF.risk_list_max_dropped_percent,
             )
             self.risk_list.start()
         else:
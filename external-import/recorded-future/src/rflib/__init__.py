@@ -27,5 +27,5 @@ from .rf_to_stix2 import (
     Malware,
     StixNote,
 )
-from .risk_list import RiskList
+from .risk_list import DROPPED_ACTIONS, RiskList
 from .threat_map import ThreatMap
@@ -9,13 +9,17 @@
 ################################################################################
 """
 
+import contextlib
 import io
 import json
 import string
+from typing import Iterator
 from urllib import parse
 
 import requests
 import requests.exceptions
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 API_BASE = "https://api.recordedfuture.com"
 CONNECT_BASE = API_BASE + "/v2"
@@ -29,6 +33,15 @@ INSIKT_SOURCE = "VKz42X"
 THREAT_MAPS_PATH = API_BASE + "/threat/maps"
 LINKS_PATH = API_BASE + "/links/search"
 
+# Connect and read timeouts of the requests, in seconds
+TIMEOUT = (10, 300)
+RETRY = Retry(
+    total=3,
+    backoff_factor=2,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"],
+)
+
 ANALYST_NOTES_ENDPOINT = API_BASE + "/analyst-note"
 ANALYST_NOTES_SEARCH_ENDPOINT = API_BASE + "/analyst-note/search"
 ANALYST_NOTES_ATTACHMENT_ENDPOINT = API_BASE + "/analyst-note/attachment"
@@ -37,12 +50,14 @@ ANALYST_NOTES_ATTACHMENT_ENDPOINT = API_BASE + "/analyst-note/attachment"
 class RFClient:
     """class for talking to the RF API, specifically pulling analyst notes"""
 
-    def __init__(self, token, helper, header="PS_Custom_Script/0.0"):
+    def __init__(self, token, helper, header="PS_Custom_Script/0.0", timeout=TIMEOUT):
         """Inits function"""
         self.token = token
         self.headers = {"X-RFToken": token, "User-Agent": header}
+        self.timeout = timeout
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(max_retries=RETRY))
         self.helper = helper
 
     def get_analyst_notes(
@@ -189,9 +204,9 @@ class RFClient:
         Returns
             The body of the file as a string
         """
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
-        res = self.session.get(FUSION_FILE_BASE, params={"path": path})
+        res = self.session.get(
+            FUSION_FILE_BASE, params={"path": path}, timeout=self.timeout
+        )
         res.raise_for_status()
         return res.text
 
@@ -206,11 +221,23 @@ class RFClient:
             ret.add(entity["entity"])
         return ret
 
-    def get_risk_list_CSV(self, path: string) -> io.StringIO:
-        res = self.get_fusion_file(path)
-        buffer = io.StringIO(res)
-
-        return buffer
+    @contextlib.contextmanager
+    def stream_risk_list_CSV(self, path: str) -> Iterator[io.TextIOBase]:
+        """Streams a risk list CSV file
+        Args:
+            * path: fusion file path
+        Returns
+            A text stream decoding the CSV on the fly from the HTTP response
+        """
+        with self.session.get(
+            FUSION_FILE_BASE,
+            params={"path": path},
+            stream=True,
+            timeout=self.timeout,
+        ) as res:
+            res.raise_for_status()
+            res.raw.decode_content = True
+            yield io.TextIOWrapper(res.raw, encoding="utf-8", newline="")
 
     def get_risk_score(self, type: str, value: str) -> int:
         """Gets risk score for an indicator
@@ -123,6 +123,22 @@ class Indicator(RFStixEntity):
         )
         pass
 
+    def create_dropped_indicator(self, revoked, risk_score=None):
+        """Creates the indicator of a value which dropped off its risk list"""
+        return stix2.Indicator(
+            id=pycti.Indicator.generate_id(self._create_pattern()),
+            name=self.name,
+            pattern_type="stix",
+            pattern=self._create_pattern(),
+            revoked=revoked,
+            created_by_ref=self.author.id,
+            object_marking_refs=self.tlp,
+            custom_properties={
+                "x_opencti_score": risk_score,
+                "x_opencti_main_observable_type": self._add_main_observable_type_to_indicators(),
+            },
+        )
+
     def add_description(self, description):
         self.description = description
 
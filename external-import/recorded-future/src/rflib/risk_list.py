@@ -1,9 +1,87 @@
 import csv
-import re
+import json
+import multiprocessing
 import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from itertools import islice
 
 from .constants import RISK_LIST_TYPE_MAPPER, RISK_RULES_MAPPER
+from .risk_list_store import RiskListFingerprintStore, row_fingerprint
+
+# Number of rows checked against the fingerprint store and converted at once
+ROW_CHUNK_SIZE = 1000
+
+RISK_RULES_BY_SCORE = {rule["rule_score"]: rule for rule in RISK_RULES_MAPPER}
+RISK_RULES_DESCRIPTION_HEADER = (
+    "Triggered risk rules:"
+    + "\n\n"
+    + "|Rule|Risk Rule Severity|Risk Score Severity|"
+    + "\n"
+    + "|--|--|--|"
+    + "\n"
+)
+
+DROPPED_ACTION_REVOKE = "revoke"
+DROPPED_ACTION_DECAY = "decay"
+DROPPED_ACTION_NONE = "none"
+DROPPED_ACTIONS = (DROPPED_ACTION_REVOKE, DROPPED_ACTION_DECAY, DROPPED_ACTION_NONE)
+
+
+def parse_risk_rules(row):
+    """Builds the risk rules description table and the labels of a row"""
+    criticality_list = row["RuleCriticality"].strip("][").split(",")
+    risk_rules_list = row["RiskRules"].strip("][").replace('"', "").split(",")
+
+    lines = []
+    labels = []
+    for rule_name, criticality in zip(risk_rules_list, criticality_list):
+        # If criticality comes with empty string, replace value at 0
+        corresponding_rule = RISK_RULES_BY_SCORE.get(int(criticality or 0))
+        if corresponding_rule is None:
+            continue
+        lines.append(
+            "|"
+            + "|".join(
+                [
+                    rule_name,
+                    corresponding_rule["severity"],
+                    corresponding_rule["risk_score"],
+                ]
+            )
+            + "|\n"
+        )
+        labels.append(rule_name)
+    return RISK_RULES_DESCRIPTION_HEADER + "".join(lines), labels
+
+
+def convert_risk_list_rows(key, rows, tlp, riskrules_as_label, related_entities):
+    """Converts a batch of risk list rows into serialized STIX objects
+
+    Module level so it can run in the worker processes of the risk list pool.
+    Returns a list of (name, objects, error) tuples, in the order of the rows.
+    """
+    results = []
+    for row in rows:
+        try:
+            # Convert into stix object
+            first_seen = row["FirstSeen"] if row["FirstSeen"] else None
+            indicator = RISK_LIST_TYPE_MAPPER[key]["class"](
+                row["Name"], key, tlp=tlp, first_seen=first_seen
+            )
+            description, labels = parse_risk_rules(row)
+            indicator.add_description(description)
+            if riskrules_as_label:
+                indicator.add_labels(labels)
+            indicator.map_data(row, tlp, related_entities)
+            indicator.build_bundle(indicator)
+            objects = [
+                json.loads(stix_object.serialize()) for stix_object in indicator.objects
+            ]
+            results.append((row["Name"], objects, None))
+        except Exception as err:
+            results.append((row["Name"], None, str(err)))
+    return results
 
 
 class RiskList(threading.Thread):
@@ -15,6 +93,13 @@ class RiskList(threading.Thread):
         risk_list_threshold,
         risklist_related_entities,
         riskrules_as_label,
+        store_path,
+        dropped_action=DROPPED_ACTION_REVOKE,
+        full_sync_interval=168,
+        bundle_size=5000,
+        workers=1,
+        below_threshold_as_dropped=False,
+        max_dropped_percent=50,
     ):
         threading.Thread.__init__(self)
         self.helper = helper
@@ -23,6 +108,22 @@ class RiskList(threading.Thread):
         self.risk_list_threshold = risk_list_threshold
         self.risklist_related_entities = risklist_related_entities
         self.riskrules_as_label = riskrules_as_label
+        self.store_path = store_path
+        self.dropped_action = dropped_action
+        self.full_sync_interval = full_sync_interval * 3600  # in hours
+        self.bundle_size = bundle_size
+        self.workers = workers
+        self.below_threshold_as_dropped = below_threshold_as_dropped
+        self.max_dropped_percent = max_dropped_percent
+
+        # Any change of these settings changes the generated objects
+        self.settings_signature = "|".join(
+            [
+                str(self.tlp),
+                str(self.riskrules_as_label),
+                ",".join(sorted(self.risklist_related_entities)),
+            ]
+        )
 
     def run(self):
         try:
@@ -43,99 +144,20 @@ class RiskList(threading.Thread):
                     "[CONNECTOR] Connector has never run..."
                 )
 
-            # Main process to pull risk lists
-            for key, risk_list_type in RISK_LIST_TYPE_MAPPER.items():
-                self.helper.connector_logger.info(
-                    f"[RISK LISTS] Pulling {key} risk lists"
-                )
-
-                csv_file = self.rfapi.get_risk_list_CSV(risk_list_type["path"])
-
-                # Friendly name will be displayed on OpenCTI platform
-                friendly_name = f"Recorded Future Risk List {key}"
-
-                work_id = self.helper.api.work.initiate_work(
-                    self.helper.connect_id,
-                    friendly_name,
-                )
-
-                reader = csv.DictReader(csv_file)
-                for row in reader:
-                    # Filtered by score with a threshold
-                    if self.risk_list_threshold is not None:
-                        try:
-                            row_risk_score = int(row["Risk"])
-                        except ValueError:
-                            row_risk_score = 0
-
-                        row_name = row["Name"]
-                        if row_risk_score < self.risk_list_threshold:
-                            self.helper.connector_logger.info(
-                                f"[RISK LIST] Ignoring indicator '{row_name}' as its risk score ({row_risk_score}) is lower than the defined risk list threshold ({self.risk_list_threshold})"
-                            )
-                            continue
-                    # Convert into stix object
-                    first_seen = row["FirstSeen"] if row["FirstSeen"] else None
-                    indicator = risk_list_type["class"](
-                        row["Name"], key, tlp=self.tlp, first_seen=first_seen
-                    )
-
-                    rule_criticality_list = (
-                        row["RuleCriticality"].strip("][").split(",")
-                    )
-                    risk_rules_list_str = row["RiskRules"].strip("][")
-                    risk_rules_list = re.sub(r"\"", "", risk_rules_list_str).split(",")
-                    description = (
-                        "Triggered risk rules:"
-                        + "\n\n"
-                        + "|Rule|Risk Rule Severity|Risk Score Severity|"
-                        + "\n"
-                        + "|--|--|--|"
-                        + "\n"
-                    )
-                    labels = []
-
-                    for index, criticality in enumerate(rule_criticality_list):
-                        # If criticality comes with empty string, replace value at 0
-                        if not criticality:
-                            criticality = 0
-
-                        criticality_score = int(criticality)
-
-                        for corresponding_rule in RISK_RULES_MAPPER:
-                            if criticality_score == corresponding_rule["rule_score"]:
-                                description += (
-                                    "|"
-                                    + risk_rules_list[index]
-                                    + "|"
-                                    + corresponding_rule["severity"]
-                                    + "|"
-                                    + corresponding_rule["risk_score"]
-                                    + "|"
-                                    + "\n"
-                                )
-                                labels.append(risk_rules_list[index])
-
-                    indicator.add_description(description)
-                    if self.riskrules_as_label:
-                        indicator.add_labels(labels)
-                    indicator.map_data(row, self.tlp, self.risklist_related_entities)
-                    indicator.build_bundle(indicator)
-                    # Create bundle
-                    bundle = indicator.to_stix_bundle()
-                    self.helper.connector_logger.info(
-                        "[RISK LISTS] Sending Bundle to server with "
-                        + str(len(bundle.objects))
-                        + " objects"
-                    )
-                    self.helper.send_stix2_bundle(
-                        bundle.serialize(),
-                        work_id=work_id,
-                    )
-
-                message = f"{self.helper.connect_name} connector successfully run for Risk List {key}."
-
-                self.helper.api.work.to_processed(work_id, message)
+            # The store is opened in this thread as SQLite connections can't be shared
+            # Workers are spawned as the connector process runs other threads
+            store = RiskListFingerprintStore(self.store_path)
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            try:
+                # Main process to pull risk lists
+                for key, risk_list_type in RISK_LIST_TYPE_MAPPER.items():
+                    self._process_risk_list(key, risk_list_type, store, executor)
+            finally:
+                executor.shutdown()
+                store.close()
 
             current_state = self.helper.get_state() or {}
             last_run_datetime = datetime.fromtimestamp(
@@ -146,3 +168,202 @@ class RiskList(threading.Thread):
 
         except Exception as err:
             self.helper.connector_logger.error(str(err))
+
+    def _process_risk_list(self, key, risk_list_type, store, executor):
+        run_id = store.next_run_id(key)
+        self.helper.connector_logger.info(f"[RISK LISTS] Pulling {key} risk lists")
+
+        # Friendly name will be displayed on OpenCTI platform
+        friendly_name = f"Recorded Future Risk List {key}"
+
+        work_id = self.helper.api.work.initiate_work(
+            self.helper.connect_id,
+            friendly_name,
+        )
+
+        full_sync = store.needs_full_sync(key, self.full_sync_interval)
+        if full_sync:
+            self.helper.connector_logger.info(
+                f"[RISK LISTS] Full sync of {key} risk list, every row is sent"
+            )
+
+        objects = {}
+        pending_rows = []
+        counts = {"new_or_changed": 0, "unchanged": 0, "dropped": 0}
+        seen_rows = 0
+
+        def flush():
+            if objects:
+                self._send_bundle(list(objects.values()), work_id)
+                objects.clear()
+            # Rows are only recorded once their objects have been sent
+            store.save(key, pending_rows, run_id)
+            pending_rows.clear()
+
+        # The CSV is parsed while it is downloaded
+        with self.rfapi.stream_risk_list_CSV(risk_list_type["path"]) as csv_file:
+            reader = csv.DictReader(csv_file)
+            while rows := list(islice(reader, ROW_CHUNK_SIZE)):
+                seen_rows += len(rows)
+                below_threshold = []
+                above_threshold = []
+                for row in rows:
+                    if self._is_above_threshold(row):
+                        above_threshold.append(row)
+                    else:
+                        below_threshold.append(row)
+                if not self.below_threshold_as_dropped:
+                    # Rows under the threshold are still on the list, they keep their previous state
+                    store.touch(key, [row["Name"] for row in below_threshold], run_id)
+                rows = above_threshold
+                fingerprints = {
+                    row["Name"]: row_fingerprint(row, self.settings_signature)
+                    for row in rows
+                }
+                stored_fingerprints = (
+                    {} if full_sync else store.get_fingerprints(key, list(fingerprints))
+                )
+
+                unchanged = []
+                changed_rows = []
+                for row in rows:
+                    if (
+                        stored_fingerprints.get(row["Name"])
+                        == fingerprints[row["Name"]]
+                    ):
+                        unchanged.append(row["Name"])
+                    else:
+                        changed_rows.append(row)
+                store.touch(key, unchanged, run_id)
+                counts["unchanged"] += len(unchanged)
+
+                risk_scores = {
+                    row["Name"]: self._risk_score(row) for row in changed_rows
+                }
+                failed = []
+                for name, row_objects, error in self._convert_rows(
+                    key, changed_rows, executor
+                ):
+                    if error is not None:
+                        self.helper.connector_logger.error(
+                            f"[RISK LISTS] Unable to convert '{name}': {error}"
+                        )
+                        failed.append(name)
+                        continue
+                    for stix_object in row_objects:
+                        objects[stix_object["id"]] = stix_object
+                    pending_rows.append((name, fingerprints[name], risk_scores[name]))
+                    counts["new_or_changed"] += 1
+
+                    if len(objects) >= self.bundle_size:
+                        flush()
+
+                # Failed rows are still on the list, they keep their previous fingerprint
+                # so they are converted again on the next run
+                store.touch(key, failed, run_id)
+
+        flush()
+
+        # The whole list was processed, anything not seen in this run dropped off,
+        # unless the list came back empty or short, which is rather an upstream issue
+        dropped = []
+        dropped_count, stored_count = store.count_dropped(key, run_id)
+        if dropped_count and (
+            seen_rows == 0
+            or dropped_count * 100 > stored_count * self.max_dropped_percent
+        ):
+            self.helper.connector_logger.warning(
+                f"[RISK LISTS] Too many indicators dropped off the {key} risk list, "
+                "skipping them until the list is complete again",
+                {
+                    "rows": seen_rows,
+                    "dropped": dropped_count,
+                    "stored": stored_count,
+                    "max_dropped_percent": self.max_dropped_percent,
+                },
+            )
+        else:
+            dropped = store.pop_dropped(key, run_id)
+        counts["dropped"] = len(dropped)
+        if self.dropped_action != DROPPED_ACTION_NONE:
+            for start in range(0, len(dropped), self.bundle_size):
+                dropped_objects = []
+                for name, risk in dropped[start : start + self.bundle_size]:
+                    try:
+                        dropped_objects.append(
+                            self._convert_dropped(key, risk_list_type, name, risk)
+                        )
+                    except Exception as err:
+                        self.helper.connector_logger.error(
+                            f"[RISK LISTS] Unable to convert dropped '{name}': {err}"
+                        )
+                self._send_bundle(dropped_objects, work_id)
+
+        if full_sync:
+            store.mark_full_sync(key)
+
+        self.helper.connector_logger.info(
+            f"[RISK LISTS] {key} risk list processed", counts
+        )
+        message = f"{self.helper.connect_name} connector successfully run for Risk List {key}."
+
+        self.helper.api.work.to_processed(work_id, message)
+
+    def _convert_rows(self, key, rows, executor):
+        """Converts the rows in the worker pool, split in one batch per worker"""
+        if not rows:
+            return []
+        batch_size = -(-len(rows) // self.workers)
+        futures = [
+            executor.submit(
+                convert_risk_list_rows,
+                key,
+                rows[start : start + batch_size],
+                self.tlp,
+                self.riskrules_as_label,
+                self.risklist_related_entities,
+            )
+            for start in range(0, len(rows), batch_size)
+        ]
+        return [result for future in futures for result in future.result()]
+
+    def _send_bundle(self, objects, work_id):
+        if not objects:
+            return
+        self.helper.connector_logger.info(
+            "[RISK LISTS] Sending Bundle to server with "
+            + str(len(objects))
+            + " objects"
+        )
+        self.helper.send_stix2_bundle(
+            self.helper.stix2_create_bundle(objects),
+            work_id=work_id,
+        )
+
+    @staticmethod
+    def _risk_score(row):
+        try:
+            return int(row["Risk"])
+        except ValueError:
+            return 0
+
+    def _is_above_threshold(self, row):
+        # Filtered by score with a threshold
+        if self.risk_list_threshold is None:
+            return True
+        row_risk_score = self._risk_score(row)
+        if row_risk_score < self.risk_list_threshold:
+            row_name = row["Name"]
+            self.helper.connector_logger.debug(
+                f"[RISK LIST] Ignoring indicator '{row_name}' as its risk score ({row_risk_score}) is lower than the defined risk list threshold ({self.risk_list_threshold})"
+            )
+            return False
+        return True
+
+    def _convert_dropped(self, key, risk_list_type, name, risk):
+        indicator = risk_list_type["class"](name, key, tlp=self.tlp)
+        if self.dropped_action == DROPPED_ACTION_DECAY:
+            return indicator.create_dropped_indicator(
+                revoked=False, risk_score=(risk or 0) // 2
+            )
+        return indicator.create_dropped_indicator(revoked=True)
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+# Columns of a risk list row that impact the generated STIX objects
+FINGERPRINT_COLUMNS = ["Risk", "RiskRules", "RuleCriticality", "FirstSeen", "Links"]
+
+
+def row_fingerprint(row: dict, settings: str) -> str:
+    """Hash of the relevant columns of a row and of the settings used to convert it"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(settings.encode("utf-8"))
+    for column in FINGERPRINT_COLUMNS:
+        digest.update(b"\x1f")
+        digest.update((row.get(column) or "").encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RiskListFingerprintStore:
+    """Local SQLite store of the rows emitted for each risk list
+
+    Keeps, for every risk list and indicator name, the fingerprint of the row that was
+    last sent to OpenCTI, so only new or changed rows are emitted on the next run and
+    indicators which dropped off the list can be detected.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                risk_list TEXT NOT NULL,
+                name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                risk INTEGER,
+                run_id INTEGER NOT NULL,
+                PRIMARY KEY (risk_list, name)
+            );
+            CREATE TABLE IF NOT EXISTS full_syncs (
+                risk_list TEXT PRIMARY KEY,
+                synced_at INTEGER NOT NULL
+            );
+            """
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def needs_full_sync(self, risk_list: str, full_sync_interval: int) -> bool:
+        """Whether every row of the list must be emitted again, whatever its fingerprint"""
+        result = self.connection.execute(
+            "SELECT synced_at FROM full_syncs WHERE risk_list = ?", (risk_list,)
+        ).fetchone()
+        return result is None or time.time() - result[0] >= full_sync_interval
+
+    def mark_full_sync(self, risk_list: str):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO full_syncs (risk_list, synced_at) VALUES (?, ?)",
+            (risk_list, int(time.time())),
+        )
+        self.connection.commit()
+
+    def next_run_id(self, risk_list: str) -> int:
+        result = self.connection.execute(
+            "SELECT MAX(run_id) FROM fingerprints WHERE risk_list = ?", (risk_list,)
+        ).fetchone()
+        return (result[0] or 0) + 1
+
+    def get_fingerprints(self, risk_list: str, names: list) -> dict:
+        """Stored fingerprints of the given names, indexed by name"""
+        fingerprints = {}
+        # Stay below the SQLite host parameters limit
+        for start in range(0, len(names), 500):
+            chunk = names[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            fingerprints.update(
+                self.connection.execute(
+                    "SELECT name, fingerprint FROM fingerprints "
+                    f"WHERE risk_list = ? AND name IN ({placeholders})",
+                    [risk_list, *chunk],
+                ).fetchall()
+            )
+        return fingerprints
+
+    def touch(self, risk_list: str, names: list, run_id: int):
+        """Flag unchanged rows as still present in the list"""
+        self.connection.executemany(
+            "UPDATE fingerprints SET run_id = ? WHERE risk_list = ? AND name = ?",
+            [(run_id, risk_list, name) for name in names],
+        )
+        self.connection.commit()
+
+    def save(self, risk_list: str, rows: list, run_id: int):
+        """Store the fingerprints of emitted rows, as (name, fingerprint, risk) tuples"""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO fingerprints "
+            "(risk_list, name, fingerprint, risk, run_id) VALUES (?, ?, ?, ?, ?)",
+            [
+                (risk_list, name, fingerprint, risk, run_id)
+                for name, fingerprint, risk in rows
+            ],
+        )
+        self.connection.commit()
+
+    def count_dropped(self, risk_list: str, run_id: int) -> tuple:
+        """Count, as (dropped, total), the rows absent from the given run and all the rows"""
+        return self.connection.execute(
+            "SELECT COALESCE(SUM(run_id != ?), 0), COUNT(*) FROM fingerprints "
+            "WHERE risk_list = ?",
+            (run_id, risk_list),
+        ).fetchone()
+
+    def pop_dropped(self, risk_list: str, run_id: int) -> list:
+        """Remove and return, as (name, risk) tuples, the rows absent from the given run"""
+        dropped = self.connection.execute(
+            "SELECT name, risk FROM fingerprints WHERE risk_list = ? AND run_id != ?",
+            (risk_list, run_id),
+        ).fetchall()
+        self.connection.execute(
+            "DELETE FROM fingerprints WHERE risk_list = ? AND run_id != ?",
+            (risk_list, run_id),
+        )
+        self.connection.commit()
+        return dropped
@@ -1,11 +1,14 @@
-import json
+import collections
 import os
 import sys
+import tempfile
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import boto3
+import ijson
 import pytz
 import stix2
 import yaml
@@ -44,6 +47,9 @@ ignored_keys = [
     "x_credit",
 ]
 
+# Files larger than this size are downloaded to disk instead of memory
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
 
 class S3Connector:
     def __init__(self):
@@ -97,6 +103,9 @@ class S3Connector:
         self.s3_interval = get_config_variable(
             "S3_INTERVAL", ["s3", "interval"], config, isNumber=True, default=5
         )
+        self.s3_workers = get_config_variable(
+            "S3_WORKERS", ["s3", "workers"], config, isNumber=True, default=4
+        )
 
         # Create the identity
         self.identity = None
@@ -214,14 +223,15 @@ class S3Connector:
 
         return parsed_metrics
 
-    def fix_bundle(self, bundle):
-        included_entities = []
-        ignored_entities = []
-        data = json.loads(bundle)
+    def fix_bundle(self, bundle_file):
+        # The file is parsed twice while streaming it,
+        # the relationships are checked against all the objects of the bundle
+        bundle_file.seek(0)
+        included_entities = set(ijson.items(bundle_file, "objects.item.id"))
+        ignored_entities = set()
         new_bundle_objects = []
-        for obj in data["objects"]:
-            included_entities.append(obj["id"])
-        for obj in data["objects"]:
+        bundle_file.seek(0)
+        for obj in ijson.items(bundle_file, "objects.item", use_float=True):
             for key in obj:
                 if (
                     key.startswith("x_")
@@ -299,7 +309,7 @@ class S3Connector:
             ):
                 continue
             if obj["type"] == "infrastructure" and obj["name"].startswith("cpe:"):
-                ignored_entities.append(obj["id"])
+                ignored_entities.add(obj["id"])
                 continue
             if (
                 obj["type"] == "relationship"
@@ -339,30 +349,51 @@ class S3Connector:
         new_bundle = self.helper.stix2_create_bundle(new_bundle_objects)
         return new_bundle
 
+    def list_object_keys(self):
+        # The bucket is listed by pages of 1000 keys
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.s3_bucket_name):
+            for o in page.get("Contents", []):
+                yield o.get("Key")
+
+    def download_bundle(self, key):
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as bundle_file:
+            self.s3_client.download_fileobj(self.s3_bucket_name, key, bundle_file)
+            return self.fix_bundle(bundle_file)
+
+    def send_bundle(self, key, download, work_id):
+        fixed_bundle = download.result()
+        self.helper.log_info("Sending file " + key)
+        self.helper.send_stix2_bundle(bundle=fixed_bundle, work_id=work_id)
+        self.helper.log_info("Deleting file " + key)
+        self.s3_client.delete_object(Bucket=self.s3_bucket_name, Key=key)
+
     def process(self):
         now = datetime.now(pytz.UTC)
-        objects = self.s3_client.list_objects(Bucket=self.s3_bucket_name)
-        if objects.get("Contents") is not None and len(objects.get("Contents")) > 0:
-            friendly_name = "S3 run @ " + now.astimezone(pytz.UTC).isoformat()
-            work_id = self.helper.api.work.initiate_work(
-                self.helper.connect_id, friendly_name
-            )
-            for o in objects.get("Contents"):
-                data = self.s3_client.get_object(
-                    Bucket=self.s3_bucket_name, Key=o.get("Key")
-                )
-                content = data["Body"].read()
-                self.helper.log_info("Sending file " + o.get("Key"))
-                fixed_bundle = self.fix_bundle(content)
-                self.helper.send_stix2_bundle(bundle=fixed_bundle, work_id=work_id)
-                self.helper.log_info("Deleting file " + o.get("Key"))
-                self.s3_client.delete_object(
-                    Bucket=self.s3_bucket_name, Key=o.get("Key")
-                )
+        work_id = None
+        processed = 0
+        # Files are downloaded and fixed by the workers while the previous ones are sent,
+        # in the order of the listing and with a bounded number of files in advance
+        pending = collections.deque()
+        with ThreadPoolExecutor(max_workers=self.s3_workers) as executor:
+            for key in self.list_object_keys():
+                if work_id is None:
+                    friendly_name = "S3 run @ " + now.astimezone(pytz.UTC).isoformat()
+                    work_id = self.helper.api.work.initiate_work(
+                        self.helper.connect_id, friendly_name
+                    )
+                pending.append((key, executor.submit(self.download_bundle, key)))
+                if len(pending) > 2 * self.s3_workers:
+                    self.send_bundle(*pending.popleft(), work_id)
+                    processed += 1
+            while pending:
+                self.send_bundle(*pending.popleft(), work_id)
+                processed += 1
 
+        if work_id is not None:
             message = (
                 "Connector successfully run ("
-                + str(len(objects.get("Contents")))
+                + str(processed)
                 + " file(s) have been processed"
             )
             self.helper.log_info(message)
@@ -44,6 +44,7 @@ class CustomConnector(ExternalImportConnector):
         self.api_key = os.environ.get("SHADOWSERVER_API_KEY", None)
         self.api_secret = os.environ.get("SHADOWSERVER_API_SECRET", None)
         self.marking = os.environ.get("SHADOWSERVER_MARKING", "TLP:CLEAR")
+        self.workers = int(os.environ.get("SHADOWSERVER_WORKERS") or 4)
 
         # Create incident Dict: create, severity, priority
         create_incident = os.environ.get("SHADOWSERVER_CREATE_INCIDENT", False)
@@ -101,6 +102,7 @@ class CustomConnector(ExternalImportConnector):
             api_key=self.api_key,
             api_secret=self.api_secret,
             marking_refs=self.marking,
+            workers=self.workers,
         )
 
         # Get support Report types
@@ -117,6 +119,7 @@ class CustomConnector(ExternalImportConnector):
             )
 
         if subscription_list and isinstance(subscription_list, list):
+            requests_params = []
             for subscription in subscription_list:
                 for days_lookback in range(self.lookback, -1, -1):
                     date = self.now - timedelta(days=days_lookback)
@@ -124,25 +127,25 @@ class CustomConnector(ExternalImportConnector):
                     self.helper.connector_logger.info(
                         f"Getting ({subscription}) reports from ({date_str})."
                     )
-
-                    report_list = shadowserver_api.get_report_list(
-                        date=date_str, type=subscription
-                    )
-
-                    self.helper.connector_logger.debug(
-                        f"Found {len(report_list)} reports."
-                    )
-                    for report in report_list:
-                        report_stix_objects = shadowserver_api.get_stix_report(
-                            report=report,
-                            api_helper=self.helper,
-                            incident=self.incident,
-                        )
-
-                        # Filter out duplicates and append to stix_objects.
-                        for stix_object in report_stix_objects:
-                            if stix_object not in stix_objects and stix_object:
-                                stix_objects.append(stix_object)
+                    requests_params.append({"date": date_str, "type": subscription})
+
+            reports = []
+            for report_list in shadowserver_api.get_report_lists(requests_params):
+                self.helper.connector_logger.debug(f"Found {len(report_list)} reports.")
+                reports.extend(report_list)
+
+            # Reports are downloaded and transformed by the workers.
+            stix_ids = set()
+            for report_stix_objects in shadowserver_api.get_stix_reports(
+                reports=reports,
+                api_helper=self.helper,
+                incident=self.incident,
+            ):
+                # Filter out duplicates and append to stix_objects.
+                for stix_object in report_stix_objects or []:
+                    if stix_object and stix_object.id not in stix_ids:
+                        stix_ids.add(stix_object.id)
+                        stix_objects.append(stix_object)
         # ===========================
         # === Add your code above ===
         # ===========================
@@ -2,15 +2,18 @@ import hashlib
 import hmac
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from json import JSONDecodeError
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
 from pycti import OpenCTIConnectorHelper
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
-from .constants import BASE_URL, LIMIT, TIMEOUT, TLP_MAP
+from .constants import BASE_URL, LIMIT, TIMEOUT, TLP_MAP, WORKERS
 from .stix_transform import ShadowserverStixTransformation
 from .utils import validate_date_format, validate_marking_refs
 
@@ -22,7 +25,13 @@ class ShadowserverAPI:
     This class interacts with the Shadowserver API to retrieve and process reports.
     """
 
-    def __init__(self, api_key: str, api_secret: str, marking_refs: str = "TLP:WHITE"):
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        marking_refs: str = "TLP:WHITE",
+        workers: int = WORKERS,
+    ):
         """
         Initializes a new instance of the API class.
 
@@ -30,6 +39,7 @@ class ShadowserverAPI:
             api_key (str): The API key for authentication.
             api_secret (str): The API secret for authentication.
             marking_refs (str, optional): The marking references. Defaults to "TLP:WHITE".
+            workers (int, optional): The number of reports downloaded concurrently. Defaults to WORKERS.
 
         Raises:
             ValueError: If marking_refs is invalid.
@@ -41,7 +51,13 @@ class ShadowserverAPI:
             self.marking_refs = TLP_MAP[marking_refs]
         else:
             raise ValueError(f"Invalid marking references: {marking_refs}")
+        self.workers = max(workers, 1)
+        # The session is shared by the workers, keep one connection per worker.
         self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=self.workers),
+        )
 
     def _generate_hmac(self, request: dict) -> Tuple[bytes, str]:
         """
@@ -189,3 +205,53 @@ class ShadowserverAPI:
             return stix_transformation.get_stix_objects()
         else:
             return None
+
+    def get_report_lists(
+        self, requests_params: List[Dict], limit: int = 1000
+    ) -> Iterator[List[Dict]]:
+        """
+        Retrieves concurrently the lists of reports of several dates and types.
+
+        Args:
+            requests_params (list): The 'date' and 'type' of each list to retrieve.
+            limit (int, optional): The maximum number of reports of each list. Defaults to 1000.
+
+        Returns:
+            iterator: The list of reports of each request, in the same order, empty if an error occurred.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for report_list in executor.map(
+                lambda params: self.get_report_list(limit=limit, **params),
+                requests_params,
+            ):
+                yield report_list or []
+
+    def get_stix_reports(
+        self,
+        reports: List[Dict],
+        api_helper: OpenCTIConnectorHelper,
+        limit: int = LIMIT,
+        incident: dict = {},
+        labels: List[str] = ["Shadowserver"],
+    ) -> Iterator[Optional[List]]:
+        """
+        Downloads and transforms concurrently several reports, see get_stix_report.
+
+        Args:
+            reports (list): The reports parameters containing 'id' and 'report' keys.
+            api_helper (OpenCTIConnectorHelper): The OpenCTI connector helper instance.
+            limit (int, optional): The maximum number of results to return. Defaults to LIMIT.
+            labels (list, optional): Labels to apply to the STIX objects. Defaults to ['Shadowserver'].
+
+        Returns:
+            iterator: The STIX objects of each report, in the same order, None if an error occurred.
+        """
+        get_stix_report = partial(
+            self.get_stix_report,
+            api_helper=api_helper,
+            limit=limit,
+            incident=incident,
+            labels=labels,
+        )
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(get_stix_report, reports)
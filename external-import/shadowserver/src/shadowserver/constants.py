@@ -7,6 +7,9 @@ REQUEST_DATE_FORMAT = "%Y-%m-%d"
 
 LIMIT = 1000
 
+# Number of reports downloaded and transformed concurrently
+WORKERS = 4
+
 TLP_MAP = {
     "TLP:CLEAR": TLP_WHITE,
     "TLP:WHITE": TLP_WHITE,
@@ -355,38 +355,6 @@ class ShadowserverStixTransformation:
                 f"Failed to create OpenCTI case: {self.report.get('id', None)}"
             )
 
-    def add_default_labels(self, stix_obj: dict):
-        """Adds default labels to the specified STIX object."""
-        self.helper.connector_logger.debug(
-            f"Adding default labels: {self.default_labels_id}"
-        )
-        for label_id in self.default_labels_id:
-            if isinstance(label_id, str) and stix_obj.get("id"):
-                self.add_label_to_stix_object(stix_obj, label_id)
-            else:
-                self.helper.connector_logger.error(f"Invalid label: {label_id}")
-
-    def add_label_to_stix_object(self, stix_obj, label_id):
-        """
-        A function that adds a label to a STIX object based on its type.
-
-        :param self: The object itself.
-        :param stix_obj: The STIX object to add a label to.
-        :param label_id: The ID of the label to add.
-        """
-        if "Stix-Domain-Object" in stix_obj.get("parent_types"):
-            self.helper.api.stix_domain_object.add_label(
-                id=stix_obj.get("id"), label_id=label_id
-            )
-        elif "Stix-Cyber-Observable" in stix_obj.get("parent_types"):
-            self.helper.api.stix_cyber_observable.add_label(
-                id=stix_obj.get("id"), label_id=label_id
-            )
-        else:
-            self.helper.connector_logger.error(
-                f"Invalid STIX object type: {stix_obj.get('parent_types')}"
-            )
-
     def create_author(self):
         """Creates the author of the report."""
         self.helper.connector_logger.debug("Creating author: Shadowserver Connector")
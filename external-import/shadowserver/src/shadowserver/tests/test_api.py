@@ -107,6 +107,23 @@ class TestShadowserverAPI:
         assert len(reports) > 0
         assert len(reports) == 5
 
+    def test_get_report_lists(self, shadow_server_api, mocker):
+        """Test the get_report_lists method keeps the order of the requests."""
+        mock_get_report_list = mocker.patch.object(shadow_server_api, "get_report_list")
+        mock_get_report_list.side_effect = lambda date, type, limit: (
+            [{"id": f"{type}-{date}"}] if type != "empty" else None
+        )
+        requests_params = [
+            {"date": self.default_date, "type": report_type}
+            for report_type in ["scan_ssl", "empty", "blocklist"]
+        ]
+        report_lists = list(shadow_server_api.get_report_lists(requests_params))
+        assert report_lists == [
+            [{"id": f"scan_ssl-{self.default_date}"}],
+            [],
+            [{"id": f"blocklist-{self.default_date}"}],
+        ]
+
     def test_get_report_id_invalid(self, shadow_server_api, mocker):
         """Test the get_report method with an invalid report ID."""
         mock_request = mocker.patch.object(shadow_server_api, "_request")
@@ -125,6 +142,16 @@ class TestShadowserverAPI:
                 report_id="test_report_id", report="invalid_report"
             )
 
+    def test_get_stix_reports(self, shadow_server_api, mocker):
+        """Test the get_stix_reports method keeps the order of the reports."""
+        mock_get_stix_report = mocker.patch.object(shadow_server_api, "get_stix_report")
+        mock_get_stix_report.side_effect = lambda report, **kwargs: [report["id"]]
+        reports = [{"id": f"report_{i}", "report": "blocklist"} for i in range(10)]
+        stix_reports = list(
+            shadow_server_api.get_stix_reports(reports=reports, api_helper=MagicMock())
+        )
+        assert stix_reports == [[report["id"]] for report in reports]
+
     def test_all_fixture_types(self, shadow_server_api, mocker):
 
         self.api_helper = MagicMock(spec=OpenCTIConnectorHelper)
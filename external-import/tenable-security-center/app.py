@@ -4,7 +4,7 @@
 It handles the initialization, data retrieval, transformation to STIX format, and sending of data to OpenCTI.
 """
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 import sys
@@ -269,6 +269,12 @@ if __name__ == "__main__":
             num_threads=config.tenable_security_center.num_threads,
             logger=helper.connector_logger,
             findings_min_severity=config.tenable_security_center.severity_min_level,
+            cve_cache_path=config.tenable_security_center.cve_cache_path,
+            cve_cache_max_age=(
+                timedelta(hours=config.tenable_security_center.cve_cache_max_age)
+                if config.tenable_security_center.cve_cache_max_age
+                else None
+            ),
         )
     except (
         Exception
@@ -279,6 +279,24 @@ class _ConfigLoaderTSCConfigYaml(ConfigLoaderTSCPort, _BaseLoaderConfigYaml):
             )
         )
 
+    @property
+    def _cve_cache_path(self) -> Optional[str]:
+        return _get_yaml_value(  # type: ignore[no-any-return]
+            yaml_path=["tsc", "cve_cache_path"],
+            yaml_file=self.filepath,
+            required=False,
+        )
+
+    @property
+    def _cve_cache_max_age(self) -> Optional[int]:
+        return _int_none(
+            _get_yaml_value(
+                yaml_path=["tsc", "cve_cache_max_age"],
+                yaml_file=self.filepath,
+                required=False,
+            )
+        )
+
     @property
     def _marking_definition(self) -> stix2.TLPMarking:
         tlp_as_str: str = str(
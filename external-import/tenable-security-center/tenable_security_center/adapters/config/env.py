@@ -234,6 +234,20 @@ class _ConfigLoaderTSCEnv(ConfigLoaderTSCPort, _BaseLoaderEnv):
             env_var="TSC_PROCESS_SYSTEMS_WITHOUT_VULNERABILITIES", required=True
         )
 
+    @property
+    def _cve_cache_path(self) -> Optional[str]:
+        return _get_config_variable_env(  # type: ignore[no-any-return]
+            env_var="TSC_CVE_CACHE_PATH", required=False
+        )
+
+    @property
+    def _cve_cache_max_age(self) -> Optional[int]:
+        return _int_none(
+            _get_config_variable_env(
+                env_var="TSC_CVE_CACHE_MAX_AGE", isNumber=True, required=False
+            )
+        )
+
     @property
     def _marking_definition(self) -> stix2.TLPMarking:
         tlp_as_str = _get_config_variable_env(
@@ -0,0 +1,143 @@
+"""Provide a persistent cache of the CVE details retrieved from Tenable Security Center."""
+
+import datetime
+import json
+import sqlite3
+from threading import Lock, local
+from typing import Any, NamedTuple, Optional
+
+
+class CVECacheStats(NamedTuple):
+    """Represent the cache hit statistics."""
+
+    hits: int
+    misses: int
+    refreshes: int
+    size: int
+
+
+class CVECache:
+    """Store the raw CVE responses on disk, so they are reused across runs and connector instances.
+
+    Entries are keyed by CVE id, along with the last modified datetime of the CVE and the datetime
+    they were fetched at. An entry is stale when the CVE may have been modified after it was fetched,
+    or when it is older than the maximum age.
+
+    Each thread uses its own connection to the SQLite database in WAL mode, so the threads
+    read the cache concurrently.
+    """
+
+    def __init__(self, path: str, max_age: Optional[datetime.timedelta] = None):
+        """Initialize the cache.
+
+        Args:
+            path(str): Path of the SQLite database file.
+            max_age(Optional[datetime.timedelta]): Maximum age of the entries, None to never expire them.
+
+        """
+        self.path = path
+        self.max_age = max_age
+        self._local = local()
+        self._stats_lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cves (
+                cve_id TEXT PRIMARY KEY,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                response TEXT NOT NULL
+            )
+            """
+        )
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the connection of the current thread."""
+        connection: Optional[sqlite3.Connection] = getattr(
+            self._local, "connection", None
+        )
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            self._local.connection = connection
+        return connection
+
+    def _is_stale(
+        self, fetched_at: float, modified_since: Optional[datetime.datetime]
+    ) -> bool:
+        fetched_datetime = datetime.datetime.fromtimestamp(
+            fetched_at, tz=datetime.timezone.utc
+        )
+        if modified_since is not None and modified_since > fetched_datetime:
+            return True
+        return (
+            self.max_age is not None
+            and datetime.datetime.now(datetime.timezone.utc) - fetched_datetime
+            > self.max_age
+        )
+
+    def get(
+        self, cve_id: str, modified_since: Optional[datetime.datetime] = None
+    ) -> Optional[dict[str, Any]]:
+        """Get the cached response of a CVE.
+
+        Args:
+            cve_id(str): The CVE id.
+            modified_since(Optional[datetime.datetime]): Datetime from which the CVE is known to have
+                possibly been modified, an entry fetched before is refreshed.
+
+        Returns:
+            The raw CVE response, None if not cached or stale.
+
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT fetched_at, response FROM cves WHERE cve_id = ?", (cve_id,)
+            )
+            .fetchone()
+        )
+        stale = row is not None and self._is_stale(row[0], modified_since)
+        with self._stats_lock:
+            if row is None:
+                self._misses += 1
+            elif stale:
+                self._refreshes += 1
+            else:
+                self._hits += 1
+        if row is None or stale:
+            return None
+        response: dict[str, Any] = json.loads(row[1])
+        return response
+
+    def put(
+        self, cve_id: str, response: dict[str, Any], last_modified: Optional[str]
+    ) -> None:
+        """Store the response of a CVE fetched now."""
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cves VALUES (?, ?, ?, ?)",
+            (
+                cve_id,
+                last_modified,
+                datetime.datetime.now(datetime.timezone.utc).timestamp(),
+                json.dumps(response),
+            ),
+        )
+        connection.commit()
+
+    def stats(self) -> CVECacheStats:
+        """Get the cache hit statistics since the cache was opened."""
+        size = self._connection().execute("SELECT COUNT(*) FROM cves").fetchone()[0]
+        with self._stats_lock:
+            return CVECacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                refreshes=self._refreshes,
+                size=size,
+            )
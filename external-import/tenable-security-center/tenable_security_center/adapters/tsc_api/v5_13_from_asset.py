@@ -5,8 +5,7 @@
 
 import datetime
 from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache, partial
-from threading import Lock
+from functools import partial
 from typing import TYPE_CHECKING, Any, Iterable, Optional
 from urllib.parse import urlencode
 
@@ -38,6 +37,7 @@ from tenable_security_center.ports.errors import (
     FindingRetrievalError,
 )
 
+from tenable_security_center.adapters.tsc_api.cve_cache import CVECache
 from tenable_security_center.adapters.tsc_api.v5_13_common import (
     CVEPydanticModel,
     FindingPydanticModel,
@@ -142,16 +142,21 @@ class _CVEAPI(CVEPort):
 
 class _CVEsAPI:  # pylint: disable=too-few-public-methods
 
-    def __init__(self, tsc_client: TenableSC, logger: "AppLogger", num_threads: int):
+    def __init__(
+        self,
+        tsc_client: TenableSC,
+        logger: "AppLogger",
+        num_threads: int,
+        cve_cache: CVECache,
+    ):
         self.logger = logger
         self.client = tsc_client
         self.num_threads = num_threads
-        self.lock = Lock()
+        self.cve_cache = cve_cache
 
     def _build_url(self, cve_id: str) -> str:
         return f"cve/{cve_id}"
 
-    @lru_cache(maxsize=65536)  # noqa: B019 # response as dict ~500Bytes => ~32MB
     def __fetch(self, cve_id: str) -> dict[str, Any]:
         """Fetch a CVE from the API."""
         try:
@@ -172,26 +177,57 @@ class _CVEsAPI:  # pylint: disable=too-few-public-methods
                 "Error while fetching data from Tenable Security Center."
             ) from e
 
-    def _fetch(self, cve_id: str) -> dict[str, Any]:
-        """Fetch a CVE from the API (thread safe)."""
-        with self.lock:
-            self.logger.debug(f"Fetching CVE {cve_id}.")
-            return self.__fetch(cve_id)
+    def _fetch(
+        self, cve_id: str, modified_since: Optional[datetime.datetime] = None
+    ) -> dict[str, Any]:
+        """Fetch a CVE from the cache, or from the API if not cached or stale (thread safe)."""
+        cve_response = self.cve_cache.get(cve_id, modified_since=modified_since)
+        if cve_response is None:
+            cve_response = self.__fetch(cve_id)
+            self.cve_cache.put(
+                cve_id,
+                cve_response,
+                last_modified=cve_response.get("descriptions", [{}])[-1].get(
+                    "publication_date"
+                ),
+            )
+        return cve_response
 
-    def _fetch_data_chunk(self, cve_ids: list[str]) -> Iterable[dict[str, Any]]:
+    def _fetch_data_chunk(
+        self, cve_ids: list[str], modified_since: Optional[datetime.datetime] = None
+    ) -> Iterable[dict[str, Any]]:
         """Fetch a chunk of data from the API."""
-        # we must disable pylint which thinks we are calling the self.__fetch method
-        cache_stats = (
-            self.__fetch.cache_info()  # pylint: disable=no-value-for-parameter
+        with ThreadPoolExecutor(self.num_threads) as executor:
+            cve_responses = list(
+                executor.map(
+                    partial(self._fetch, modified_since=modified_since), cve_ids
+                )
+            )
+
+        cache_stats = self.cve_cache.stats()
+        self.logger.debug(
+            "CVE cache stats",
+            {
+                "hits": cache_stats.hits,
+                "misses": cache_stats.misses,
+                "refreshes": cache_stats.refreshes,
+                "size": cache_stats.size,
+            },
         )
-        self.logger.debug(f"CVE Cache stats {cache_stats}")
+        return cve_responses
 
-        with ThreadPoolExecutor(self.num_threads) as executor:
-            return list(executor.map(self._fetch, cve_ids))
+    def fetch_cves(
+        self, cve_ids: list[str], modified_since: Optional[datetime.datetime] = None
+    ) -> Iterable[_CVEAPI]:
+        """Fetch and process the CVEs.
+
+        Args:
+            cve_ids(list[str]): The CVE ids.
+            modified_since(Optional[datetime.datetime]): Datetime from which the CVEs may have been
+                modified (i.e. the plugin modification datetime), cached CVEs fetched before are refreshed.
 
-    def fetch_cves(self, cve_ids: list[str]) -> Iterable[_CVEAPI]:
-        """Fetch and process the CVEs."""
-        for raw_cve in self._fetch_data_chunk(cve_ids):
+        """
+        for raw_cve in self._fetch_data_chunk(cve_ids, modified_since=modified_since):
             yield _CVEAPI.from_raw_response(raw_cve)
 
 
@@ -216,7 +252,9 @@ class _FindingAPI(FindingPort):
             cve_ids = self._pydantic_model.cve
             if cve_ids:
                 self.__cves = list(  # type: ignore[assignment]
-                    self._cves_api.fetch_cves(cve_ids)
+                    self._cves_api.fetch_cves(
+                        cve_ids, modified_since=self._pydantic_model.plugin_mod_date
+                    )
                 )
         else:
             self.logger.debug(
@@ -975,6 +1013,8 @@ class AssetsAPI(AssetsPort):
         logger: "AppLogger",
         num_threads: int,
         findings_min_severity: str,
+        cve_cache_path: str,
+        cve_cache_max_age: Optional[datetime.timedelta] = None,
     ):
         """Initialize the asset API."""
         self._since_datetime = since_datetime
@@ -1001,7 +1041,12 @@ class AssetsAPI(AssetsPort):
                 "Consider using >=5.13.0,<6.5.0 or another adapter."
             )
 
-        self._cves_api: _CVEsAPI = _CVEsAPI(self.client, self.logger, self.num_threads)
+        self._cves_api: _CVEsAPI = _CVEsAPI(
+            self.client,
+            self.logger,
+            self.num_threads,
+            CVECache(cve_cache_path, max_age=cve_cache_max_age),
+        )
         self._findings_api: _FindingsAPI = _FindingsAPI(
             tsc_client=self.client,
             logger=self.logger,
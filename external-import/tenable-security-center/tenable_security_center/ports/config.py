@@ -344,6 +344,26 @@ class ConfigLoaderTSCPort(ABC):
         """Process systems without vulnerabilities."""
         return self._process_systems_without_vulnerabilities
 
+    @property
+    @abstractmethod
+    def _cve_cache_path(self) -> Optional[str]: ...
+
+    @property
+    @_make_error_handler("Unable to retrieve CVE cache path in config")
+    def cve_cache_path(self) -> str:
+        """Path of the file caching the CVE details across runs."""
+        return self._cve_cache_path or "cve_cache.db"
+
+    @property
+    @abstractmethod
+    def _cve_cache_max_age(self) -> Optional[int]: ...
+
+    @property
+    @_make_error_handler("Unable to retrieve CVE cache max age in config")
+    def cve_cache_max_age(self) -> int:
+        """Maximum age in hours of the cached CVE details, 0 to never expire them."""
+        return self._cve_cache_max_age if self._cve_cache_max_age is not None else 168
+
 
 # we assume the abstract is already implemented to keep interface/port paradigm.
 class ConfigLoaderPort(ABC):  # noqa: B024
@@ -395,5 +415,7 @@ class ConfigLoaderPort(ABC):  # noqa: B024
                 "export_since": self.tenable_security_center.export_since,
                 "severity_min_level": self.tenable_security_center.severity_min_level,
                 "marking_definition": self.tenable_security_center.marking_definition,
+                "cve_cache_path": self.tenable_security_center.cve_cache_path,
+                "cve_cache_max_age": self.tenable_security_center.cve_cache_max_age,
             },
         }
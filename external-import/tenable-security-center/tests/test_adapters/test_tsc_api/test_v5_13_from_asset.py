@@ -1,6 +1,12 @@
 # isort:skip_file
 # pragma: no cover
-from tenable_security_center.adapters.tsc_api.v5_13_from_asset import _ScanResultsAPI
+import datetime
+
+from tenable_security_center.adapters.tsc_api.cve_cache import CVECache
+from tenable_security_center.adapters.tsc_api.v5_13_from_asset import (
+    _CVEsAPI,
+    _ScanResultsAPI,
+)
 
 from unittest.mock import Mock
 
@@ -34,3 +40,58 @@ def test_scan_results_api_get_scanned_assets_info_should_return_tuple_of_string(
     # The method should return a tuple of strings
     assert result[0] == "0.0.0.0"  # noqa: S101 # we use assert in unit test context
     assert result[1] == "1"  # noqa: S101
+
+
+def _make_cves_api(cache_path):
+    """Make a CVEs API with a mocked client and a CVE cache at the given path."""
+    tsc_api_client = Mock()
+    tsc_api_client._url = "https://tsc"
+    tsc_api_client._session.get.return_value.json.return_value = {
+        "primary_vuln_id": "CVE-2024-0001",
+        "descriptions": [{"publication_date": "2024-01-01T00:00:00Z"}],
+    }
+    return _CVEsAPI(
+        tsc_client=tsc_api_client,
+        logger=Mock(),
+        num_threads=2,
+        cve_cache=CVECache(str(cache_path)),
+    )
+
+
+def test_cves_api_should_reuse_cached_cves_across_instances(tmp_path):
+    """Test that the CVEs fetched by a previous run are read from the cache."""
+    # Given
+    # A CVE fetched once with a first instance
+    cache_path = tmp_path / "cve_cache.db"
+    _ = list(_make_cves_api(cache_path)._fetch_data_chunk(["CVE-2024-0001"]))
+
+    # When
+    # A new instance fetches the same CVE
+    api = _make_cves_api(cache_path)
+    result = list(api._fetch_data_chunk(["CVE-2024-0001"]))
+
+    # Then
+    # The CVE is returned without any request
+    assert result[0]["primary_vuln_id"] == "CVE-2024-0001"  # noqa: S101
+    api.client._session.get.assert_not_called()
+    assert api.cve_cache.stats().hits == 1  # noqa: S101
+
+
+def test_cves_api_should_refresh_cves_modified_since_cached(tmp_path):
+    """Test that a cached CVE is fetched again when it may have been modified since."""
+    # Given
+    # A CVE already cached
+    api = _make_cves_api(tmp_path / "cve_cache.db")
+    _ = list(api._fetch_data_chunk(["CVE-2024-0001"]))
+
+    # When
+    # The CVE is fetched for a finding whose plugin was modified after it was cached
+    modified_since = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+        minutes=1
+    )
+    _ = list(api._fetch_data_chunk(["CVE-2024-0001"], modified_since=modified_since))
+
+    # Then
+    # The CVE is requested again
+    assert api.client._session.get.call_count == 2  # noqa: S101
+    assert api.cve_cache.stats().refreshes == 1  # noqa: S101
@@ -1,5 +1,6 @@
 import csv
 import datetime
+import io
 import os
 import ssl
 import sys
@@ -17,6 +18,9 @@ from pycti import (
     get_config_variable,
 )
 
+# Number of objects sent in each bundle
+BUNDLE_SIZE = 5000
+
 
 class URLhaus:
     def __init__(self):
@@ -70,6 +74,22 @@ class URLhaus:
     def next_run(self, seconds):
         return
 
+    @staticmethod
+    def parse_date(value):
+        # The dates of the feed are formatted as '%Y-%m-%d %H:%M:%S'
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return parse(value)
+
+    def send_bundle(self, bundle_objects, work_id):
+        bundle = stix2.Bundle(objects=bundle_objects, allow_custom=True).serialize()
+        self.helper.send_stix2_bundle(
+            bundle,
+            update=self.update_existing_data,
+            work_id=work_id,
+        )
+
     def run(self):
         self.helper.log_info("Fetching URLhaus dataset...")
         while True:
@@ -113,17 +133,9 @@ class URLhaus:
                     time.sleep(60)
                     continue
 
-                image = response.read()
-                with open(
-                    os.path.dirname(os.path.abspath(__file__)) + "/data.csv",
-                    "wb",
-                ) as file:
-                    file.write(image)
-                fp = open(
-                    os.path.dirname(os.path.abspath(__file__)) + "/data.csv",
-                    "r",
-                )
-                rdr = csv.reader(filter(lambda row: row[0] != "#", fp))
+                # The csv is parsed while it is downloaded
+                fp = io.TextIOWrapper(response, encoding="utf-8", newline="")
+                rdr = csv.reader(line for line in fp if not line.startswith("#"))
                 bundle_objects = []
                 ## the csv-file hast the following columns
                 # id,dateadded,url,url_status,last_online,threat,tags,urlhaus_link,reporter
@@ -144,16 +156,20 @@ class URLhaus:
                 last_processed_entry_running_max = last_processed_entry
 
                 for i, row in enumerate(rdr):
-                    entry_date = parse(row[1])
+                    entry_date = self.parse_date(row[1])
 
                     if i % 5000 == 0:
                         self.helper.log_info(
                             f"Process entry {i} with dateadded='{entry_date.strftime('%Y-%m-%d %H:%M:%S')}'"
                         )
 
-                    # skip entry if newer events already processed in the past
+                    # stop at the entries already processed in the past,
+                    # the feed is ordered from the newest to the oldest entry
                     if last_processed_entry > entry_date.timestamp():
-                        continue
+                        self.helper.log_info(
+                            f"Entry {i} was already processed, stopping the import"
+                        )
+                        break
                     last_processed_entry_running_max = max(
                         entry_date.timestamp(), last_processed_entry_running_max
                     )
@@ -310,19 +326,12 @@ class URLhaus:
                                         bundle_objects.append(
                                             stix_threat_relation_observable
                                         )
+                    if len(bundle_objects) >= BUNDLE_SIZE:
+                        self.send_bundle(bundle_objects, work_id)
+                        bundle_objects = []
                 fp.close()
-                bundle = stix2.Bundle(
-                    objects=bundle_objects, allow_custom=True
-                ).serialize()
-                self.helper.send_stix2_bundle(
-                    bundle,
-                    update=self.update_existing_data,
-                    work_id=work_id,
-                )
-                if os.path.exists(
-                    os.path.dirname(os.path.abspath(__file__)) + "/data.csv"
-                ):
-                    os.remove(os.path.dirname(os.path.abspath(__file__)) + "/data.csv")
+                if bundle_objects:
+                    self.send_bundle(bundle_objects, work_id)
 
                 # Store the current timestamp as a last run
                 message = "Connector successfully run, storing last_run as " + str(
@@ -9,7 +9,7 @@ from vclib.util.config import (
     get_intersection_of_string_lists,
     get_time_until_next_run,
 )
-from vclib.util.memory_usage import reset_max_mem
+from vclib.util.memory_usage import MemoryProfiler
 
 from .config_variables import ConfigConnector
 from .connector_client import ConnectorClient
@@ -41,6 +41,7 @@ class ConnectorVulnCheck:
         self.helper = OpenCTIConnectorHelper(self.config.load)
         self.client = ConnectorClient(self.helper, self.config)
         self.converter_to_stix = ConverterToStix(self.helper)
+        self.memory_profiler = MemoryProfiler(self.helper.connector_logger)
 
     def _collect_intelligence(
         self, target_data_sources: list[DataSource], connector_state
@@ -113,8 +114,10 @@ class ConnectorVulnCheck:
             {"connector_name": self.helper.connect_name},
         )
 
-        # INFO: Reset state for tracking memory usage during large volume data-processing
-        reset_max_mem()
+        # INFO: Sample memory usage in the background during large volume data-processing
+        self.memory_profiler.start()
+        # Vulnerabilities and software are shared across the sources of a run only
+        self.converter_to_stix.reset_object_cache()
 
         try:
             # Get the current state
@@ -181,6 +184,8 @@ class ConnectorVulnCheck:
             sys.exit(0)
         except Exception as err:
             self.helper.connector_logger.error(str(err))
+        finally:
+            self.memory_profiler.stop()
 
     def _get_updated_state(
         self, target_data_sources: list[DataSource], current_state_datetime
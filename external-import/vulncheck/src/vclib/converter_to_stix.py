@@ -1,4 +1,5 @@
 import ipaddress
+from collections import OrderedDict
 from datetime import datetime
 
 import stix2
@@ -14,6 +15,9 @@ from pycti import (
     Vulnerability,
 )
 
+# Maximum number of interned objects, the least recently used are evicted
+OBJECT_CACHE_SIZE = 10000
+
 
 class ConverterToStix:
     """Provides methods for converting various types of input data into STIX 2.1 objects.
@@ -24,12 +28,58 @@ class ConverterToStix:
 
     REQUIREMENTS:
     - generate_id() for each entity from OpenCTI pycti library except observables
+
+    Vulnerabilities and software are interned in a run-scoped LRU cache keyed by their
+    deterministic id, so every source reuses (and enriches) the same objects while the
+    memory used by the cache stays bounded.
     """
 
     def __init__(self, helper):
         self.helper = helper
         self.external_reference = self.create_external_reference_vc()
         self.author = self.create_author_vc(self.external_reference)
+        self.object_cache = OrderedDict()
+
+    def reset_object_cache(self) -> None:
+        """Clear the interned objects, to be called at the start of every run"""
+        self.object_cache = OrderedDict()
+
+    def _intern(self, key, properties: dict, factory):
+        """Return the cached object for the key, merged with the given properties
+
+        Args:
+            key: Deterministic key of the object
+            properties (dict): Properties of the object built by the current source
+            factory (callable): Builds the STIX object from its properties
+
+        Returns:
+            The cached object if the properties add nothing, otherwise a new object
+            holding the cached properties updated with the new ones
+        """
+        cached = self.object_cache.get(key)
+        if cached is not None:
+            self.object_cache.move_to_end(key)
+            new_properties = {
+                name: value
+                for name, value in properties.items()
+                if value is not None and value != "" and cached.get(name) != value
+            }
+            if not new_properties:
+                return cached
+            properties = {
+                **{
+                    name: cached[name]
+                    for name in cached
+                    if name not in ("type", "spec_version")
+                },
+                **new_properties,
+            }
+        stix_object = factory(**properties)
+        self.object_cache[key] = stix_object
+        self.object_cache.move_to_end(key)
+        if len(self.object_cache) > OBJECT_CACHE_SIZE:
+            self.object_cache.popitem(last=False)
+        return stix_object
 
     @staticmethod
     def create_external_reference_vc() -> list[stix2.ExternalReference]:
@@ -256,29 +306,32 @@ class ConverterToStix:
         Examples:
             >>> create_vulnerability("CVE-2021-1234")
         """
-        external_ref = self.create_external_reference(
-            source_name=f"VulnCheck {cve}",
-            url=f"https://vulncheck.com/cve/{cve}",
+        vulnerability_id = Vulnerability.generate_id(cve)
+        cached = self.object_cache.get(vulnerability_id)
+        external_references = (
+            cached["external_references"]
+            if cached is not None
+            else [
+                self.create_external_reference(
+                    source_name=f"VulnCheck {cve}",
+                    url=f"https://vulncheck.com/cve/{cve}",
+                )
+            ]
         )
-        return (
-            stix2.Vulnerability(
-                id=Vulnerability.generate_id(cve),
-                name=cve,
-                description=description,
-                created_by_ref=self.author,
-                external_references=[external_ref],
-                object_marking_refs=[stix2.TLP_AMBER],
-                custom_properties=custom_properties,
-            )
-            if description != ""
-            else stix2.Vulnerability(
-                id=Vulnerability.generate_id(cve),
-                name=cve,
-                created_by_ref=self.author,
-                external_references=[external_ref],
-                object_marking_refs=[stix2.TLP_AMBER],
-                custom_properties=custom_properties,
-            )
+        properties = {
+            "id": vulnerability_id,
+            "name": cve,
+            "created_by_ref": self.author["id"],
+            "external_references": external_references,
+            "object_marking_refs": [stix2.TLP_AMBER["id"]],
+            **custom_properties,
+        }
+        if description != "":
+            properties["description"] = description
+        return self._intern(
+            vulnerability_id,
+            properties,
+            lambda **kwargs: stix2.Vulnerability(allow_custom=True, **kwargs),
         )
 
     def create_malware(
@@ -339,17 +392,20 @@ class ConverterToStix:
         Examples:
             >>> create_software("Windows", "Microsoft", "1.0" "cpe:/o:microsoft:windows")
         """
-        software = stix2.Software(
-            name=f"{vendor} {product}",
-            vendor=vendor,
-            version=version,
-            cpe=cpe,
-            object_marking_refs=[stix2.TLP_AMBER],
-            custom_properties={
+        name = f"{vendor} {product}"
+        # Software is an observable, its id is derived from these properties
+        return self._intern(
+            ("software", name, vendor, version, cpe),
+            {
+                "name": name,
+                "vendor": vendor,
+                "version": version,
+                "cpe": cpe,
+                "object_marking_refs": [stix2.TLP_AMBER["id"]],
                 "x_opencti_created_by_ref": self.author.id,
             },
+            lambda **kwargs: stix2.Software(allow_custom=True, **kwargs),
         )
-        return software
 
     def create_external_reference(
         self, source_name: str, url: str
@@ -1,8 +1,13 @@
 import gzip
 import json
+import multiprocessing
 import os
 import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
+import ijson
 import stix2
 import vclib.util.works as works
 from pycti import OpenCTIConnectorHelper
@@ -14,53 +19,52 @@ from vclib.util.config import (
     compare_config_to_target_scope,
 )
 from vclib.util.cpe import parse_cpe_uri
-from vclib.util.memory_usage import log_memory_usage
 from vclib.util.nvd import check_size_of_stix_objects, check_vuln_description
 from vulncheck_sdk.models.api_nvd20_cve import ApiNVD20CVE
 
 
-def _create_vuln(entity: ApiNVD20CVE, converter_to_stix, logger) -> stix2.Vulnerability:
-    logger.debug(
-        "[NIST NVD-2] Creating vulnerability object",
-        {"cve": entity.id},
-    )
+def _vulnerability_properties(entity: ApiNVD20CVE) -> dict:
+    """
+    Build the properties of the vulnerability of a CVE, as plain values which
+    can be sent from the worker processes to the main process
+    """
     description = (
         check_vuln_description(descriptions=entity.descriptions)
         if entity.descriptions is not None
         else ""
     )
+    properties = {"cve": entity.id, "description": description}
+    cvss_metric = None
     if entity.metrics is not None and entity.metrics.cvss_metric_v31 is not None:
-        cvss_data = entity.metrics.cvss_metric_v31[0].cvss_data
-        return converter_to_stix.create_vulnerability(
-            cve=entity.id,
-            description=description,
-            custom_properties={
-                "x_opencti_cvss_base_score": cvss_data.base_score,
-                "x_opencti_cvss_base_severity": cvss_data.base_severity,
-                "x_opencti_cvss_attack_vector": cvss_data.attack_vector,
-                "x_opencti_cvss_integrity_impact": cvss_data.integrity_impact,
-                "x_opencti_cvss_availability_impact": cvss_data.availability_impact,
-                "x_opencti_cvss_confidentiality_impact": cvss_data.confidentiality_impact,
-            },
-        )
+        cvss_metric = entity.metrics.cvss_metric_v31
     elif entity.metrics is not None and entity.metrics.cvss_metric_v30 is not None:
-        cvss_data = entity.metrics.cvss_metric_v30[0].cvss_data
-        return converter_to_stix.create_vulnerability(
-            cve=entity.id,
-            description=description,
-            custom_properties={
-                "x_opencti_cvss_base_score": cvss_data.base_score,
-                "x_opencti_cvss_base_severity": cvss_data.base_severity,
-                "x_opencti_cvss_attack_vector": cvss_data.attack_vector,
-                "x_opencti_cvss_integrity_impact": cvss_data.integrity_impact,
-                "x_opencti_cvss_availability_impact": cvss_data.availability_impact,
-                "x_opencti_cvss_confidentiality_impact": cvss_data.confidentiality_impact,
-            },
-        )
-    return converter_to_stix.create_vulnerability(
-        cve=entity.id,
-        description=description,
+        cvss_metric = entity.metrics.cvss_metric_v30
+    if cvss_metric is not None:
+        cvss_data = cvss_metric[0].cvss_data
+        properties["custom_properties"] = {
+            "x_opencti_cvss_base_score": cvss_data.base_score,
+            "x_opencti_cvss_base_severity": cvss_data.base_severity,
+            "x_opencti_cvss_attack_vector": cvss_data.attack_vector,
+            "x_opencti_cvss_integrity_impact": cvss_data.integrity_impact,
+            "x_opencti_cvss_availability_impact": cvss_data.availability_impact,
+            "x_opencti_cvss_confidentiality_impact": cvss_data.confidentiality_impact,
+        }
+    return properties
+
+
+def _describe_nistnvd2(entity: ApiNVD20CVE) -> dict:
+    return {
+        "vulnerability": _vulnerability_properties(entity),
+        "cpes": entity.vc_vulnerable_cpes or [],
+    }
+
+
+def _create_vuln(properties: dict, converter_to_stix, logger) -> stix2.Vulnerability:
+    logger.debug(
+        "[NIST NVD-2] Creating vulnerability object",
+        {"cve": properties["cve"]},
     )
+    return converter_to_stix.create_vulnerability(**properties)
 
 
 def _create_software(cpe: str, converter_to_stix, logger) -> stix2.Software:
@@ -93,20 +97,22 @@ def _create_rel_has(
     )
 
 
-def _extract_stix_from_nistnvd2(
-    entity: ApiNVD20CVE, target_scope: list[str], converter_to_stix, logger
+def _extract_stix_from_description(
+    description: dict, target_scope: list[str], converter_to_stix, logger
 ) -> list:
     result = []
     vuln = None
 
     if SCOPE_VULNERABILITY in target_scope:
         vuln = _create_vuln(
-            entity=entity, converter_to_stix=converter_to_stix, logger=logger
+            properties=description["vulnerability"],
+            converter_to_stix=converter_to_stix,
+            logger=logger,
         )
         result.append(vuln)
 
-    if SCOPE_SOFTWARE in target_scope and entity.vc_vulnerable_cpes is not None:
-        for cpe in entity.vc_vulnerable_cpes:
+    if SCOPE_SOFTWARE in target_scope:
+        for cpe in description["cpes"]:
             software = _create_software(
                 cpe=cpe, converter_to_stix=converter_to_stix, logger=logger
             )
@@ -122,6 +128,17 @@ def _extract_stix_from_nistnvd2(
     return result
 
 
+def _extract_stix_from_nistnvd2(
+    entity: ApiNVD20CVE, target_scope: list[str], converter_to_stix, logger
+) -> list:
+    return _extract_stix_from_description(
+        description=_describe_nistnvd2(entity),
+        target_scope=target_scope,
+        converter_to_stix=converter_to_stix,
+        logger=logger,
+    )
+
+
 def _process_nist_nvd2_json(
     converter_to_stix,
     logger,
@@ -138,7 +155,6 @@ def _process_nist_nvd2_json(
                 {"item": item},
             )
             continue
-        log_memory_usage(logger)
         result.extend(
             _extract_stix_from_nistnvd2(
                 entity=entity,
@@ -150,6 +166,72 @@ def _process_nist_nvd2_json(
     return result
 
 
+# Number of CVE items validated and converted by a worker in one task
+BACKUP_CHUNK_SIZE = 500
+
+
+class _ChunkLogger:
+    """
+    Logger of the worker processes, which keep the warnings and errors to be
+    logged by the connector logger of the main process
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def debug(self, message, meta=None):
+        pass
+
+    def info(self, message, meta=None):
+        pass
+
+    def warning(self, message, meta=None):
+        self.records.append(("warning", message, meta))
+
+    def error(self, message, meta=None):
+        self.records.append(("error", message, meta))
+
+
+def _describe_backup_chunk(items: list) -> tuple[list, list]:
+    """
+    Validate a chunk of CVE items in a worker process
+
+    The CVEs are returned as plain properties, converted to STIX objects by the
+    main process so they go through the run-scoped object cache of its converter,
+    along with the (level, message, meta) records to log.
+    """
+    chunk_logger = _ChunkLogger()
+    descriptions = []
+    for item in items:
+        try:
+            entity = ApiNVD20CVE.model_validate(item["cve"])
+        except ValidationError as e:
+            chunk_logger.error(
+                f"Unable to validate JSON for NIST-NVD2 object, {e}",
+                {"item": item},
+            )
+            continue
+        descriptions.append(_describe_nistnvd2(entity))
+    return descriptions, chunk_logger.records
+
+
+def _iter_backup_chunks(filepath: str):
+    """
+    Stream the CVE items of every gz member of the backup, in chunks,
+    without loading a whole member in memory
+    """
+    with zipfile.ZipFile(filepath, "r") as zip_ref:
+        for file_name in zip_ref.namelist():
+            if file_name.endswith(".gz"):
+                with zip_ref.open(file_name) as gz_file:
+                    with gzip.open(gz_file) as json_file:
+                        items = ijson.items(
+                            json_file, "vulnerabilities.item", use_float=True
+                        )
+                        while chunk := list(islice(items, BACKUP_CHUNK_SIZE)):
+                            yield chunk
+
+
 def _collect_nist_nvd2_from_backup(
     filepath: str,
     target_scope: list[str],
@@ -172,29 +254,46 @@ def _collect_nist_nvd2_from_backup(
 
     logger.info("[NIST NVD-2] Parsing data into STIX objects")
 
-    with zipfile.ZipFile(filepath, "r") as zip_ref:
-        for file_name in zip_ref.namelist():
-            if file_name.endswith(".gz"):
-                with zip_ref.open(file_name) as gz_file:
-                    with gzip.open(gz_file) as json_file:
-                        stix_objects.extend(
-                            _process_nist_nvd2_json(
-                                converter_to_stix=converter_to_stix,
-                                logger=logger,
-                                target_scope=target_scope,
-                                data=json.load(json_file),
-                            )
-                        )
+    # Spawned workers do not inherit the helper threads of the connector
+    workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        # Keep a bounded number of chunks in flight so parsing does not
+        # run ahead of the conversion
+        pending = deque()
+
+        def collect_oldest():
+            nonlocal stix_objects, work_id, work_num
+            descriptions, records = pending.popleft().result()
+            for level, message, meta in records:
+                getattr(logger, level)(message, meta)
+            for description in descriptions:
+                stix_objects.extend(
+                    _extract_stix_from_description(
+                        description=description,
+                        target_scope=target_scope,
+                        converter_to_stix=converter_to_stix,
+                        logger=logger,
+                    )
+                )
+            stix_objects, work_id, work_num = check_size_of_stix_objects(
+                helper=helper,
+                logger=logger,
+                source_name=source_name,
+                stix_objects=stix_objects,
+                target_scope=target_scope,
+                work_id=work_id,
+                work_num=work_num,
+            )
 
-                        stix_objects, work_id, work_num = check_size_of_stix_objects(
-                            helper=helper,
-                            logger=logger,
-                            source_name=source_name,
-                            stix_objects=stix_objects,
-                            target_scope=target_scope,
-                            work_id=work_id,
-                            work_num=work_num,
-                        )
+        for chunk in _iter_backup_chunks(filepath):
+            pending.append(executor.submit(_describe_backup_chunk, chunk))
+            if len(pending) >= workers * 2:
+                collect_oldest()
+        while pending:
+            collect_oldest()
 
     if len(stix_objects) > 0:
         works.finish_work(
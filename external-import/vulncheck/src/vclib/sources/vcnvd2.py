@@ -13,7 +13,6 @@ from vclib.util.config import (
     compare_config_to_target_scope,
 )
 from vclib.util.cpe import parse_cpe_uri
-from vclib.util.memory_usage import log_memory_usage
 from vclib.util.nvd import check_size_of_stix_objects, check_vuln_description
 from vulncheck_sdk.models.api_nvd20_cve_extended import ApiNVD20CVEExtended
 
@@ -140,7 +139,6 @@ def _process_vc_nvd2_json(
                 {"item": item},
             )
             continue
-        log_memory_usage(logger)
         result.extend(
             _extract_stix_from_vcnvd2(
                 entity=entity,
@@ -1,23 +1,80 @@
 import os
+import threading
 
 import psutil
 
-max_mem = 0
+# Seconds between two memory samples
+DEFAULT_SAMPLE_INTERVAL = 30
 
 
-def log_memory_usage(logger=None):
-    global max_mem
+class MemoryProfiler:
+    """
+    Background memory profiler
 
-    process = psutil.Process(os.getpid())
-    initial_memory = process.memory_info().rss
-    memory_mb = initial_memory / (1024 * 1024)
-    if memory_mb > max_mem:
-        max_mem = memory_mb
-    log_string = f"Current: {memory_mb:.2f} MB -- Max: {max_mem:.2f} MB"
+    Samples the RSS of the connector process (and of its worker processes) on a
+    fixed interval from a daemon thread, and logs the current and peak values as gauges.
+    This replaces probing the process for every processed item.
+    """
 
-    print(log_string) if logger is None else logger.info(log_string)
+    def __init__(self, logger=None, interval: int = DEFAULT_SAMPLE_INTERVAL):
+        self.logger = logger
+        self.interval = interval
+        self.current_mb = 0.0
+        self.peak_mb = 0.0
+        self._process = psutil.Process(os.getpid())
+        self._stop_event = threading.Event()
+        self._thread = None
 
+    def _rss_mb(self) -> float:
+        rss = self._process.memory_info().rss
+        for child in self._process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                # Worker exited between listing and sampling
+                continue
+        return rss / (1024 * 1024)
 
-def reset_max_mem():
-    global max_mem
-    max_mem = 0
+    def sample(self) -> None:
+        self.current_mb = self._rss_mb()
+        if self.current_mb > self.peak_mb:
+            self.peak_mb = self.current_mb
+
+        log_string = "[MEMORY] Memory usage"
+        gauges = {
+            "current_mb": round(self.current_mb, 2),
+            "peak_mb": round(self.peak_mb, 2),
+        }
+        if self.logger is None:
+            print(log_string, gauges)
+        else:
+            self.logger.info(log_string, gauges)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.current_mb = 0.0
+        self.peak_mb = 0.0
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        # Final sample so every run reports its peak
+        self.sample()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -15,6 +15,14 @@ def start_work(helper: OpenCTIConnectorHelper, logger, work_name, work_num=None)
     return id
 
 
+def deduplicate_stix_objects(stix_objects: list) -> list:
+    """Keep a single occurrence of every object, in its latest (most complete) version"""
+    unique_objects = {}
+    for stix_object in stix_objects:
+        unique_objects[stix_object["id"]] = stix_object
+    return list(unique_objects.values())
+
+
 def finish_work(
     helper: OpenCTIConnectorHelper,
     logger,
@@ -23,9 +31,15 @@ def finish_work(
     work_name,
     work_num=None,
 ):
+    unique_stix_objects = deduplicate_stix_objects(stix_objects)
     logger.debug(
         "[WORKS] Bundling objects",
+        {
+            "objects": len(unique_stix_objects),
+            "duplicates": len(stix_objects) - len(unique_stix_objects),
+        },
     )
+    stix_objects = unique_stix_objects
     stix_objects_bundle = helper.stix2_create_bundle(stix_objects)
     logger.info(
         "[WORKS] Preparing to send bundle",
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Virustotal response cache module."""
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class ResponseCache:
+    """
+    Persistent TTL cache of VirusTotal responses.
+
+    Responses are stored in a SQLite database, keyed by endpoint and object id.
+    The freshness of a response depends on the root of its endpoint (files,
+    ip_addresses, domains, urls, yara_rulesets), a TTL of 0 disables the cache
+    for that endpoint.
+    """
+
+    def __init__(self, path: str, ttls: Dict[str, int]) -> None:
+        """
+        Initialize the cache.
+
+        Parameters
+        ----------
+        path : str
+            Path of the SQLite database.
+        ttls : dict
+            Time to live in seconds, indexed by endpoint root.
+        """
+        self.ttls = ttls
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                endpoint TEXT NOT NULL,
+                object_id TEXT NOT NULL,
+                response TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, object_id)
+            )
+            """
+        )
+        self.purge()
+
+    def _ttl(self, endpoint: str) -> int:
+        return self.ttls.get(endpoint.split("/")[0], 0)
+
+    def get(self, endpoint: str, object_id: str) -> Optional[dict]:
+        """
+        Retrieve a fresh response from the cache.
+
+        Returns
+        -------
+        dict or None
+            The cached response, None if absent or expired.
+        """
+        if self._ttl(endpoint) <= 0:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM responses "
+                "WHERE endpoint = ? AND object_id = ? AND expires_at > ?",
+                (endpoint, object_id, time.time()),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, endpoint: str, object_id: str, response: dict) -> None:
+        """Store a response, unless the cache is disabled for its endpoint."""
+        ttl = self._ttl(endpoint)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(endpoint, object_id, response, expires_at) VALUES (?, ?, ?, ?)",
+                (endpoint, object_id, json.dumps(response), time.time() + ttl),
+            )
+            self._connection.commit()
+
+    def purge(self) -> None:
+        """Remove the expired responses."""
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM responses WHERE expires_at <= ?", (time.time(),)
+            )
+            self._connection.commit()
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -11,12 +11,20 @@ from pycti import OpenCTIConnectorHelper
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
+from .cache import ResponseCache
+from .quota import QuotaLimiter
+
 
 class VirusTotalClient:
     """VirusTotal client."""
 
     def __init__(
-        self, helper: OpenCTIConnectorHelper, base_url: str, token: str
+        self,
+        helper: OpenCTIConnectorHelper,
+        base_url: str,
+        token: str,
+        cache: ResponseCache = None,
+        quota: QuotaLimiter = None,
     ) -> None:
         """Initialize Virustotal client."""
         self.helper = helper
@@ -27,6 +35,73 @@ class VirusTotalClient:
             "x-apikey": token,
             "accept": "application/json",
         }
+        self.cache = cache
+        self.quota = quota if quota is not None else QuotaLimiter()
+
+        # A single session is used so connections are kept alive between queries.
+        # Configure the adapter for the retry strategy.
+        retry_strategy = Retry(
+            total=3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["HEAD", "GET", "OPTIONS"],
+        )
+        adapter = HTTPAdapter(max_retries=retry_strategy)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
+
+    def get_usage(self) -> dict:
+        """
+        Report the cache and quota usage of the client.
+
+        Returns
+        -------
+        dict
+            Cache hits, misses and hit ratio, and quota usage.
+        """
+        usage = self.quota.usage()
+        if self.cache is not None:
+            usage |= {
+                "cache_hits": self.cache.hits,
+                "cache_misses": self.cache.misses,
+                "cache_hit_ratio": round(self.cache.hit_ratio, 2),
+            }
+        return usage
+
+    def _cached_query(self, endpoint, object_id, relationship=None, refresh=False):
+        """
+        Query the object of an endpoint, using the response cache if enabled.
+
+        Only successful responses are cached.
+
+        Parameters
+        ----------
+        endpoint : str
+            Endpoint of the object, relative to the api url.
+        object_id : str
+            Id of the object.
+        relationship : str
+            Relationship of the object to query instead of the object itself.
+        refresh : bool
+            Query the api even if the response is cached, and cache the new response.
+
+        Returns
+        -------
+        JSON or None
+            The result of the query, as JSON or None in case of failure.
+        """
+        url = f"{self.url}/{endpoint}/{object_id}"
+        if relationship is not None:
+            url = f"{url}/{relationship}"
+            endpoint = f"{endpoint}/{relationship}"
+        if self.cache is None:
+            return self._query(url)
+        results = None if refresh else self.cache.get(endpoint, object_id)
+        if results is None:
+            results = self._query(url)
+            if results is not None and "error" not in results:
+                self.cache.set(endpoint, object_id, results)
+        return results
 
     def _query(self, url):
         """
@@ -47,19 +122,11 @@ class VirusTotalClient:
         JSON or None
             The result of the query, as JSON or None in case of failure.
         """
-        # Configure the adapter for the retry strategy.
-        retry_strategy = Retry(
-            total=3,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        http = requests.Session()
-        http.mount("https://", adapter)
+        self.quota.acquire()
         response = None
         try:
-            response = http.get(
-                url, headers=self.headers | {"content-type": "application/json"}
+            response = self.session.get(
+                url, headers={"content-type": "application/json"}
             )
             response.raise_for_status()
         except requests.exceptions.HTTPError as errh:
@@ -100,22 +167,18 @@ class VirusTotalClient:
         files : json
             A JSON object with the files to be posted to VirusTotal.
         additional_headers : dict
-            Headers to be added to the self.headers with the request.
+            Headers to be added to the session headers with the request.
 
         Returns
         -------
         JSON or None
             The result of the query, as JSON or None in case of failure.
         """
+        self.quota.acquire()
         response = None
-        headers = (
-            self.headers
-            if additional_headers is None
-            else self.headers | additional_headers
-        )
         try:
-            response = requests.post(
-                url, data=data, files=files, headers=headers, timeout=60
+            response = self.session.post(
+                url, data=data, files=files, headers=additional_headers, timeout=60
             )
             response.raise_for_status()
         except requests.exceptions.HTTPError as errh:
@@ -143,7 +206,7 @@ class VirusTotalClient:
             self.helper.metric.inc("client_error_count")
             return None
 
-    def get_file_info(self, hash256) -> dict:
+    def get_file_info(self, hash256, refresh=False) -> dict:
         """
         Retrieve file information based on the given hash-256.
 
@@ -151,14 +214,15 @@ class VirusTotalClient:
         ----------
         hash256 : str
             Hash of the file to retrieve.
+        refresh : bool
+            Bypass the cached report, e.g. after the file was uploaded.
 
         Returns
         -------
         dict
             File object, see https://developers.virustotal.com/reference/files
         """
-        url = f"{self.url}/files/{hash256}"
-        return self._query(url)
+        return self._cached_query("files", hash256, refresh=refresh)
 
     def upload_artifact(self, artifact_name, artifact) -> str:
         """
@@ -194,8 +258,7 @@ class VirusTotalClient:
         dict
             YARA ruleset objects, see https://developers.virustotal.com/reference/yara-rulesets
         """
-        url = f"{self.url}/yara_rulesets/{ruleset_id}"
-        return self._query(url)
+        return self._cached_query("yara_rulesets", ruleset_id)
 
     def get_ip_info(self, ip):
         """
@@ -211,8 +274,7 @@ class VirusTotalClient:
         dict
             IP address object, see https://developers.virustotal.com/reference/ip-object
         """
-        url = f"{self.url}/ip_addresses/{ip}"
-        return self._query(url)
+        return self._cached_query("ip_addresses", ip)
 
     def get_domain_info(self, domain):
         """
@@ -228,10 +290,9 @@ class VirusTotalClient:
         dict
             Domain Object, see https://developers.virustotal.com/reference/domains-1
         """
-        url = f"{self.url}/domains/{domain}"
-        return self._query(url)
+        return self._cached_query("domains", domain)
 
-    def get_url_info(self, url):
+    def get_url_info(self, url, refresh=False):
         """
         Retrieve URL report based on the given URL.
 
@@ -239,17 +300,21 @@ class VirusTotalClient:
         ----------
         url : str
             Url.
+        refresh : bool
+            Bypass the cached report, e.g. after the URL was uploaded.
 
         Returns
         -------
         dict
             URL Object, see https://developers.virustotal.com/reference/url-object
         """
-        base64_url = f"{self.url}/urls/{VirusTotalClient.base64_encode_no_padding(url)}"
-        results = self._query(base64_url)
+        results = self._cached_query(
+            "urls", VirusTotalClient.base64_encode_no_padding(url), refresh=refresh
+        )
         if "error" in results:
-            sha256_url = f"{self.url}/urls/{hashlib.sha256(url.encode()).hexdigest()}"
-            results = self._query(sha256_url)
+            results = self._cached_query(
+                "urls", hashlib.sha256(url.encode()).hexdigest(), refresh=refresh
+            )
         return results
 
     def upload_url(self, url) -> str:
@@ -343,9 +408,11 @@ class VirusTotalClient:
         dict
             URL Object, see https://developers.virustotal.com/reference/url-object
         """
-        base64_url = f"{self.url}/urls/{VirusTotalClient.base64_encode_no_padding(url)}/{relationship}"
-        results = self._query(base64_url)
+        results = self._cached_query(
+            "urls", VirusTotalClient.base64_encode_no_padding(url), relationship
+        )
         if "error" in results:
-            sha256_url = f"{self.url}/urls/{hashlib.sha256(url.encode()).hexdigest()}/{relationship}"
-            results = self._query(sha256_url)
+            results = self._cached_query(
+                "urls", hashlib.sha256(url.encode()).hexdigest(), relationship
+            )
         return results
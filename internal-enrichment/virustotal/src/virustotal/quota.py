@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Virustotal quota module."""
+import collections
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+class QuotaLimiter:
+    """
+    Client side VirusTotal quota.
+
+    Keeps track of the requests sent in the last minute and during the current
+    day (VirusTotal daily quotas are reset at 00:00 UTC). Once a limit is reached,
+    requests wait for the quota to be available again instead of failing.
+    A limit of 0 disables it.
+    """
+
+    def __init__(self, per_minute: int = 0, per_day: int = 0, logger=None) -> None:
+        self.logger = logger
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.minute_usage = collections.deque()
+        self.day_usage = 0
+        self.waited = 0.0
+        self._day = self._today()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    @staticmethod
+    def _seconds_until_tomorrow() -> float:
+        now = datetime.now(timezone.utc)
+        tomorrow = datetime.combine(
+            now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc
+        )
+        return (tomorrow - now).total_seconds()
+
+    def _wait_time(self, now: float) -> float:
+        if self._today() != self._day:
+            self._day = self._today()
+            self.day_usage = 0
+        while self.minute_usage and now - self.minute_usage[0] >= 60:
+            self.minute_usage.popleft()
+
+        if self.per_day and self.day_usage >= self.per_day:
+            return self._seconds_until_tomorrow()
+        if self.per_minute and len(self.minute_usage) >= self.per_minute:
+            return 60 - (now - self.minute_usage[0])
+        return 0
+
+    def acquire(self) -> float:
+        """
+        Wait until a request can be sent and record it.
+
+        Returns
+        -------
+        float
+            Time waited, in seconds.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait_time = self._wait_time(now)
+                if wait_time <= 0:
+                    self.minute_usage.append(now)
+                    self.day_usage += 1
+                    self.waited += waited
+                    return waited
+            if self.logger is not None:
+                self.logger.info(
+                    f"[VirusTotal] Quota reached, waiting {round(wait_time)} seconds."
+                )
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def usage(self) -> dict:
+        with self._lock:
+            self._wait_time(time.monotonic())
+            return {
+                "minute_usage": len(self.minute_usage),
+                "minute_limit": self.per_minute,
+                "day_usage": self.day_usage,
+                "day_limit": self.per_day,
+                "waited_seconds": round(self.waited, 2),
+            }
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 """Virustotal client unittest."""
 import unittest
+from unittest.mock import MagicMock, patch
 
+from virustotal.cache import ResponseCache
 from virustotal.client import VirusTotalClient
+from virustotal.quota import QuotaLimiter
 
 
 class VirusTotalClientTest(unittest.TestCase):
@@ -11,3 +14,66 @@ class VirusTotalClientTest(unittest.TestCase):
             VirusTotalClient.base64_encode_no_padding("http://myetherevvalliet.com/"),
             "aHR0cDovL215ZXRoZXJldnZhbGxpZXQuY29tLw",
         )
+
+    def test_cached_query(self):
+        cache = ResponseCache(":memory:", {"files": 60, "domains": 0})
+        client = VirusTotalClient(MagicMock(), "https://vt/api/", "token", cache=cache)
+        with patch.object(
+            client, "_query", return_value={"data": {"id": "abc"}}
+        ) as query:
+            self.assertEqual(client.get_file_info("abc"), {"data": {"id": "abc"}})
+            self.assertEqual(client.get_file_info("abc"), {"data": {"id": "abc"}})
+            query.assert_called_once_with("https://vt/api/files/abc")
+
+            # The cache is disabled for domains
+            client.get_domain_info("example.com")
+            client.get_domain_info("example.com")
+            self.assertEqual(query.call_count, 3)
+
+        usage = client.get_usage()
+        self.assertEqual(usage["cache_hits"], 1)
+        self.assertEqual(usage["cache_misses"], 1)
+
+    def test_cached_query_errors_not_cached(self):
+        cache = ResponseCache(":memory:", {"files": 60})
+        client = VirusTotalClient(MagicMock(), "https://vt/api", "token", cache=cache)
+        with patch.object(
+            client, "_query", return_value={"error": {"code": "NotFoundError"}}
+        ) as query:
+            client.get_file_info("abc")
+            client.get_file_info("abc")
+            self.assertEqual(query.call_count, 2)
+
+    def test_file_info_refreshed_after_upload(self):
+        cache = ResponseCache(":memory:", {"files": 60})
+        client = VirusTotalClient(MagicMock(), "https://vt/api", "token", cache=cache)
+        pending = {"data": {"id": "abc", "attributes": {"last_analysis_stats": {}}}}
+        analyzed = {
+            "data": {
+                "id": "abc",
+                "attributes": {"last_analysis_stats": {"malicious": 3}},
+            }
+        }
+        with patch.object(
+            client, "_post", return_value={"data": {"id": "analysis-id"}}
+        ), patch.object(client, "_query", side_effect=[pending, analyzed]) as query:
+            analysis_id = client.upload_artifact("sample.exe", b"content")
+            self.assertEqual(analysis_id, "analysis-id")
+            # Lookup right after the upload, before the analysis completed
+            client.get_file_info("abc", refresh=True)
+            # Lookup once the analysis completed
+            self.assertEqual(client.get_file_info("abc", refresh=True), analyzed)
+            self.assertEqual(query.call_count, 2)
+
+        # The analyzed report replaced the pending one in the cache
+        self.assertEqual(client.get_file_info("abc"), analyzed)
+
+    def test_quota_waits_for_minute_limit(self):
+        quota = QuotaLimiter(per_minute=2)
+        with patch("virustotal.quota.time") as time_mock:
+            time_mock.monotonic.side_effect = [0, 1, 30, 60]
+            quota.acquire()
+            quota.acquire()
+            self.assertEqual(quota.acquire(), 30)
+            time_mock.sleep.assert_called_once_with(30)
+        self.assertEqual(quota.usage()["day_usage"], 3)
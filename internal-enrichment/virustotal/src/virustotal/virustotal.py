@@ -8,8 +8,10 @@ import yaml
 from pycti import Identity, OpenCTIConnectorHelper, get_config_variable
 
 from .builder import VirusTotalBuilder
+from .cache import ResponseCache
 from .client import VirusTotalClient
 from .indicator_config import IndicatorConfig
+from .quota import QuotaLimiter
 
 
 class VirusTotalConnector:
@@ -44,10 +46,56 @@ class VirusTotalConnector:
             confidence=self.helper.connect_confidence_level,
         )
 
-        self.client = VirusTotalClient(self.helper, self._API_URL, token)
+        # Cache of the VirusTotal responses, freshness in minutes per endpoint
+        cache_path = get_config_variable(
+            "VIRUSTOTAL_CACHE_PATH",
+            ["virustotal", "cache_path"],
+            config,
+            default="virustotal_cache.db",
+        )
+        cache_ttls = {
+            endpoint: get_config_variable(
+                f"VIRUSTOTAL_CACHE_TTL_{name.upper()}",
+                ["virustotal", f"cache_ttl_{name}"],
+                config,
+                isNumber=True,
+                default=default,
+            )
+            * 60
+            for endpoint, name, default in [
+                ("files", "file", 1440),
+                ("ip_addresses", "ip", 60),
+                ("domains", "domain", 60),
+                ("urls", "url", 60),
+                ("yara_rulesets", "yara", 10080),
+            ]
+        }
+        # Requests quota of the API key, 0 for no limit
+        quota = QuotaLimiter(
+            per_minute=get_config_variable(
+                "VIRUSTOTAL_QUOTA_PER_MINUTE",
+                ["virustotal", "quota_per_minute"],
+                config,
+                isNumber=True,
+                default=0,
+            ),
+            per_day=get_config_variable(
+                "VIRUSTOTAL_QUOTA_PER_DAY",
+                ["virustotal", "quota_per_day"],
+                config,
+                isNumber=True,
+                default=0,
+            ),
+            logger=self.helper.connector_logger,
+        )
 
-        # Cache to store YARA rulesets.
-        self.yara_cache = {}
+        self.client = VirusTotalClient(
+            self.helper,
+            self._API_URL,
+            token,
+            cache=ResponseCache(cache_path, cache_ttls),
+            quota=quota,
+        )
 
         # File/Artifact specific settings
         self.file_create_note_full_report = get_config_variable(
@@ -117,7 +165,7 @@ class VirusTotalConnector:
         """
         Retrieve yara ruleset.
 
-        If the yara is not in the cache, make an API call.
+        The client serves it from the response cache when it is still fresh.
 
         Returns
         -------
@@ -125,14 +173,7 @@ class VirusTotalConnector:
             YARA ruleset object.
         """
         self.helper.log_debug(f"[VirusTotal] Retrieving ruleset {ruleset_id}")
-        if ruleset_id in self.yara_cache:
-            self.helper.log_debug(f"Retrieving YARA ruleset {ruleset_id} from cache.")
-            ruleset = self.yara_cache[ruleset_id]
-        else:
-            self.helper.log_debug(f"Retrieving YARA ruleset {ruleset_id} from API.")
-            ruleset = self.client.get_yara_ruleset(ruleset_id)
-            self.yara_cache[ruleset_id] = ruleset
-        return ruleset
+        return self.client.get_yara_ruleset(ruleset_id)
 
     def _process_file(self, stix_objects, stix_entity, opencti_entity):
         json_data = self.client.get_file_info(self.resolve_default_value(stix_entity))
@@ -166,7 +207,9 @@ class VirusTotalConnector:
                     opencti_entity["importFiles"][0]["name"], artifact
                 )
                 # Attempting to get the file info immediately queues the artifact for more immediate analysis
-                self.client.get_file_info(self.resolve_default_value(stix_entity))
+                self.client.get_file_info(
+                    self.resolve_default_value(stix_entity), refresh=True
+                )
             except Exception as err:
                 raise ValueError(
                     "[VirusTotal] Error uploading artifact to VirusTotal"
@@ -179,8 +222,9 @@ class VirusTotalConnector:
                 raise ValueError(
                     "[VirusTotal] Error waiting for VirusTotal to analyze artifact"
                 ) from err
+            # The report cached before the analysis completed is stale
             json_data = self.client.get_file_info(
-                self.resolve_default_value(stix_entity)
+                self.resolve_default_value(stix_entity), refresh=True
             )
             assert json_data
         if "error" in json_data:
@@ -388,7 +432,9 @@ class VirusTotalConnector:
                 raise ValueError(
                     "[VirusTotal] Error waiting for VirusTotal to analyze URL"
                 ) from err
-            json_data = self.client.get_url_info(opencti_entity["observable_value"])
+            json_data = self.client.get_url_info(
+                opencti_entity["observable_value"], refresh=True
+            )
             assert json_data
         if "error" in json_data:
             raise ValueError(json_data["error"]["message"])
@@ -446,6 +492,14 @@ class VirusTotalConnector:
             + opencti_entity["observable_value"]
             + "}"
         )
+        try:
+            return self._enrich(stix_objects, stix_entity, opencti_entity)
+        finally:
+            self.helper.log_info(
+                "[VirusTotal] Client cache and quota usage", self.client.get_usage()
+            )
+
+    def _enrich(self, stix_objects, stix_entity, opencti_entity):
         match opencti_entity["entity_type"]:
             case "StixFile" | "Artifact":
                 return self._process_file(stix_objects, stix_entity, opencti_entity)
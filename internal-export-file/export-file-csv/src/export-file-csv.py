@@ -1,12 +1,22 @@
 import csv
-import io
+import itertools
 import json
 import os
 import sys
+import tempfile
 import time
 
 import yaml
-from pycti import OpenCTIConnectorHelper, get_config_variable
+from pycti import (
+    OpenCTIConnectorHelper,
+    StixCyberObservableTypes,
+    get_config_variable,
+)
+
+# Number of entities requested per API page
+PAGE_SIZE = 500
+# Temporary files are kept in memory below this size (bytes)
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
 
 
 class ExportFileCsv:
@@ -29,10 +39,89 @@ class ExportFileCsv:
         self.errors: list[Exception] = (
             []
         )  # error holder to be reset before each new process
+        self.cell_converters = {
+            str: lambda value: value,
+            int: str,
+            float: str,
+            bool: str,
+            list: self._list_to_cell,
+            dict: self._dict_to_cell,
+        }
+
+    @staticmethod
+    def _list_to_cell(value):
+        if len(value) > 0 and isinstance(value[0], str):
+            return ",".join(value)
+        elif len(value) > 0 and isinstance(value[0], dict):
+            rrow = []
+            for r in value:
+                for key in ("name", "definition", "value", "observable_value"):
+                    if key in r:
+                        rrow.append(r[key] if r[key] is not None else "")
+                        break
+            return ",".join(rrow)
+        return ""
+
+    @staticmethod
+    def _dict_to_cell(value):
+        for key in ("name", "value", "observable_value"):
+            if key in value:
+                return value[key]
+        return ""
+
+    def _value_to_cell(self, value):
+        converter = self.cell_converters.get(type(value))
+        if converter is None:
+            return ""
+        return converter(value)
+
+    def _build_column_plan(self, headers):
+        """
+        Compute once per export the converter of each column,
+        a converter takes the entity and its hashes (indexed by algorithm)
+        """
+
+        def hash_column(header):
+            algorithm = header.split("_")[1]
+
+            def convert(entity, hashes):
+                if hashes is not None:
+                    return hashes.get(algorithm, "")
+                return self._value_to_cell(entity.get(header))
+
+            return convert
+
+        def value_column(header):
+            return lambda entity, hashes: self._value_to_cell(entity.get(header))
+
+        return [
+            hash_column(h) if h.startswith("hashes_") else value_column(h)
+            for h in headers
+        ]
+
+    def _spool_entities(self, entities):
+        """
+        First pass: spool the entities to a temporary file as they are paged
+        from the API while computing the set of headers
+        """
+        spool = tempfile.SpooledTemporaryFile(
+            max_size=SPOOL_MAX_SIZE, mode="w+", encoding="utf-8"
+        )
+        keys = set()
+        for entity in entities:
+            keys.update(entity.keys())
+            spool.write(json.dumps(entity))
+            spool.write("\n")
+        spool.seek(0)
+        return spool, sorted(keys)
 
     def export_dict_list_to_csv(self, data):
-        output = io.StringIO()
-        headers = sorted(set().union(*(d.keys() for d in data)))
+        """
+        Stream the entities into a CSV temporary file, the returned file is
+        positioned at its beginning and must be closed by the caller
+        """
+        start_time = time.monotonic()
+        entities_spool, headers = self._spool_entities(data)
         if "hashes" in headers:
             headers = headers + [
                 "hashes.MD5",
@@ -41,81 +130,81 @@ class ExportFileCsv:
                 "hashes_SHA-512",
                 "hashes_SSDEEP",
             ]
-        csv_data = [headers]
-        for d in data:
-            try:
-                row = []
-                for h in headers:
-                    if h.startswith("hashes_") and "hashes" in d:
-                        hashes = {}
-                        for hash in d["hashes"]:
-                            hashes[hash["algorithm"]] = hash["hash"]
-                        if h.split("_")[1] in hashes:
-                            row.append(hashes[h.split("_")[1]])
-                        else:
-                            row.append("")
-                    elif h not in d:
-                        row.append("")
-                    elif isinstance(d[h], str):
-                        row.append(d[h])
-                    elif isinstance(d[h], int):
-                        row.append(str(d[h]))
-                    elif isinstance(d[h], float):
-                        row.append(str(d[h]))
-                    elif isinstance(d[h], list):
-                        if len(d[h]) > 0 and isinstance(d[h][0], str):
-                            row.append(",".join(d[h]))
-                        elif len(d[h]) > 0 and isinstance(d[h][0], dict):
-                            rrow = []
-                            for r in d[h]:
-                                if "name" in r:
-                                    if r["name"] is not None:
-                                        rrow.append(r["name"])
-                                    else:
-                                        rrow.append("")
-                                elif "definition" in r:
-                                    if r["definition"] is not None:
-                                        rrow.append(r["definition"])
-                                    else:
-                                        rrow.append("")
-                                elif "value" in r:
-                                    if r["value"] is not None:
-                                        rrow.append(r["value"])
-                                    else:
-                                        rrow.append("")
-                                elif "observable_value" in r:
-                                    if r["observable_value"] is not None:
-                                        rrow.append(r["observable_value"])
-                                    else:
-                                        rrow.append("")
-                            row.append(",".join(rrow))
-                        else:
-                            row.append("")
-                    elif isinstance(d[h], dict):
-                        if "name" in d[h]:
-                            row.append(d[h]["name"])
-                        elif "value" in d[h]:
-                            row.append(d[h]["value"])
-                        elif "observable_value" in d[h]:
-                            row.append(d[h]["observable_value"])
-                        else:
-                            row.append("")
-                    else:
-                        row.append("")
-                csv_data.append(row)
-            except Exception as err:
-                self.helper.connector_logger.warning(
-                    "Error with csv input data, one line cannot be exported." + str(err)
-                )
-                self.errors.append(err)
+        column_plan = self._build_column_plan(headers)
+        has_hashes = "hashes" in headers
+
+        output = tempfile.SpooledTemporaryFile(
+            max_size=SPOOL_MAX_SIZE, mode="w+", encoding="utf-8", newline=""
+        )
         writer = csv.writer(
             output,
             delimiter=self.export_file_csv_delimiter,
             quotechar='"',
             quoting=csv.QUOTE_ALL,
         )
-        writer.writerows(csv_data)
-        return output.getvalue()
+        writer.writerow(headers)
+        row_cnt = 0
+        with entities_spool:
+            for line in entities_spool:
+                d = json.loads(line)
+                try:
+                    hashes = None
+                    if has_hashes and "hashes" in d:
+                        hashes = {
+                            hash["algorithm"]: hash["hash"] for hash in d["hashes"]
+                        }
+                    writer.writerow([convert(d, hashes) for convert in column_plan])
+                    row_cnt += 1
+                except Exception as err:
+                    self.helper.connector_logger.warning(
+                        "Error with csv input data, one line cannot be exported."
+                        + str(err)
+                    )
+                    self.errors.append(err)
+        output.seek(0)
+
+        duration = time.monotonic() - start_time
+        self.helper.connector_logger.info(
+            "CSV generated",
+            {
+                "rows": row_cnt,
+                "duration": round(duration, 2),
+                "rows_per_second": (
+                    round(row_cnt / duration) if duration > 0 else row_cnt
+                ),
+            },
+        )
+        return output
+
+    @staticmethod
+    def _iter_entities(list_function, pagination_argument="withPagination", **kwargs):
+        """
+        Page through a pycti list function, yielding the entities as they arrive
+
+        pagination_argument: name of the keyword enabling the pagination info,
+        stix_object_or_stix_relationship.list reads with_pagination instead
+        """
+        after = None
+        while True:
+            result = list_function(
+                first=PAGE_SIZE,
+                after=after,
+                getAll=False,
+                **{pagination_argument: True},
+                **kwargs,
+            )
+            yield from result["entities"]
+            pagination = result.get("pagination", {})
+            if not pagination.get("hasNextPage"):
+                break
+            after = pagination["endCursor"]
+
+    def _query_list_function(self, entity_type):
+        # Resolve the entity class through the pycti reader of the type, unknown
+        # types have no entity class and go through pycti export_entities_list
+        reader = self.helper.api_impersonate.stix2.get_reader(entity_type)
+        entity_class = getattr(reader, "__self__", None)
+        return getattr(entity_class, "list", None)
 
     def _export_list(self, data, entities_list, list_filters):
         file_name = data["file_name"]
@@ -123,37 +212,37 @@ class ExportFileCsv:
         file_markings = data["file_markings"]
         entity_id = data.get("entity_id")
         entity_type = data["entity_type"]
-        csv_data = self.export_dict_list_to_csv(entities_list)
-        self.helper.log_info(
-            "Uploading: " + entity_type + "/" + export_type + " to " + file_name
-        )
-        if entity_type == "Stix-Cyber-Observable":
-            self.helper.api.stix_cyber_observable.push_list_export(
-                entity_id,
-                entity_type,
-                file_name,
-                file_markings,
-                csv_data,
-                list_filters,
-            )
-        elif entity_type == "Stix-Core-Object":
-            self.helper.api.stix_core_object.push_list_export(
-                entity_id,
-                entity_type,
-                file_name,
-                file_markings,
-                csv_data,
-                list_filters,
-            )
-        else:
-            self.helper.api.stix_domain_object.push_list_export(
-                entity_id,
-                entity_type,
-                file_name,
-                file_markings,
-                csv_data,
-                list_filters,
+        with self.export_dict_list_to_csv(entities_list) as csv_data:
+            self.helper.log_info(
+                "Uploading: " + entity_type + "/" + export_type + " to " + file_name
             )
+            if entity_type == "Stix-Cyber-Observable":
+                self.helper.api.stix_cyber_observable.push_list_export(
+                    entity_id,
+                    entity_type,
+                    file_name,
+                    file_markings,
+                    csv_data,
+                    list_filters,
+                )
+            elif entity_type == "Stix-Core-Object":
+                self.helper.api.stix_core_object.push_list_export(
+                    entity_id,
+                    entity_type,
+                    file_name,
+                    file_markings,
+                    csv_data,
+                    list_filters,
+                )
+            else:
+                self.helper.api.stix_domain_object.push_list_export(
+                    entity_id,
+                    entity_type,
+                    file_name,
+                    file_markings,
+                    csv_data,
+                    list_filters,
+                )
         self.helper.connector_logger.info(
             "Export done",
             {
@@ -221,22 +310,20 @@ class ExportFileCsv:
                     ],
                     "filters": [],
                 }
-                entities_list = self.helper.api_impersonate.opencti_stix_object_or_stix_relationship.list(
-                    filters=export_selection_filter, getAll=True
+                entities_list = self._iter_entities(
+                    self.helper.api_impersonate.opencti_stix_object_or_stix_relationship.list,
+                    pagination_argument="with_pagination",
+                    filters=export_selection_filter,
                 )
-                # Cleanup object extra information
-                # Due to lack of support of this in export_dict_list_to_csv
-                for entity in entities_list:
-                    if "objectLabelIds" in entity:
-                        del entity["objectLabelIds"]
                 del entity_data["objectsIds"]
 
             # Cleanup object extra information
             # Due to lack of support of this in export_dict_list_to_csv
-            if "objectLabelIds" in entity_data:
-                del entity_data["objectLabelIds"]
+            def cleanup(entity):
+                entity.pop("objectLabelIds", None)
+                return entity
 
-            entities_list.append(entity_data)
+            entities_list = map(cleanup, itertools.chain(entities_list, [entity_data]))
             csv_data = self.export_dict_list_to_csv(entities_list)
             self.helper.connector_logger.info(
                 "Uploading",
@@ -247,12 +334,13 @@ class ExportFileCsv:
                     "file_markings": file_markings,
                 },
             )
-            self.helper.api.stix_domain_object.push_entity_export(
-                entity_id=entity_id,
-                file_name=file_name,
-                data=csv_data,
-                file_markings=file_markings,
-            )
+            with csv_data:
+                self.helper.api.stix_domain_object.push_entity_export(
+                    entity_id=entity_id,
+                    file_name=file_name,
+                    data=csv_data,
+                    file_markings=file_markings,
+                )
             self.helper.connector_logger.info(
                 "Export done",
                 {
@@ -268,8 +356,10 @@ class ExportFileCsv:
         # = Only simple
         if export_scope == "selection":
             list_filters = "selected_ids"
-            entities_list = self.helper.api_impersonate.opencti_stix_object_or_stix_relationship.list(
-                filters=main_filter, getAll=True
+            entities_list = self._iter_entities(
+                self.helper.api_impersonate.opencti_stix_object_or_stix_relationship.list,
+                pagination_argument="with_pagination",
+                filters=main_filter,
             )
             self._export_list(data, entities_list, list_filters)
 
@@ -298,14 +388,30 @@ class ExportFileCsv:
                 "filters": [],
             }
 
-            entities_list = self.helper.api_impersonate.stix2.export_entities_list(
-                entity_type=entity_type,
-                search=list_params.get("search"),
-                filters=export_query_filter,
-                orderBy=list_params.get("orderBy"),
-                orderMode=list_params.get("orderMode"),
-                getAll=True,
-            )
+            list_function = self._query_list_function(entity_type)
+            if list_function is not None:
+                order_by = list_params.get("orderBy")
+                order_mode = list_params.get("orderMode")
+                if order_by is None or order_by == "_score":
+                    order_by = "created_at"
+                    if order_mode is None:
+                        order_mode = "desc"
+                entities_list = self._iter_entities(
+                    list_function,
+                    search=list_params.get("search"),
+                    filters=export_query_filter,
+                    orderBy=order_by,
+                    orderMode=order_mode,
+                )
+            else:
+                entities_list = self.helper.api_impersonate.stix2.export_entities_list(
+                    entity_type=entity_type,
+                    search=list_params.get("search"),
+                    filters=export_query_filter,
+                    orderBy=list_params.get("orderBy"),
+                    orderMode=list_params.get("orderMode"),
+                    getAll=True,
+                )
             list_filters = json.dumps(list_params)
             self._export_list(data, entities_list, list_filters)
 
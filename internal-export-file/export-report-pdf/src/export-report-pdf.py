@@ -5,17 +5,17 @@ import json
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import cairosvg
 import cmarkgfm
 import yaml
 from cmarkgfm.cmark import Options as cmarkgfmOptions
-from jinja2 import Environment, FileSystemLoader
+from pdf_renderer import PdfRenderer
 from pycti import OpenCTIConnectorHelper, get_config_variable
 from pycti.utils.constants import StixCyberObservableTypes
 from pygal_maps_world.i18n import COUNTRIES
 from pygal_maps_world.maps import World
-from weasyprint import HTML
 
 CMARKGFM_OPTIONS = (
     cmarkgfmOptions.CMARK_OPT_GITHUB_PRE_LANG  # Use GitHub-style tags for code blocks
@@ -23,6 +23,248 @@ CMARKGFM_OPTIONS = (
     | cmarkgfmOptions.CMARK_OPT_TABLE_PREFER_STYLE_ATTRIBUTES  # Use style attributes to align table cells
 )
 
+# Number of container objects requested per page, and of pages requested at once
+FETCH_PAGE_SIZE = 500
+FETCH_WORKERS = 4
+
+# Attributes of the source and target of the relationships in a container
+RELATIONSHIP_END_ATTRIBUTES = """
+    ... on BasicObject {
+        id
+        entity_type
+    }
+    ... on AttackPattern {
+        name
+    }
+    ... on Campaign {
+        name
+    }
+    ... on Individual {
+        name
+    }
+    ... on Organization {
+        name
+    }
+    ... on Sector {
+        name
+    }
+    ... on Indicator {
+        name
+    }
+    ... on Infrastructure {
+        name
+    }
+    ... on IntrusionSet {
+        name
+    }
+    ... on City {
+        name
+    }
+    ... on Country {
+        name
+    }
+    ... on Region {
+        name
+    }
+    ... on Position {
+        name
+    }
+    ... on Malware {
+        name
+    }
+    ... on ThreatActor {
+        name
+    }
+    ... on Tool {
+        name
+    }
+    ... on Vulnerability {
+        name
+    }
+    ... on Incident {
+        name
+    }
+    ... on StixCyberObservable {
+        observable_value
+    }
+"""
+
+# Attributes of the container objects rendered by the report and case templates
+CONTAINER_OBJECT_ATTRIBUTES = (
+    """
+    id
+    entity_type
+    ... on AttackPattern {
+        name
+        description
+        x_mitre_id
+    }
+    ... on Campaign {
+        name
+        description
+    }
+    ... on Report {
+        name
+        description
+    }
+    ... on CourseOfAction {
+        name
+        description
+    }
+    ... on Individual {
+        name
+        description
+    }
+    ... on Organization {
+        name
+        description
+    }
+    ... on Sector {
+        name
+        description
+    }
+    ... on System {
+        name
+        description
+    }
+    ... on Indicator {
+        name
+        description
+        pattern_type
+        pattern
+    }
+    ... on Infrastructure {
+        name
+        description
+    }
+    ... on IntrusionSet {
+        name
+        description
+    }
+    ... on City {
+        name
+        description
+    }
+    ... on Country {
+        name
+        description
+    }
+    ... on Region {
+        name
+        description
+    }
+    ... on Position {
+        name
+        description
+    }
+    ... on Malware {
+        name
+        description
+    }
+    ... on ThreatActor {
+        name
+        description
+    }
+    ... on Tool {
+        name
+        description
+    }
+    ... on Vulnerability {
+        name
+        description
+    }
+    ... on Incident {
+        name
+        description
+    }
+    ... on Event {
+        name
+        description
+    }
+    ... on Channel {
+        name
+        description
+    }
+    ... on Narrative {
+        name
+        description
+    }
+    ... on Language {
+        name
+    }
+    ... on DataComponent {
+        name
+        description
+    }
+    ... on DataSource {
+        name
+        description
+    }
+    ... on Case {
+        name
+        description
+    }
+    ... on Grouping {
+        name
+        description
+    }
+    ... on Note {
+        attribute_abstract
+        content
+    }
+    ... on Opinion {
+        opinion
+        explanation
+    }
+    ... on ObservedData {
+        first_observed
+        last_observed
+        number_observed
+    }
+    ... on StixCoreRelationship {
+        relationship_type
+        description
+        start_time
+        stop_time
+        from {
+"""
+    + RELATIONSHIP_END_ATTRIBUTES
+    + """
+        }
+        to {
+"""
+    + RELATIONSHIP_END_ATTRIBUTES
+    + """
+        }
+    }
+    ... on StixSightingRelationship {
+        description
+        first_seen
+        last_seen
+        from {
+"""
+    + RELATIONSHIP_END_ATTRIBUTES
+    + """
+        }
+        to {
+"""
+    + RELATIONSHIP_END_ATTRIBUTES
+    + """
+        }
+    }
+    ... on StixCyberObservable {
+        observable_value
+        indicators {
+            edges {
+                node {
+                    id
+                }
+            }
+        }
+    }
+"""
+)
+
 
 class ExportReportPdf:
     def __init__(self):
@@ -88,6 +330,30 @@ class ExportReportPdf:
             ["export_report_pdf", "defang_urls"],
             config,
         )
+        self.render_workers = get_config_variable(
+            "EXPORT_REPORT_PDF_RENDER_WORKERS",
+            ["export_report_pdf", "render_workers"],
+            config,
+            isNumber=True,
+            default=2,
+        )
+        self.render_timeout = get_config_variable(
+            "EXPORT_REPORT_PDF_RENDER_TIMEOUT",
+            ["export_report_pdf", "render_timeout"],
+            config,
+            isNumber=True,
+            default=600,
+        )
+        self.max_observables_per_type = get_config_variable(
+            "EXPORT_REPORT_PDF_MAX_OBSERVABLES_PER_TYPE",
+            ["export_report_pdf", "max_observables_per_type"],
+            config,
+            isNumber=True,
+            default=0,
+        )
+        self.renderer = PdfRenderer(
+            self.current_dir, self.render_workers, self.render_timeout
+        )
 
     def _get_readable_date_time(self, str_date_time):
         """
@@ -256,18 +522,8 @@ class ExportReportPdf:
 
                     context["entities"][obj_entity_type].append(entity)
 
-                # Render html with input variables
-                env = Environment(
-                    loader=FileSystemLoader(self.current_dir), finalize=self._finalize
-                )
-
-                template = env.get_template("resources/list.html")
-                html_string = template.render(context)
-
-                # Generate pdf from html string
-                pdf_contents = HTML(
-                    string=html_string, base_url=f"{self.current_dir}/resources"
-                ).write_pdf()
+                # Render html with input variables and generate pdf
+                pdf_contents = self.renderer.render("list.html", context)
 
                 # Upload the output pdf
                 self.helper.log_info(f"Uploading: {file_name}")
@@ -301,6 +557,84 @@ class ExportReportPdf:
         else:
             raise ValueError("An error occurred, the list is empty")
 
+    def _fetch_container_objects(self, object_ids, access_filter):
+        """
+        Fetch the objects of a container, by pages of ids requested concurrently.
+        Only the attributes rendered by the templates are requested.
+
+        object_ids: a list of str representing the ids of the container objects
+
+        returns: a generator of the objects, in the order of the pages
+        """
+        pages = [
+            object_ids[start : start + FETCH_PAGE_SIZE]
+            for start in range(0, len(object_ids), FETCH_PAGE_SIZE)
+        ]
+
+        def fetch_page(page_ids):
+            return self.helper.api.opencti_stix_object_or_stix_relationship.list(
+                filters=self.helper.api.stix2.prepare_id_filters_export(
+                    page_ids, access_filter
+                ),
+                first=len(page_ids),
+                customAttributes=CONTAINER_OBJECT_ATTRIBUTES,
+            )
+
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            for entities_list in executor.map(fetch_page, pages):
+                yield from entities_list
+
+    def _fill_container_objects(self, context, object_ids, access_filter):
+        """
+        Sort the objects of a container into the entities and observables of the context.
+        """
+        skipped_observables = {}
+        for entity in self._fetch_container_objects(object_ids, access_filter):
+            obj_entity_type = entity["entity_type"]
+            if obj_entity_type == "StixFile" or StixCyberObservableTypes.has_value(
+                obj_entity_type
+            ):
+                # If only include indicators and
+                # the observable doesn't have an indicator, skip it
+                if self.indicators_only and not entity.get("indicators"):
+                    self.helper.log_info(
+                        f"Skipping {obj_entity_type} observable with value {entity['observable_value']} as it was not an Indicator."
+                    )
+                    continue
+
+                if obj_entity_type not in context["observables"]:
+                    context["observables"][obj_entity_type] = []
+
+                # Only the first observables of each type are printed
+                if (
+                    self.max_observables_per_type > 0
+                    and len(context["observables"][obj_entity_type])
+                    >= self.max_observables_per_type
+                ):
+                    skipped_observables[obj_entity_type] = (
+                        skipped_observables.get(obj_entity_type, 0) + 1
+                    )
+                    continue
+
+                # Defang urls
+                if self.defang_urls and obj_entity_type == "Url":
+                    entity["observable_value"] = entity["observable_value"].replace(
+                        "http", "hxxp", 1
+                    )
+
+                context["observables"][obj_entity_type].append(entity)
+
+            else:
+                if obj_entity_type not in context["entities"]:
+                    context["entities"][obj_entity_type] = []
+
+                context["entities"][obj_entity_type].append(entity)
+
+        for obj_entity_type, count in skipped_observables.items():
+            self.helper.log_info(
+                f"Skipping {count} {obj_entity_type} observables above the limit of {self.max_observables_per_type} per type."
+            )
+
     def _process_report(self, entity_id, file_name, file_markings, access_filter):
         """
         Process a Report entity and upload as pdf.
@@ -351,61 +685,11 @@ class ExportReportPdf:
             "observables": {},
         }
 
-        object_ids = []
-        for report_obj in report_objs:
-            object_ids.append(report_obj["id"])
-
-        if len(object_ids) != 0:
-            export_filter = self.helper.api.stix2.prepare_id_filters_export(
-                object_ids, access_filter
-            )
-            entities_list = (
-                self.helper.api.opencti_stix_object_or_stix_relationship.list(
-                    filters=export_filter
-                )
-            )
-
-            for entity in entities_list:
-                obj_entity_type = entity["entity_type"]
-                if obj_entity_type == "StixFile" or StixCyberObservableTypes.has_value(
-                    obj_entity_type
-                ):
-                    # If only include indicators and
-                    # the observable doesn't have an indicator, skip it
-                    if self.indicators_only and not entity["indicators"]:
-                        self.helper.log_info(
-                            f"Skipping {obj_entity_type} observable with value {entity['observable_value']} as it was not an Indicator."
-                        )
-                        continue
+        object_ids = [report_obj["id"] for report_obj in report_objs]
+        self._fill_container_objects(context, object_ids, access_filter)
 
-                    if obj_entity_type not in context["observables"]:
-                        context["observables"][obj_entity_type] = []
-
-                    # Defang urls
-                    if self.defang_urls and obj_entity_type == "Url":
-                        entity["observable_value"] = entity["observable_value"].replace(
-                            "http", "hxxp", 1
-                        )
-
-                    context["observables"][obj_entity_type].append(entity)
-
-                else:
-                    if obj_entity_type not in context["entities"]:
-                        context["entities"][obj_entity_type] = []
-
-                    context["entities"][obj_entity_type].append(entity)
-
-        # Render html with input variables
-        env = Environment(
-            loader=FileSystemLoader(self.current_dir), finalize=self._finalize
-        )
-        template = env.get_template("resources/report.html")
-        html_string = template.render(context)
-
-        # Generate pdf from html string
-        pdf_contents = HTML(
-            string=html_string, base_url=f"{self.current_dir}/resources"
-        ).write_pdf()
+        # Render html with input variables and generate pdf
+        pdf_contents = self.renderer.render("report.html", context)
 
         # Upload the output pdf
         self.helper.log_info(f"Uploading: {file_name}")
@@ -496,17 +780,8 @@ class ExportReportPdf:
                 base64_png = base64.b64encode(png_bytes.getvalue()).decode()
                 context["target_map_country"] = f"data:image/png;base64, {base64_png}"
 
-        # Render html with input variables
-        env = Environment(
-            loader=FileSystemLoader(self.current_dir), finalize=self._finalize
-        )
-        template = env.get_template("resources/intrusion-set.html")
-        html_string = template.render(context)
-
-        # Generate pdf from html string
-        pdf_contents = HTML(
-            string=html_string, base_url=f"{self.current_dir}/resources"
-        ).write_pdf()
+        # Render html with input variables and generate pdf
+        pdf_contents = self.renderer.render("intrusion-set.html", context)
 
         # Upload the output pdf
         self.helper.log_info(f"Uploading: {file_name}")
@@ -597,17 +872,8 @@ class ExportReportPdf:
                 base64_png = base64.b64encode(png_bytes.getvalue()).decode()
                 context["target_map_country"] = f"data:image/png;base64, {base64_png}"
 
-        # Render html with input variables
-        env = Environment(
-            loader=FileSystemLoader(self.current_dir), finalize=self._finalize
-        )
-        template = env.get_template("resources/threat-actor.html")
-        html_string = template.render(context)
-
-        # Generate pdf from html string
-        pdf_contents = HTML(
-            string=html_string, base_url=f"{self.current_dir}/resources"
-        ).write_pdf()
+        # Render html with input variables and generate pdf
+        pdf_contents = self.renderer.render("threat-actor.html", context)
 
         # Upload the output pdf
         self.helper.log_info(f"Uploading: {file_name}")
@@ -698,17 +964,8 @@ class ExportReportPdf:
                 base64_png = base64.b64encode(png_bytes.getvalue()).decode()
                 context["target_map_country"] = f"data:image/png;base64, {base64_png}"
 
-        # Render html with input variables
-        env = Environment(
-            loader=FileSystemLoader(self.current_dir), finalize=self._finalize
-        )
-        template = env.get_template("resources/threat-actor.html")
-        html_string = template.render(context)
-
-        # Generate pdf from html string
-        pdf_contents = HTML(
-            string=html_string, base_url=f"{self.current_dir}/resources"
-        ).write_pdf()
+        # Render html with input variables and generate pdf
+        pdf_contents = self.renderer.render("threat-actor.html", context)
 
         # Upload the output pdf
         self.helper.log_info(f"Uploading: {file_name}")
@@ -787,62 +1044,11 @@ class ExportReportPdf:
             "observables": {},
         }
 
-        object_ids = []
-        for case_obj in case_objs:
-            object_ids.append(case_obj["id"])
+        object_ids = [case_obj["id"] for case_obj in case_objs]
+        self._fill_container_objects(context, object_ids, access_filter)
 
-        if len(object_ids) != 0:
-            export_filter = self.helper.api.stix2.prepare_id_filters_export(
-                object_ids, access_filter
-            )
-            entities_list = (
-                self.helper.api.opencti_stix_object_or_stix_relationship.list(
-                    filters=export_filter
-                )
-            )
-
-            # Process each STIX Object
-            for entity in entities_list:
-                obj_entity_type = entity["entity_type"]
-                if obj_entity_type == "StixFile" or StixCyberObservableTypes.has_value(
-                    obj_entity_type
-                ):
-                    # If only include indicators and
-                    # the observable doesn't have an indicator, skip it
-                    if self.indicators_only and not entity["indicators"]:
-                        self.helper.log_info(
-                            f"Skipping {obj_entity_type} observable with value {entity['observable_value']} as it was not an Indicator."
-                        )
-                        continue
-
-                    if obj_entity_type not in context["observables"]:
-                        context["observables"][obj_entity_type] = []
-
-                    # Defang urls
-                    if self.defang_urls and obj_entity_type == "Url":
-                        entity["observable_value"] = entity["observable_value"].replace(
-                            "http", "hxxp", 1
-                        )
-
-                    context["observables"][obj_entity_type].append(entity)
-                else:
-                    if obj_entity_type not in context["entities"]:
-                        context["entities"][obj_entity_type] = []
-
-                    context["entities"][obj_entity_type].append(entity)
-
-        # Render html with input variables
-        env = Environment(
-            loader=FileSystemLoader(self.current_dir), finalize=self._finalize
-        )
-
-        template = env.get_template("resources/case.html")
-        html_string = template.render(context)
-
-        # Generate pdf from html string
-        pdf_contents = HTML(
-            string=html_string, base_url=f"{self.current_dir}/resources"
-        ).write_pdf()
+        # Render html with input variables and generate pdf
+        pdf_contents = self.renderer.render("case.html", context)
 
         # Upload the output pdf
         self.helper.log_info(f"Uploading: {file_name}")
@@ -877,12 +1083,6 @@ class ExportReportPdf:
             return True
         return False
 
-    def _finalize(self, data):
-        """
-        Used for rendering jinja2 template to supress None
-        """
-        return data if data is not None else "N/A"
-
     def _get_reader(self, entity_type):
         """
         Returns the function to use for reading the data of a particular entity type.
@@ -935,7 +1135,11 @@ class ExportReportPdf:
 
     # Start the main loop
     def start(self):
-        self.helper.listen(self._process_message)
+        try:
+            self.helper.listen(self._process_message)
+        finally:
+            # Stop the rendering workers
+            self.renderer.close()
 
 
 if __name__ == "__main__":
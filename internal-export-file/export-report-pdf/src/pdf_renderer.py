@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+import threading
+
+from jinja2 import Environment, FileSystemLoader
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+# Stylesheet of each template, loaded once per rendering worker
+TEMPLATE_STYLESHEETS = {
+    "list.html": "list.css",
+    "report.html": "report.css",
+    "case.html": "case.css",
+    "intrusion-set.html": "intrusion-set.css",
+    "threat-actor.html": "intrusion-set.css",
+}
+
+# Fonts and parsed stylesheets of the current rendering worker
+_worker_resources = {}
+
+
+def finalize(data):
+    """
+    Used for rendering jinja2 template to supress None
+    """
+    return data if data is not None else "N/A"
+
+
+def init_worker(resources_dir):
+    """
+    Load the fonts and stylesheets once for all the PDFs rendered by a worker.
+    """
+    font_config = FontConfiguration()
+    _worker_resources["resources_dir"] = resources_dir
+    _worker_resources["font_config"] = font_config
+    _worker_resources["stylesheets"] = {
+        stylesheet: CSS(
+            filename=os.path.join(resources_dir, stylesheet), font_config=font_config
+        )
+        for stylesheet in set(TEMPLATE_STYLESHEETS.values())
+    }
+
+
+def write_pdf(html_string, stylesheet):
+    """
+    Generate pdf from html string, run in a rendering worker.
+    """
+    return HTML(
+        string=html_string, base_url=_worker_resources["resources_dir"]
+    ).write_pdf(
+        stylesheets=[_worker_resources["stylesheets"][stylesheet]],
+        font_config=_worker_resources["font_config"],
+    )
+
+
+class PdfRenderer:
+    """
+    Rendering service of the exported PDFs
+
+    Templates are compiled once at startup. PDFs are generated by a pool of worker
+    processes which keep the fonts and stylesheets loaded between exports, so a large
+    export does not hold the connector process and can be stopped after a timeout.
+    """
+
+    def __init__(self, current_dir, workers, timeout):
+        self.resources_dir = os.path.join(current_dir, "resources")
+        self.workers = max(1, workers)
+        self.timeout = timeout
+
+        env = Environment(loader=FileSystemLoader(current_dir), finalize=finalize)
+        self.templates = {
+            template_name: env.get_template(f"resources/{template_name}")
+            for template_name in TEMPLATE_STYLESHEETS
+        }
+
+        self._lock = threading.Lock()
+        self._pool = self._create_pool()
+
+    def _create_pool(self):
+        # Workers are spawned as the connector process runs the helper threads
+        context = multiprocessing.get_context("spawn")
+        return context.Pool(
+            processes=self.workers,
+            initializer=init_worker,
+            initargs=(self.resources_dir,),
+        )
+
+    def _restart_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                pool.terminate()
+                self._pool = self._create_pool()
+
+    def render(self, template_name, context):
+        """
+        Render a template with the given context as a PDF.
+
+        template_name: a str representing the template file, i.e. report.html
+
+        returns: the PDF as bytes
+        """
+        html_string = self.templates[template_name].render(context)
+
+        with self._lock:
+            pool = self._pool
+        result = pool.apply_async(
+            write_pdf, (html_string, TEMPLATE_STYLESHEETS[template_name])
+        )
+        try:
+            return result.get(timeout=self.timeout)
+        except multiprocessing.TimeoutError:
+            # The only way to stop the rendering is to stop its worker
+            self._restart_pool(pool)
+            raise TimeoutError(
+                f"Rendering of {template_name} did not complete in {self.timeout} seconds"
+            )
+
+    def close(self):
+        with self._lock:
+            self._pool.terminate()
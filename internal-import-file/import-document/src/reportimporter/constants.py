@@ -22,4 +22,7 @@ OBSERVABLE_DETECTION_OPTIONS = [
     OBSERVABLE_DETECTION_CUSTOM_REGEX,
 ]
 
+# Size in characters of the text blocks handed to the parser
+PARSE_BLOCK_SIZE = 20000
+
 ANALYSIS_TYPE = "mapping_analysis"
@@ -23,7 +23,9 @@ from reportimporter.constants import (
     RESULT_FORMAT_MATCH,
     RESULT_FORMAT_TYPE,
 )
+from reportimporter.entity_cache import EntityCache
 from reportimporter.models import Entity, EntityConfig, Observable
+from reportimporter.pdf_extractor import PdfExtractor
 from reportimporter.report_parser import ReportParser
 from reportimporter.util import MyConfigParser
 
@@ -65,6 +67,60 @@ class ReportImporter:
         else:
             raise FileNotFoundError(f"{entity_config_file} was not found")
 
+        # Entity dictionary is shared across messages and refreshed incrementally
+        entity_cache_ttl = get_config_variable(
+            "IMPORT_DOCUMENT_ENTITY_CACHE_TTL",
+            ["import_document", "entity_cache_ttl"],
+            config,
+            isNumber=True,
+            default=300,
+        )
+        entity_cache_full_refresh = get_config_variable(
+            "IMPORT_DOCUMENT_ENTITY_CACHE_FULL_REFRESH",
+            ["import_document", "entity_cache_full_refresh"],
+            config,
+            isNumber=True,
+            default=86400,
+        )
+        self.entity_cache = EntityCache(
+            self.helper,
+            self.entity_config,
+            entity_cache_ttl,
+            entity_cache_full_refresh,
+        )
+
+        # PDF pages are extracted in a bounded pool of worker processes
+        self.pdf_extractor = PdfExtractor(
+            workers=get_config_variable(
+                "IMPORT_DOCUMENT_PDF_WORKERS",
+                ["import_document", "pdf_workers"],
+                config,
+                isNumber=True,
+                default=os.cpu_count() or 1,
+            ),
+            pages_per_task=get_config_variable(
+                "IMPORT_DOCUMENT_PDF_PAGES_PER_TASK",
+                ["import_document", "pdf_pages_per_task"],
+                config,
+                isNumber=True,
+                default=10,
+            ),
+            memory_budget_mb=get_config_variable(
+                "IMPORT_DOCUMENT_PDF_MEMORY_BUDGET",
+                ["import_document", "pdf_memory_budget"],
+                config,
+                isNumber=True,
+                default=1024,
+            ),
+            task_timeout=get_config_variable(
+                "IMPORT_DOCUMENT_PDF_TASK_TIMEOUT",
+                ["import_document", "pdf_task_timeout"],
+                config,
+                isNumber=True,
+                default=300,
+            ),
+        )
+
         self.file = None
 
     def _process_message(self, data: Dict) -> str:
@@ -87,10 +143,12 @@ class ReportImporter:
         file_name = self._download_import_file(data)
 
         # Retrieve entity set from OpenCTI
-        entity_indicators = self._collect_stix_objects(self.entity_config)
+        entity_indicators = self._collect_stix_objects()
 
         # Parse content
-        parser = ReportParser(self.helper, entity_indicators, self.observable_config)
+        parser = ReportParser(
+            self.helper, entity_indicators, self.observable_config, self.pdf_extractor
+        )
         if data["file_id"].startswith("import/global"):
             file_data = open(file_name, "rb").read()
             file_data_encoded = base64.b64encode(file_data)
@@ -123,10 +181,12 @@ class ReportImporter:
         raw_text_to_analyze = " ".join(fields_to_analyze.values())
 
         # Retrieve entity set from OpenCTI
-        entity_indicators = self._collect_stix_objects(self.entity_config)
+        entity_indicators = self._collect_stix_objects()
 
         # Parse content
-        parser = ReportParser(self.helper, entity_indicators, self.observable_config)
+        parser = ReportParser(
+            self.helper, entity_indicators, self.observable_config, self.pdf_extractor
+        )
         parsed_data = parser.parse(raw_text_to_analyze)
 
         parsed_result = self._extract_elements_id(parsed_data)
@@ -202,10 +262,12 @@ class ReportImporter:
             return "Connector is only contextual and entity is not defined. Nothing was imported"
 
         # Retrieve entity set from OpenCTI
-        entity_indicators = self._collect_stix_objects(self.entity_config)
+        entity_indicators = self._collect_stix_objects()
 
         # Parse report
-        parser = ReportParser(self.helper, entity_indicators, self.observable_config)
+        parser = ReportParser(
+            self.helper, entity_indicators, self.observable_config, self.pdf_extractor
+        )
 
         if data["file_id"].startswith("import/global"):
             file_data = open(file_name, "rb").read()
@@ -265,26 +327,8 @@ class ReportImporter:
 
         return file_name
 
-    def _collect_stix_objects(
-        self, entity_config_list: List[EntityConfig]
-    ) -> List[Entity]:
-        base_func = self.helper.api
-        entity_list = []
-        for entity_config in entity_config_list:
-            func_format = entity_config.stix_class
-            try:
-                custom_function = getattr(base_func, func_format)
-                entries = custom_function.list(
-                    getAll=True,
-                    filters=entity_config.filter,
-                    customAttributes=entity_config.custom_attributes,
-                )
-                entity_list += entity_config.convert_to_entity(entries, self.helper)
-            except AttributeError:
-                e = "Selected parser format is not supported: {}".format(func_format)
-                raise NotImplementedError(e)
-
-        return entity_list
+    def _collect_stix_objects(self) -> List[Entity]:
+        return self.entity_cache.get_entities()
 
     @staticmethod
     def _parse_config(config_file: str, file_class: Callable) -> List[BaseModel]:
@@ -0,0 +1,110 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from pycti import OpenCTIConnectorHelper
+from reportimporter.models import Entity, EntityConfig
+
+
+class EntityCache(object):
+    """
+    Entity dictionary shared across messages
+
+    The entities (and their compiled regexes) are loaded once from OpenCTI and then
+    refreshed incrementally using the `updated_at` field once the TTL has expired.
+    A full reload is done every `full_refresh_interval` seconds to drop deleted entities.
+    """
+
+    def __init__(
+        self,
+        helper: OpenCTIConnectorHelper,
+        entity_config_list: List[EntityConfig],
+        ttl: int,
+        full_refresh_interval: int,
+    ):
+        self.helper = helper
+        self.entity_config_list = entity_config_list
+        self.ttl = ttl
+        self.full_refresh_interval = full_refresh_interval
+
+        # {entity config name: {standard_id: Entity}}
+        self._entities: Dict[str, Dict[str, Entity]] = {}
+        self._entity_list: List[Entity] = []
+        self._last_refresh: Optional[float] = None
+        self._last_full_refresh: Optional[float] = None
+        self._last_refresh_date: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def get_entities(self) -> List[Entity]:
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._last_full_refresh is None
+                or now - self._last_full_refresh >= self.full_refresh_interval
+            ):
+                self._refresh(full=True)
+                self._last_full_refresh = now
+                self._last_refresh = now
+            elif now - self._last_refresh >= self.ttl:
+                self._refresh(full=False)
+                self._last_refresh = now
+            return self._entity_list
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._last_full_refresh = None
+
+    def _refresh(self, full: bool) -> None:
+        # Take the date before querying so no update is missed between two refreshes
+        refresh_date = datetime.now(timezone.utc).isoformat()
+        updated_since = None if full else self._last_refresh_date
+
+        entity_cnt = 0
+        entities = {} if full else self._entities
+        for entity_config in self.entity_config_list:
+            entries = self._list_entries(entity_config, updated_since)
+            config_entities = entities.setdefault(entity_config.name, {})
+            for entry in entries:
+                config_entities.pop(entry.get("standard_id"), None)
+            for entity in entity_config.convert_to_entity(entries, self.helper):
+                config_entities[entity.stix_id] = entity
+            entity_cnt += len(entries)
+
+        self._entities = entities
+        self._entity_list = [
+            entity
+            for config_entities in self._entities.values()
+            for entity in config_entities.values()
+        ]
+        self._last_refresh_date = refresh_date
+        self.helper.log_info(
+            f"Entity cache {'reloaded' if full else 'refreshed'}: "
+            f"{entity_cnt} entries fetched, {len(self._entity_list)} entities cached"
+        )
+
+    def _list_entries(
+        self, entity_config: EntityConfig, updated_since: Optional[str]
+    ) -> List[Dict]:
+        func_format = entity_config.stix_class
+        try:
+            custom_function = getattr(self.helper.api, func_format)
+        except AttributeError:
+            e = "Selected parser format is not supported: {}".format(func_format)
+            raise NotImplementedError(e)
+
+        filters = entity_config.filter
+        if updated_since is not None:
+            filters = {
+                "mode": "and",
+                "filters": [
+                    {"key": "updated_at", "values": [updated_since], "operator": "gt"}
+                ],
+                "filterGroups": [entity_config.filter] if entity_config.filter else [],
+            }
+
+        return custom_function.list(
+            getAll=True,
+            filters=filters,
+            customAttributes=entity_config.custom_attributes,
+        )
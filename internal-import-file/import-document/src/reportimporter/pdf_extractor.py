@@ -0,0 +1,143 @@
+import collections
+import logging
+import multiprocessing
+from typing import Deque, Iterable, Iterator, List, Tuple
+
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTTextContainer
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+
+# Rough resident size of one pdfminer worker, used to derive the pool size
+# from the configured memory budget
+PDF_WORKER_MEMORY_ESTIMATE_MB = 256
+
+logger = logging.getLogger(__name__)
+
+
+def count_pages(file_path: str) -> int:
+    with open(file_path, "rb") as file_data:
+        document = PDFDocument(PDFParser(file_data))
+        try:
+            return int(resolve1(document.catalog["Pages"])["Count"])
+        except (KeyError, TypeError, ValueError):
+            return sum(1 for _ in PDFPage.create_pages(document))
+
+
+def extract_page_texts(task: Tuple[str, List[int]]) -> List[str]:
+    """
+    Extract the text containers of the given pages, newlines removed
+
+    Module level function so it can be shipped to worker processes.
+    """
+    file_path, page_numbers = task
+    texts = []
+
+    def append_text_recursively(page_element):
+        if isinstance(page_element, Iterable):
+            for sub_element in page_element:
+                if isinstance(sub_element, LTTextContainer):
+                    # Parsing with newlines has been deprecated
+                    texts.append(sub_element.get_text().replace("\n", ""))
+                else:
+                    append_text_recursively(sub_element)
+
+    # TODO also extract information from images using OCR
+    # https://pdfminersix.readthedocs.io/en/latest/topic/converting_pdf_to_text.html#topic-pdf-to-text-layout
+    for page_layout in extract_pages(
+        file_path, page_numbers=page_numbers, laparams=LAParams(all_texts=True)
+    ):
+        append_text_recursively(page_layout)
+
+    return texts
+
+
+class PdfExtractor(object):
+    """
+    Streaming PDF text extractor
+
+    Pages are split into small tasks that are processed by a pool of worker processes.
+    Results are yielded in page order as soon as they are available, and the number
+    of workers is capped so the pool stays within the configured memory budget.
+    A task running longer than the task timeout (e.g. stuck on a malformed PDF) is
+    skipped, and the pool is recreated to get rid of the stuck worker.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        pages_per_task: int,
+        memory_budget_mb: int,
+        task_timeout: int = 300,
+    ):
+        self.pages_per_task = max(1, pages_per_task)
+        self.task_timeout = task_timeout
+        self.workers = max(
+            1,
+            min(workers, memory_budget_mb // PDF_WORKER_MEMORY_ESTIMATE_MB),
+        )
+
+    def iter_page_texts(self, file_path: str) -> Iterator[List[str]]:
+        page_count = count_pages(file_path)
+        tasks = [
+            (
+                file_path,
+                list(range(start, min(start + self.pages_per_task, page_count))),
+            )
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+
+        # Small documents are not worth the pool start-up cost
+        if self.workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield extract_page_texts(task)
+            return
+
+        # Only keep a bounded number of tasks in flight so extracted texts do not
+        # pile up in memory when parsing is slower than extraction
+        workers = min(self.workers, len(tasks))
+        context = multiprocessing.get_context("spawn")
+        pool = context.Pool(processes=workers, maxtasksperchild=50)
+        try:
+            pending = collections.deque()
+            for task in tasks:
+                pending.append((task, pool.apply_async(extract_page_texts, (task,))))
+                if len(pending) >= workers * 2:
+                    texts, pool = self._collect_oldest(pending, pool, context, workers)
+                    yield texts
+            while pending:
+                texts, pool = self._collect_oldest(pending, pool, context, workers)
+                yield texts
+        finally:
+            pool.terminate()
+
+    def _collect_oldest(
+        self, pending: Deque, pool, context, workers: int
+    ) -> Tuple[List[str], object]:
+        """
+        Wait for the texts of the oldest pending task, along with the pool to use next
+
+        On timeout the pool is terminated, the other pending tasks are submitted again
+        to a new pool and no text is returned for the pages of the stuck task.
+        """
+        task, result = pending.popleft()
+        try:
+            return result.get(timeout=self.task_timeout), pool
+        except multiprocessing.TimeoutError:
+            logger.warning(
+                "PDF pages %s to %s not extracted after %s seconds, skipping them",
+                task[1][0] + 1,
+                task[1][-1] + 1,
+                self.task_timeout,
+            )
+        pool.terminate()
+        pool.join()
+        pool = context.Pool(processes=workers, maxtasksperchild=50)
+        for index, (pending_task, _) in enumerate(pending):
+            pending[index] = (
+                pending_task,
+                pool.apply_async(extract_page_texts, (pending_task,)),
+            )
+        return [], pool
@@ -1,13 +1,11 @@
 import io
 import logging
 import os
-from typing import IO, Dict, Iterable, List, Pattern, Tuple
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
 
 import chardet
 import ioc_finder
 from bs4 import BeautifulSoup
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LAParams, LTTextContainer
 from pycti import OpenCTIConnectorHelper
 from reportimporter.constants import (
     ENTITY_CLASS,
@@ -19,12 +17,14 @@ from reportimporter.constants import (
     OBSERVABLE_CLASS,
     OBSERVABLE_DETECTION_CUSTOM_REGEX,
     OBSERVABLE_DETECTION_LIBRARY,
+    PARSE_BLOCK_SIZE,
     RESULT_FORMAT_CATEGORY,
     RESULT_FORMAT_MATCH,
     RESULT_FORMAT_RANGE,
     RESULT_FORMAT_TYPE,
 )
 from reportimporter.models import Entity, Observable
+from reportimporter.pdf_extractor import PdfExtractor
 from reportimporter.util import library_mapping
 
 
@@ -38,10 +38,14 @@ class ReportParser(object):
         helper: OpenCTIConnectorHelper,
         entity_list: List[Entity],
         observable_list: List[Observable],
+        pdf_extractor: Optional[PdfExtractor] = None,
     ):
         self.helper = helper
         self.entity_list = entity_list
         self.observable_list = observable_list
+        self.pdf_extractor = pdf_extractor or PdfExtractor(
+            workers=1, pages_per_task=10, memory_budget_mb=1024
+        )
 
         # Disable INFO logging by pdfminer
         logging.getLogger("pdfminer").setLevel(logging.WARNING)
@@ -93,30 +97,41 @@ class ReportParser(object):
         self.helper.log_debug(f"Text: '{data}' -> extracts {list_matches}")
         return list_matches
 
-    def _parse_pdf(self, file_data: IO) -> Dict[str, Dict]:
+    @staticmethod
+    def _merge_blocks(texts: Iterable[str]) -> Iterator[str]:
+        """
+        Merge small text chunks into blocks of about PARSE_BLOCK_SIZE characters
+        so the text preparation and every regex run once per block instead of once per chunk
+        """
+        block = []
+        block_size = 0
+        for text in texts:
+            text = text.replace("\n", " ").strip()
+            if not text:
+                continue
+            block.append(text)
+            block_size += len(text) + 1
+            if block_size >= PARSE_BLOCK_SIZE:
+                yield " ".join(block)
+                block = []
+                block_size = 0
+        if block:
+            yield " ".join(block)
+
+    def _parse_blocks(self, texts: Iterable[str]) -> Dict[str, Dict]:
         parse_info = {}
-        parsed_texts = []
+        for block in self._merge_blocks(texts):
+            parse_info.update(self.parse(block))
+        return parse_info
 
-        def append_text_recursively(page_element):
-            if isinstance(page_element, Iterable):
-                for sub_element in page_element:
-                    if isinstance(sub_element, LTTextContainer):
-                        parsed_texts.append(sub_element.get_text())
-                    else:
-                        append_text_recursively(sub_element)
+    def _parse_pdf(self, file_data: IO) -> Dict[str, Dict]:
+        parse_info = {}
 
         try:
-            pages_layouts = extract_pages(file_data, laparams=LAParams(all_texts=True))
-            # TODO also extract information from images using OCR
-            # https://pdfminersix.readthedocs.io/en/latest/topic/converting_pdf_to_text.html#topic-pdf-to-text-layout
-
-            for page_layout in pages_layouts:
-                append_text_recursively(page_layout)
-
-            for parsed_text in parsed_texts:
-                # Parsing with newlines has been deprecated
-                no_newline_text = parsed_text.replace("\n", "")
-                parse_info.update(self.parse(no_newline_text))
+            # Pages are extracted by the worker pool and parsed as soon as they are
+            # available, results are deduplicated incrementally by match value
+            for page_texts in self.pdf_extractor.iter_page_texts(file_data.name):
+                parse_info.update(self._parse_blocks(page_texts))
 
         except Exception as e:
             logging.exception(f"Pdf Parsing Error: {e}")
@@ -137,8 +152,7 @@ class ReportParser(object):
         parse_info = {}
         soup = BeautifulSoup(file_data, "html.parser")
         buf = io.StringIO(soup.get_text(separator=" "))
-        for text in buf.readlines():
-            parse_info.update(self.parse(text))
+        parse_info.update(self._parse_blocks(buf))
         return parse_info
 
     def run_raw_parser(self, file_path: str, file_type: str) -> Dict:
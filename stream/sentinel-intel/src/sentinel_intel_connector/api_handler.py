@@ -83,8 +83,16 @@ class SentinelApiHandler:
         This function uses the `Retry` and `HTTPAdapter` classes from the `requests.adapters` module.
 
         - Retries up to 5 times with an increasing delay between attempts.
+        - Batch actions are POST requests, so every method is retried (a throttled request is not processed).
+        - The `Retry-After` header sent with 429 responses is respected.
         """
-        retry_strategy = Retry(total=5, backoff_factor=2, status_forcelist=[429])
+        retry_strategy = Retry(
+            total=5,
+            backoff_factor=2,
+            status_forcelist=[429],
+            allowed_methods=None,
+            respect_retry_after_header=True,
+        )
         adapter = HTTPAdapter(max_retries=retry_strategy)
         self.session.mount("https://", adapter)
 
@@ -174,6 +182,17 @@ class SentinelApiHandler:
         )
         return data["value"]
 
+    def iter_indicators(self):
+        """
+        Iterate over all the Threat Intelligence Indicators from Sentinel, following pagination.
+        :return: Generator of Threat Intelligence Indicators
+        """
+        url = f"{self.config.base_url}{self.config.resource_path}"
+        while url:
+            data = self._send_request("get", url)
+            yield from data["value"]
+            url = data.get("@odata.nextLink")
+
     def search_indicators(self, opencti_id: str) -> list | None:
         """
         Search a Threat Intelligence Indicator on Sentinel that corresponds to an OpenCTI observable.
@@ -218,6 +237,61 @@ class SentinelApiHandler:
         )
         return True
 
+    def submit_indicators(self, observables: list[dict]) -> list[dict]:
+        """
+        Create Threat Intelligence Indicators on Sentinel from OpenCTI observables, in a single request.
+        :param observables: OpenCTI observables to create Threat Intelligence Indicators for (at most 100)
+        :return: Created Threat Intelligence Indicators
+        """
+        request_bodies = [self._build_request_body(obs) for obs in observables]
+        request_bodies = [body for body in request_bodies if body]
+        if not request_bodies:
+            return []
+
+        data = self._send_request(
+            "post",
+            f"{self.config.base_url}{self.config.resource_path}/submitTiIndicators",
+            json={"value": request_bodies},
+        )
+        return data["value"] if data else []
+
+    def update_indicators(self, updates: list[tuple[dict, str]]) -> list[dict]:
+        """
+        Update Threat Intelligence Indicators on Sentinel from OpenCTI observables, in a single request.
+        :param updates: List of (OpenCTI observable, Sentinel indicator id) tuples (at most 100)
+        :return: Updated Threat Intelligence Indicators
+        """
+        request_bodies = []
+        for observable, sentinel_indicator_id in updates:
+            request_body = self._build_request_body(observable)
+            if request_body:
+                request_bodies.append({"id": sentinel_indicator_id} | request_body)
+        if not request_bodies:
+            return []
+
+        data = self._send_request(
+            "post",
+            f"{self.config.base_url}{self.config.resource_path}/updateTiIndicators",
+            json={"value": request_bodies},
+        )
+        return data["value"] if data else []
+
+    def delete_indicators(self, indicator_ids: list[str]) -> list[dict]:
+        """
+        Delete Threat Intelligence Indicators on Sentinel, in a single request.
+        :param indicator_ids: Sentinel indicator ids to delete (at most 100)
+        :return: Result of the deletion for each indicator
+        """
+        if not indicator_ids:
+            return []
+
+        data = self._send_request(
+            "post",
+            f"{self.config.base_url}{self.config.resource_path}/deleteTiIndicators",
+            json={"value": indicator_ids},
+        )
+        return data["value"] if data else []
+
     def delete_indicator(self, indicator_id: str) -> bool:
         """
         Delete a Threat Intelligence Indicator on Sentinel corresponding to an OpenCTI observable.
@@ -81,3 +81,35 @@ class ConfigConnector:
             ["sentinel_intel", "passive_only"],
             self.load,
         )
+        self.indicator_store_path = get_config_variable(
+            "SENTINEL_INTEL_INDICATOR_STORE_PATH",
+            ["sentinel_intel", "indicator_store_path"],
+            self.load,
+            default="sentinel_indicators.db",
+        )
+        # The tiIndicators batch actions accept at most 100 indicators per request
+        self.batch_size = min(
+            get_config_variable(
+                "SENTINEL_INTEL_BATCH_SIZE",
+                ["sentinel_intel", "batch_size"],
+                self.load,
+                isNumber=True,
+                default=100,
+            ),
+            100,
+        )
+        self.batch_interval = get_config_variable(
+            "SENTINEL_INTEL_BATCH_INTERVAL",
+            ["sentinel_intel", "batch_interval"],
+            self.load,
+            isNumber=True,
+            default=5,
+        )
+        # A batch which fails is sent again with back-off, at most this number of times
+        self.batch_max_attempts = get_config_variable(
+            "SENTINEL_INTEL_BATCH_MAX_ATTEMPTS",
+            ["sentinel_intel", "batch_max_attempts"],
+            self.load,
+            isNumber=True,
+            default=5,
+        )
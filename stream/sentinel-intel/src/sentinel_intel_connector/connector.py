@@ -1,20 +1,25 @@
 import json
+import threading
+import time
 from json import JSONDecodeError
 
 from pycti import OpenCTIConnectorHelper
 
 from .api_handler import SentinelApiHandler, SentinelApiHandlerError
 from .config_variables import ConfigConnector
+from .indicator_store import SentinelIndicatorStore
 from .utils import (
     FILE_HASH_TYPES_MAPPER,
     NETWORK_ATTRIBUTES_LIST,
-    get_hash_type,
-    get_hash_value,
-    get_ioc_type,
+    get_indicator_key,
+    get_sentinel_indicator_key,
     is_observable,
     is_stix_indicator,
 )
 
+# Maximum number of seconds a failed event waits before being sent again
+MAX_RETRY_DELAY = 300
+
 
 class SentinelIntelConnector:
     """
@@ -53,6 +58,13 @@ class SentinelIntelConnector:
         self.helper = OpenCTIConnectorHelper(self.config.load)
         self.api = SentinelApiHandler(self.helper, self.config)
 
+        # Local map of OpenCTI ids to Sentinel ids, and events waiting to be sent in batch
+        self.store = SentinelIndicatorStore(self.config.indicator_store_path)
+        self._pending = {}
+        self._pending_lock = threading.RLock()
+        # Failed events being retried: key -> (number of attempts, time of the next attempt)
+        self._retries = {}
+
     def _check_stream_id(self) -> None:
         """
         In case of stream_id configuration is missing, raise Value Error
@@ -111,152 +123,291 @@ class SentinelIntelConnector:
                 "[CREATE] Cannot convert STIX indicator { " + indicator_opencti_id + "}"
             )
 
-    def _create_sentinel_indicator(self, observable_data):
+    def _add_external_reference(self, observable_data: dict, sentinel_id: str):
         """
-        Create a Threat Intelligence Indicator on Sentinel from an OpenCTI observable.
+        Add the Sentinel indicator as external reference of the OpenCTI observable or indicator.
         :param observable_data: OpenCTI observable data
-        :return: True if the indicator has been successfully created, False otherwise
+        :param sentinel_id: Id of the created Sentinel indicator
         """
-        result = self.api.post_indicator(observable_data)
-        if result:
-            observable_opencti_id = OpenCTIConnectorHelper.get_attribute_in_extension(
-                "id", observable_data
+        observable_opencti_id = OpenCTIConnectorHelper.get_attribute_in_extension(
+            "id", observable_data
+        )
+        external_reference = self.helper.api.external_reference.create(
+            source_name=self.config.target_product.replace("Azure", "Microsoft"),
+            external_id=sentinel_id,
+            description="Intel within the Microsoft platform.",
+        )
+        # If observable was built from an OpenCTI Indicator
+        if "pattern" in observable_data:
+            self.helper.api.stix_domain_object.add_external_reference(
+                id=observable_opencti_id,
+                external_reference_id=external_reference["id"],
             )
-            self.helper.connector_logger.info(
-                "[CREATE] Indicator created",
-                {"sentinel_id": result["id"], "opencti_id": observable_opencti_id},
+        else:
+            self.helper.api.stix_cyber_observable.add_external_reference(
+                id=observable_opencti_id,
+                external_reference_id=external_reference["id"],
             )
 
-            # Update OpenCTI SDO external references
-            external_reference = self.helper.api.external_reference.create(
-                source_name=self.config.target_product.replace("Azure", "Microsoft"),
-                external_id=result["id"],
-                description="Intel within the Microsoft platform.",
+    def _rebuild_indicator_store(self) -> None:
+        """
+        Rebuild the local OpenCTI id -> Sentinel id map from the indicators existing on Sentinel.
+        If Sentinel cannot be reached, the map persisted by the previous run is kept.
+        """
+        try:
+            entries = []
+            for indicator in self.api.iter_indicators():
+                indicator_key = get_sentinel_indicator_key(indicator)
+                if indicator.get("externalId") and indicator_key is not None:
+                    entries.append(
+                        (indicator["externalId"], indicator_key, indicator["id"])
+                    )
+            count = self.store.rebuild(entries)
+            self.helper.connector_logger.info(
+                "[STORE] Indicator map rebuilt from Sentinel", {"count": count}
+            )
+        except SentinelApiHandlerError as err:
+            self.helper.connector_logger.error(
+                "[STORE] Unable to rebuild indicator map, keeping the local one",
+                err.metadata,
             )
-            # If observable was built from an OpenCTI Indicator
-            if "pattern" in observable_data:
-                self.helper.api.stix_domain_object.add_external_reference(
-                    id=observable_opencti_id,
-                    external_reference_id=external_reference["id"],
-                )
-            else:
-                self.helper.api.stix_cyber_observable.add_external_reference(
-                    id=observable_opencti_id,
-                    external_reference_id=external_reference["id"],
-                )
-        return result
 
-    def _find_sentinel_indicator(self, observable_data: dict) -> dict | None:
+    def _queue_event(self, event: str, observable_data: dict) -> None:
         """
-        Find a Threat Intelligence Indicator on Sentinel from an OpenCTI observable.
+        Queue a create or update event of an observable, to be sent with the next batch.
+        Successive events of the same observable are coalesced into a single one.
+        :param event: Event type (create or update)
         :param observable_data: OpenCTI observable data
-        :return: Found Sentinel indicator or None
         """
         opencti_id = OpenCTIConnectorHelper.get_attribute_in_extension(
             "id", observable_data
         )
-        indicators_data = self.api.search_indicators(opencti_id=opencti_id)
-        for indicator_data in indicators_data:
-            if observable_data["type"] == "file":
-                observable_hash_type = get_hash_type(observable_data)
-                observable_hash_value = get_hash_value(observable_data)
-                indicator_hash_type = indicator_data.get("fileHashType")
-                indicator_hash_value = indicator_data.get("fileHashValue", "").lower()
-                if (
-                    indicator_hash_type == observable_hash_type
-                    and indicator_hash_value == observable_hash_value
-                ):
-                    return indicator_data
-            else:
-                observable_type = get_ioc_type(observable_data)
-                observable_value = observable_data["value"]
-                indicator_value = indicator_data.get(observable_type)
-                if indicator_value == observable_value:
-                    return indicator_data
-        return None
-
-    def _update_sentinel_indicator(self, observable_data) -> bool:
+        key = (opencti_id, get_indicator_key(observable_data))
+        with self._pending_lock:
+            previous = self._pending.pop(key, None)
+            if previous is not None and previous[0] == "create":
+                event = "create"
+            self._pending[key] = (event, observable_data)
+            if len(self._pending) >= self.config.batch_size:
+                self._flush()
+
+    def _queue_delete(self, opencti_id: str) -> None:
         """
-        Update a Threat Intelligence Indicator on Sentinel from an OpenCTI observable.
-        :param observable_data: OpenCTI observable data
-        :return: True if the indicator has been successfully updated, False otherwise
+        Queue the deletion of all the Sentinel indicators of an OpenCTI id, to be sent with the next batch.
+        Pending creations and updates of the same id are dropped.
+        :param opencti_id: OpenCTI id of the observable or the indicator
+        """
+        with self._pending_lock:
+            for key in [key for key in self._pending if key[0] == opencti_id]:
+                del self._pending[key]
+            self._pending[(opencti_id, None)] = ("delete", None)
+            if len(self._pending) >= self.config.batch_size:
+                self._flush()
+
+    def _flush_periodically(self) -> None:
+        """
+        Send pending events every batch interval, so they are not held back when the stream is quiet.
         """
-        indicator_data = self._find_sentinel_indicator(observable_data)
-        if indicator_data is None:
-            return False
+        while True:
+            time.sleep(self.config.batch_interval)
+            try:
+                with self._pending_lock:
+                    self._flush()
+            except Exception as err:
+                self.helper.connector_logger.error(
+                    "[ERROR] Failed sending batch {" + str(err) + "}"
+                )
 
-        updated = self.api.patch_indicator(observable_data, indicator_data["id"])
-        if updated:
-            self.helper.connector_logger.info(
-                "[UPDATE] Indicator updated",
-                {
-                    "sentinel_id": indicator_data["id"],
-                    "opencti_id": indicator_data["externalId"],
-                },
-            )
+    @staticmethod
+    def _chunks(items: list, size: int):
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
 
-    def _delete_sentinel_indicator(self, observable_data) -> bool:
+    def _requeue(self, failed: list[tuple]) -> None:
         """
-        Delete Threat Intelligence Indicators on Sentinel corresponding to an OpenCTI observable.
-        :param observable_data: OpenCTI observable data
-        :return: True if the indicators have been successfully deleted, False otherwise
+        Put the events of a batch which failed back in the pending events, to be sent again
+        after a back-off. Events are dropped once they failed the maximum number of attempts.
+        Must be called with the pending lock held.
+        :param failed: Keys and events of the failed batch
         """
-        did_delete = False
+        dropped = 0
+        for key, event in failed:
+            if key in self._pending:
+                continue
+            attempts = self._retries.get(key, (0, 0))[0] + 1
+            if attempts >= self.config.batch_max_attempts:
+                self._retries.pop(key, None)
+                dropped += 1
+                continue
+            delay = min(self.config.batch_interval * 2**attempts, MAX_RETRY_DELAY)
+            self._retries[key] = (attempts, time.monotonic() + delay)
+            self._pending[key] = event
+        if dropped:
+            self.helper.connector_logger.error(
+                "[ERROR] Events dropped after the maximum number of attempts",
+                {"count": dropped, "attempts": self.config.batch_max_attempts},
+            )
 
-        opencti_id = OpenCTIConnectorHelper.get_attribute_in_extension(
-            "id", observable_data
-        )
-        indicators_data = self.api.search_indicators(opencti_id=opencti_id)
-        for indicator_data in indicators_data:
-            if indicator_data["externalId"] == opencti_id:
-                result = self.api.delete_indicator(indicator_data["id"])
-                # TODO: should we delete external references on OpenCTI too?
-                if result:
+    def _flush(self) -> None:
+        """
+        Send pending events to Sentinel using batch requests.
+        Deletions are sent first, then updates and creations.
+        Events of a failed batch are sent again with the next batches, after a back-off.
+        Must be called with the pending lock held.
+        """
+        now = time.monotonic()
+        pending = [
+            (key, event)
+            for key, event in self._pending.items()
+            if self._retries.get(key, (0, 0))[1] <= now
+        ]
+        for key, _ in pending:
+            del self._pending[key]
+        if not pending:
+            return
+
+        deletions = []
+        updates = []
+        creations = []
+        for key, (event, observable_data) in pending:
+            opencti_id, indicator_key = key
+            if event == "delete":
+                sentinel_ids = self.store.get_all(opencti_id)
+                if not sentinel_ids:
                     self.helper.connector_logger.info(
-                        "[DELETE] Indicator deleted",
-                        {"sentinel_id": indicator_data["id"], "opencti_id": opencti_id},
+                        "[DELETE] Indicator not found on "
+                        + self.config.target_product.replace("Azure", "Microsoft"),
+                        {"opencti_id": opencti_id},
                     )
-                did_delete = result
-        return did_delete
+                    self._retries.pop(key, None)
+                deletions.extend((key, sentinel_id) for sentinel_id in sentinel_ids)
+                continue
+            sentinel_id = self.store.get(opencti_id, indicator_key)
+            if sentinel_id is not None:
+                updates.append((key, event, observable_data, sentinel_id))
+            elif event == "create":
+                creations.append((key, event, observable_data))
+            else:
+                self.helper.connector_logger.debug(
+                    "[UPDATE] Indicator not found, skipping update",
+                    {"opencti_id": opencti_id},
+                )
+                self._retries.pop(key, None)
+
+        for chunk in self._chunks(deletions, self.config.batch_size):
+            sentinel_ids = [sentinel_id for _, sentinel_id in chunk]
+            keys = dict.fromkeys(key for key, _ in chunk)
+            try:
+                self.api.delete_indicators(sentinel_ids)
+                self.store.remove(sentinel_ids)
+                self.helper.connector_logger.info(
+                    "[DELETE] Indicators deleted", {"count": len(chunk)}
+                )
+                for key in keys:
+                    self._retries.pop(key, None)
+            except SentinelApiHandlerError as err:
+                self.helper.connector_logger.error(err.msg, err.metadata)
+                self._requeue([(key, ("delete", None)) for key in keys])
+
+        for chunk in self._chunks(updates, self.config.batch_size):
+            try:
+                self.api.update_indicators(
+                    [
+                        (observable_data, sentinel_id)
+                        for _, _, observable_data, sentinel_id in chunk
+                    ]
+                )
+                self.helper.connector_logger.info(
+                    "[UPDATE] Indicators updated", {"count": len(chunk)}
+                )
+                for key, _, _, _ in chunk:
+                    self._retries.pop(key, None)
+            except SentinelApiHandlerError as err:
+                self.helper.connector_logger.error(err.msg, err.metadata)
+                self._requeue(
+                    [
+                        (key, (event, observable_data))
+                        for key, event, observable_data, _ in chunk
+                    ]
+                )
+
+        for chunk in self._chunks(creations, self.config.batch_size):
+            try:
+                self._create_sentinel_indicators(
+                    [observable_data for _, _, observable_data in chunk]
+                )
+                for key, _, _ in chunk:
+                    self._retries.pop(key, None)
+            except SentinelApiHandlerError as err:
+                self.helper.connector_logger.error(err.msg, err.metadata)
+                self._requeue(
+                    [
+                        (key, (event, observable_data))
+                        for key, event, observable_data in chunk
+                    ]
+                )
+
+    def _create_sentinel_indicators(self, observables: list[dict]) -> None:
+        """
+        Create Threat Intelligence Indicators on Sentinel from OpenCTI observables, in a single request.
+        Created indicators are stored in the local map and referenced on OpenCTI.
+        :param observables: OpenCTI observables data
+        """
+        observables_by_key = {
+            (
+                OpenCTIConnectorHelper.get_attribute_in_extension("id", observable),
+                get_indicator_key(observable),
+            ): observable
+            for observable in observables
+        }
+        results = self.api.submit_indicators(observables)
+        created = []
+        for result in results:
+            key = (result.get("externalId"), get_sentinel_indicator_key(result))
+            if not result.get("id") or key not in observables_by_key:
+                self.helper.connector_logger.warning(
+                    "[CREATE] Indicator not created", {"result": result}
+                )
+                continue
+            created.append((*key, result["id"]))
+            self._add_external_reference(observables_by_key[key], result["id"])
+        self.store.save(created)
+        self.helper.connector_logger.info(
+            "[CREATE] Indicators created", {"count": len(created)}
+        )
 
     def _handle_create_event(self, data):
         """
-        Handle create event by trying to create the corresponding Threat Intelligence Indicator on Sentinel.
+        Handle create event by queuing the creation of the corresponding Threat Intelligence Indicator on Sentinel.
         :param data: Streamed data (representing either an observable or an indicator)
         """
         if is_stix_indicator(data):
             observables = self._convert_indicator_to_observables(data)
             for observable in observables:
-                self._create_sentinel_indicator(observable)
+                self._queue_event("create", observable)
         elif is_observable(data):
-            self._create_sentinel_indicator(data)
+            self._queue_event("create", data)
 
     def _handle_update_event(self, data):
         """
-        Handle update event by trying to update the corresponding Threat Intelligence Indicator on Sentinel.
+        Handle update event by queuing the update of the corresponding Threat Intelligence Indicator on Sentinel.
         :param data: Streamed data (representing either an observable or an indicator)
         """
 
         if is_stix_indicator(data):
             observables = self._convert_indicator_to_observables(data)
             for observable in observables:
-                self._update_sentinel_indicator(observable)
+                self._queue_event("update", observable)
         elif is_observable(data):
-            self._update_sentinel_indicator(data)
+            self._queue_event("update", data)
 
     def _handle_delete_event(self, data):
         """
-        Handle delete event by trying to delete the corresponding Threat Intelligence Indicators on Sentinel.
+        Handle delete event by queuing the deletion of the corresponding Threat Intelligence Indicators on Sentinel.
         :param data: Streamed data (representing either an observable or an indicator)
         """
         opencti_id = OpenCTIConnectorHelper.get_attribute_in_extension("id", data)
-        did_delete = self._delete_sentinel_indicator(data)
-        if not did_delete:
-            self.helper.connector_logger.info(
-                "[DELETE] Indicator not found on "
-                + self.config.target_product.replace("Azure", "Microsoft"),
-                {"opencti_id": opencti_id},
-            )
+        self._queue_delete(opencti_id)
 
     def validate_json(self, msg) -> dict | JSONDecodeError:
         """
@@ -313,5 +464,8 @@ class SentinelIntelConnector:
         The method continuously monitors messages from the platform
         The connector have the capability to listen a live stream from the platform.
         The helper provide an easy way to listen to the events.
+        Events are sent to Sentinel in batch by a background thread.
         """
+        self._rebuild_indicator_store()
+        threading.Thread(target=self._flush_periodically, daemon=True).start()
         self.helper.listen_stream(message_callback=self.process_message)
@@ -0,0 +1,96 @@
+import sqlite3
+import threading
+
+
+class SentinelIndicatorStore:
+    """
+    Local SQLite map of OpenCTI ids to Sentinel Threat Intelligence Indicator ids.
+    An OpenCTI indicator can be converted to several Sentinel indicators,
+    so each entry is identified by the OpenCTI id and the indicator key (IOC type and value).
+    """
+
+    def __init__(self, path: str):
+        """
+        Init Sentinel indicator store.
+        :param path: Path of the SQLite database
+        """
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS indicators (
+                opencti_id TEXT NOT NULL,
+                indicator_key TEXT NOT NULL,
+                sentinel_id TEXT NOT NULL,
+                PRIMARY KEY (opencti_id, indicator_key)
+            )
+            """
+        )
+        self._connection.commit()
+
+    def rebuild(self, entries) -> int:
+        """
+        Replace the whole map.
+        :param entries: Iterable of (opencti_id, indicator_key, sentinel_id) tuples
+        :return: Number of entries stored
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM indicators")
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO indicators VALUES (?, ?, ?)", entries
+            )
+            self._connection.commit()
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM indicators"
+            ).fetchone()[0]
+
+    def get(self, opencti_id: str, indicator_key: str) -> str | None:
+        """
+        Get the Sentinel indicator id corresponding to an OpenCTI observable.
+        :param opencti_id: OpenCTI id of the observable or of the indicator
+        :param indicator_key: Indicator key of the observable
+        :return: Sentinel indicator id if found, None otherwise
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT sentinel_id FROM indicators "
+                "WHERE opencti_id = ? AND indicator_key = ?",
+                (opencti_id, indicator_key),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_all(self, opencti_id: str) -> list[str]:
+        """
+        Get all the Sentinel indicator ids created from an OpenCTI id.
+        :param opencti_id: OpenCTI id of the observable or of the indicator
+        :return: List of Sentinel indicator ids
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT sentinel_id FROM indicators WHERE opencti_id = ?",
+                (opencti_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def save(self, entries: list[tuple]) -> None:
+        """
+        Store created Sentinel indicators.
+        :param entries: List of (opencti_id, indicator_key, sentinel_id) tuples
+        """
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO indicators VALUES (?, ?, ?)", entries
+            )
+            self._connection.commit()
+
+    def remove(self, sentinel_ids: list[str]) -> None:
+        """
+        Remove deleted Sentinel indicators.
+        :param sentinel_ids: List of Sentinel indicator ids
+        """
+        with self._lock:
+            self._connection.executemany(
+                "DELETE FROM indicators WHERE sentinel_id = ?",
+                [(sentinel_id,) for sentinel_id in sentinel_ids],
+            )
+            self._connection.commit()
@@ -204,3 +204,31 @@ def get_hash_value(data: dict) -> str | None:
         hash_type = FILE_HASH_TYPES_MAPPER[key]
         hash_value = data["hashes"].get(hash_type)
     return hash_value
+
+
+def get_indicator_key(data: dict) -> str:
+    """
+    Get the key identifying the Sentinel indicator of an observable (IOC type and value).
+    :param data: Observable data to get indicator key for
+    :return: Indicator key
+    """
+    if data["type"] == "file":
+        return f"file:{get_hash_type(data)}:{(get_hash_value(data) or '').lower()}"
+    if data["type"] == "email-addr":
+        return f"emailSenderAddress:{data.get('value')}"
+    return f"{get_ioc_type(data)}:{data.get('value')}"
+
+
+def get_sentinel_indicator_key(indicator: dict) -> str | None:
+    """
+    Get the key identifying a Sentinel indicator (IOC type and value).
+    :param indicator: Sentinel Threat Intelligence Indicator
+    :return: Indicator key if the indicator holds a supported IOC, None otherwise
+    """
+    if indicator.get("fileHashType"):
+        hash_value = (indicator.get("fileHashValue") or "").lower()
+        return f"file:{indicator['fileHashType'].lower()}:{hash_value}"
+    for ioc_type in ["emailSenderAddress", *set(IOC_TYPES.values())]:
+        if indicator.get(ioc_type):
+            return f"{ioc_type}:{indicator[ioc_type]}"
+    return None
@@ -1,12 +1,211 @@
 import json
 import os
+import queue
 import sys
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 import yaml
 from pycti import OpenCTIConnectorHelper, get_config_variable
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Status resources are polled until complete, for at most this number of seconds
+STATUS_POLL_INTERVAL = 2
+STATUS_POLL_TIMEOUT = 60
+
+
+class TaxiiPublisher:
+    """
+    Asynchronous batching publisher of STIX objects to a TAXII collection.
+
+    Objects are queued and grouped by a batching thread into a single request, when
+    the batch size is reached or when the batch window is elapsed. Requests are sent
+    by a pool of workers sharing one session, with a bounded number of requests in flight.
+    Pending status resources returned by the server are polled by a separate thread, and
+    objects reported as failed, or of a request which failed, are queued again, until the
+    maximum number of retries is reached.
+    """
+
+    def __init__(
+        self,
+        helper,
+        api_root,
+        collection_id,
+        session,
+        taxii_version,
+        stix_version,
+        batch_size,
+        batch_window,
+        max_in_flight,
+        max_retries,
+    ):
+        self.helper = helper
+        self.api_root = api_root
+        self.objects_url = api_root + "/collections/" + collection_id + "/objects/"
+        self.session = session
+        self.taxii_version = taxii_version
+        self.stix_version = stix_version
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        # Queued stream objects are bounded so the stream is slowed down when the server
+        # can't keep up, retried objects are not so workers never block on the queue
+        self.queue = queue.Queue()
+        self.capacity = threading.BoundedSemaphore(batch_size * max_in_flight * 2)
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        # Pending status resources, polled by a dedicated thread
+        self.statuses = queue.Queue()
+
+    def start(self):
+        threading.Thread(target=self._run_batcher, daemon=True).start()
+        threading.Thread(target=self._run_status_poller, daemon=True).start()
+
+    def publish(self, data_object):
+        self.capacity.acquire()
+        self.queue.put((data_object, 0))
+
+    def _get(self, timeout=None):
+        data_object, attempt = self.queue.get(timeout=timeout)
+        if attempt == 0:
+            self.capacity.release()
+        return data_object, attempt
+
+    def _run_batcher(self):
+        while True:
+            # Wait for the first object of the batch, then fill it until the window ends
+            batch = {}
+            data_object, attempt = self._get()
+            batch[data_object["id"]] = (data_object, attempt)
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    data_object, attempt = self._get(timeout=timeout)
+                except queue.Empty:
+                    break
+                # Only the latest version of an object is sent
+                batch[data_object["id"]] = (data_object, attempt)
+            self.in_flight.acquire()
+            future = self.executor.submit(self._send_batch, list(batch.values()))
+            future.add_done_callback(lambda _: self.in_flight.release())
+
+    def _build_payload(self, objects):
+        if self.taxii_version == "2.0":
+            return {
+                "type": "bundle",
+                "spec_version": self.stix_version,
+                "id": "bundle--" + str(uuid.uuid4()),
+                "objects": objects,
+            }
+        # TAXII 2.1 "add objects" envelope
+        return {"objects": objects}
+
+    def _send_batch(self, batch):
+        objects = [data_object for data_object, _ in batch]
+        self.helper.log_info(
+            "Posting "
+            + str(len(objects))
+            + " objects to TAXII URL: "
+            + self.objects_url
+        )
+        try:
+            response = self.session.post(
+                self.objects_url, json=self._build_payload(objects)
+            )
+            response.raise_for_status()
+            status = response.json() if response.content else {}
+        except Exception as e:
+            self.helper.log_error(
+                "Failed posting " + str(len(batch)) + " objects: " + str(e)
+            )
+            self._retry_objects(batch, str(e))
+            return
+        if status.get("status") == "pending":
+            # The status is polled by the poller thread, so the request slot is released
+            self.statuses.put(
+                (
+                    time.monotonic() + STATUS_POLL_INTERVAL,
+                    time.monotonic() + STATUS_POLL_TIMEOUT,
+                    batch,
+                    status,
+                )
+            )
+        else:
+            self._handle_status(batch, status)
+
+    def _run_status_poller(self):
+        # Pending statuses as (next poll time, poll deadline, batch, status)
+        polling = []
+        while True:
+            timeout = None
+            if polling:
+                timeout = max(min(item[0] for item in polling) - time.monotonic(), 0)
+            try:
+                polling.append(self.statuses.get(timeout=timeout))
+                continue
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            due = [item for item in polling if item[0] <= now]
+            polling = [item for item in polling if item[0] > now]
+            for _, poll_deadline, batch, status in due:
+                try:
+                    response = self.session.get(
+                        self.api_root + "/status/" + status["id"] + "/"
+                    )
+                    response.raise_for_status()
+                    status = response.json()
+                except Exception as e:
+                    self.helper.log_error(
+                        "Failed polling TAXII Status " + status["id"] + ": " + str(e)
+                    )
+                if status.get("status") == "pending" and now < poll_deadline:
+                    polling.append(
+                        (now + STATUS_POLL_INTERVAL, poll_deadline, batch, status)
+                    )
+                else:
+                    self._handle_status(batch, status)
+
+    def _handle_status(self, batch, status):
+        if status.get("status") == "pending":
+            self.helper.log_warning(
+                "TAXII Status " + str(status.get("id")) + " still pending"
+            )
+        objects_by_id = {
+            data_object["id"]: (data_object, attempt) for data_object, attempt in batch
+        }
+        for failure in status.get("failures") or []:
+            failed = objects_by_id.get(failure.get("id"))
+            if failed is not None:
+                self._retry_objects([failed], str(failure.get("message")))
+        self.helper.log_info(
+            "TAXII Status: "
+            + str(status.get("success_count", 0))
+            + " succeeded, "
+            + str(status.get("failure_count", 0))
+            + " failed, "
+            + str(status.get("pending_count", 0))
+            + " pending"
+        )
+
+    def _retry_objects(self, objects, reason):
+        for data_object, attempt in objects:
+            if attempt < self.max_retries:
+                self.queue.put((data_object, attempt + 1))
+            else:
+                self.helper.log_error(
+                    "TAXII Server rejected the object "
+                    + data_object["id"]
+                    + ": "
+                    + reason
+                )
 
 
 class TaxiiPostConnector:
@@ -49,80 +248,107 @@ class TaxiiPostConnector:
         self.taxii_stix_version = get_config_variable(
             "TAXII_STIX_VERSION", ["taxii", "stix_version"], config
         )
+        self.taxii_batch_size = get_config_variable(
+            "TAXII_BATCH_SIZE", ["taxii", "batch_size"], config, True, 100
+        )
+        self.taxii_batch_window = get_config_variable(
+            "TAXII_BATCH_WINDOW", ["taxii", "batch_window"], config, True, 2
+        )
+        self.taxii_max_in_flight = get_config_variable(
+            "TAXII_MAX_IN_FLIGHT", ["taxii", "max_in_flight"], config, True, 4
+        )
+        self.taxii_max_retries = get_config_variable(
+            "TAXII_MAX_RETRIES", ["taxii", "max_retries"], config, True, 3
+        )
+        self.publisher = TaxiiPublisher(
+            self.helper,
+            self.taxii_url + "/root",
+            self.taxii_collection_id,
+            self._build_session(),
+            self.taxii_version,
+            self.taxii_stix_version,
+            self.taxii_batch_size,
+            self.taxii_batch_window,
+            self.taxii_max_in_flight,
+            self.taxii_max_retries,
+        )
+
+    def _build_session(self):
+        session = requests.Session()
+        # Requests rejected because of throttling or server errors are retried
+        retry_strategy = Retry(
+            total=5,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=None,
+        )
+        session.mount(
+            "https://",
+            HTTPAdapter(
+                max_retries=retry_strategy, pool_maxsize=self.taxii_max_in_flight
+            ),
+        )
+        session.mount(
+            "http://",
+            HTTPAdapter(
+                max_retries=retry_strategy, pool_maxsize=self.taxii_max_in_flight
+            ),
+        )
+        session.verify = self.taxii_ssl_verify
+        if self.taxii_version == "2.0":
+            content_type = (
+                "application/vnd.oasis.stix+json; version=" + self.taxii_stix_version
+            )
+            accept = "application/vnd.oasis.taxii+json; version=" + self.taxii_version
+        else:
+            content_type = "application/taxii+json;version=" + self.taxii_version
+            accept = "application/taxii+json;version=" + self.taxii_version
+        session.headers.update({"Content-Type": content_type, "Accept": accept})
+        if self.taxii_token is not None:
+            self.helper.log_info("Posting to TAXII URL (using token)")
+            session.headers["Authorization"] = "Bearer " + self.taxii_token
+        else:
+            self.helper.log_info("Posting to TAXII URL (using basic auth)")
+            session.auth = (self.taxii_login, self.taxii_password)
+        return session
+
+    def _prepare_object(self, data_object):
+        data_object["spec_version"] = self.taxii_stix_version
+        if "object_marking_refs" in data_object:
+            del data_object["object_marking_refs"]
+        if "created_by_ref" in data_object:
+            del data_object["created_by_ref"]
+        if self.taxii_stix_version != "2.1":
+            del data_object["extensions"]
+            if "spec_version" in data_object:
+                del data_object["spec_version"]
+            if "revoked" in data_object:
+                del data_object["revoked"]
+            if "confidence" in data_object:
+                del data_object["confidence"]
+            if "lang" in data_object:
+                del data_object["lang"]
+            if "pattern_type" in data_object:
+                del data_object["pattern_type"]
+            if "pattern_version" in data_object:
+                del data_object["pattern_version"]
+            if "is_family" in data_object:
+                del data_object["is_family"]
+        return data_object
 
     def _process_message(self, msg):
         try:
             data = json.loads(msg.data)["data"]
         except:
             raise ValueError("Cannot process the message")
-        self.helper.log_info("Processing the object " + data["id"])
-        url = (
-            self.taxii_url
-            + "/root/collections/"
-            + self.taxii_collection_id
-            + "/objects/"
-        )
-        headers = {
-            "Content-Type": "application/vnd.oasis.stix+json; version="
-            + self.taxii_stix_version,
-            "Accept": "application/vnd.oasis.taxii+json; version=" + self.taxii_version,
-        }
+        self.helper.log_debug("Processing the object " + data["id"])
         try:
-            data_object = data
-            data_object["spec_version"] = self.taxii_stix_version
-            if "object_marking_refs" in data_object:
-                del data_object["object_marking_refs"]
-            if "created_by_ref" in data_object:
-                del data_object["created_by_ref"]
-            if self.taxii_stix_version != "2.1":
-                del data_object["extensions"]
-                if "spec_version" in data_object:
-                    del data_object["spec_version"]
-                if "revoked" in data_object:
-                    del data_object["revoked"]
-                if "confidence" in data_object:
-                    del data_object["confidence"]
-                if "lang" in data_object:
-                    del data_object["lang"]
-                if "pattern_type" in data_object:
-                    del data_object["pattern_type"]
-                if "pattern_version" in data_object:
-                    del data_object["pattern_version"]
-                if "is_family" in data_object:
-                    del data_object["is_family"]
-            bundle = {
-                "type": "bundle",
-                "spec_version": self.taxii_stix_version,
-                "id": "bundle--" + str(uuid.uuid4()),
-                "objects": [data_object],
-            }
-            if self.taxii_token is not None:
-                self.helper.log_info("Posting to TAXII URL (using token): " + url)
-                self.helper.log_info(str(bundle))
-                headers["Authorization"] = "Bearer " + self.taxii_token
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    json=bundle,
-                    verify=self.taxii_ssl_verify,
-                )
-                response.raise_for_status()
-            else:
-                self.helper.log_info("Posting to TAXII URL (using basic auth): " + url)
-                self.helper.log_info(str(bundle))
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    auth=(self.taxii_login, self.taxii_password),
-                    json=bundle,
-                    verify=self.taxii_ssl_verify,
-                )
-                response.raise_for_status()
-            self.helper.log_info("TAXII Response: " + str(response.content))
+            self.publisher.publish(self._prepare_object(data))
         except Exception as e:
             self.helper.log_error(str(e))
 
     def start(self):
+        self.publisher.start()
         self.helper.listen_stream(self._process_message)
 
 
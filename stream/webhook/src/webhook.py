@@ -5,16 +5,27 @@
 import json
 import os
 import re
+import sqlite3
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from queue import Queue
+from queue import Empty, Queue
 from typing import Literal, Optional
 
 import requests
 import yaml
-from prometheus_client import Counter, Gauge, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
 from pycti import OpenCTIConnectorHelper, get_config_variable
 from pydantic import BaseModel, HttpUrl
+from requests.adapters import HTTPAdapter
+
+# seconds a consumer waits for more events to fill an NDJSON batch
+BATCH_WINDOW = 1
+# seconds between two checks of the retry queue
+RETRY_POLL_INTERVAL = 5
+# maximum delay between two delivery attempts, in seconds
+RETRY_MAX_BACKOFF = 3600
 
 
 class WebhookReference(BaseModel):
@@ -24,6 +35,8 @@ class WebhookReference(BaseModel):
     header: Optional[str]
     token: Optional[str]
     dest_type: Literal["URL"] = "URL"
+    timeout: int = 30
+    pool_size: int = 10
 
     def model_post_init(self, ctx):
         self._headers = {
@@ -34,8 +47,34 @@ class WebhookReference(BaseModel):
         if self.dest_type == "URL" and self.auth_type == "TOKEN":
             self._headers[self.header] = self.token
 
+        # a single session is shared by the consumers so connections are reused
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.url.host}{self.url.path or ''}"
+
     def send_event(self, payload):
-        requests.post(self.url, headers=self._headers, data=payload.encode("utf-8"))
+        response = self._session.post(
+            str(self.url),
+            headers=self._headers,
+            data=payload.encode("utf-8"),
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+    def send_events(self, payloads: list[str]):
+        """Send several events in a single request, as newline delimited JSON."""
+        response = self._session.post(
+            str(self.url),
+            headers=self._headers | {"Content-Type": "application/x-ndjson"},
+            data="\n".join(payloads).encode("utf-8"),
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
 
     def init(self) -> bool:
         return True
@@ -58,10 +97,31 @@ class Metrics:
         self._current_state_gauge = Gauge(
             "current_state", "Current connector state", ["name"]
         )
+        self._delivery_latency_histogram = Histogram(
+            "delivery_latency_seconds",
+            "Latency of the requests sent to the webhook endpoint",
+            ["name", "endpoint"],
+        )
+        self._failed_deliveries_counter = Counter(
+            "failed_deliveries",
+            "Number of requests to the webhook endpoint that failed",
+            ["name", "endpoint"],
+        )
+        self._retry_queue_gauge = Gauge(
+            "retry_queue_size", "Number of deliveries waiting for a retry", ["name"]
+        )
 
     def msg(self, action: str):
         self._processed_messages_counter.labels(self.name, action).inc()
 
+    def delivery(self, endpoint: str, duration: float, success: bool):
+        self._delivery_latency_histogram.labels(self.name, endpoint).observe(duration)
+        if not success:
+            self._failed_deliveries_counter.labels(self.name, endpoint).inc()
+
+    def retry_queue_size(self, size: int):
+        self._retry_queue_gauge.labels(self.name).set(size)
+
     def state(self, event_id: str):
         """Set current state metric from an event id.
 
@@ -75,6 +135,68 @@ class Metrics:
         start_http_server(self.port, addr=self.addr)
 
 
+class RetryQueue:
+    """Disk backed queue of failed deliveries.
+
+    Each entry holds the payloads of a failed request, they are sent again with an
+    exponential backoff until the maximum number of attempts is reached."""
+
+    def __init__(self, path: str, backoff: int, max_attempts: int) -> None:
+        self.backoff = backoff
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS deliveries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payloads TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                next_attempt_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def _delay(self, attempts: int) -> float:
+        return min(self.backoff * 2 ** (attempts - 1), RETRY_MAX_BACKOFF)
+
+    def push(self, payloads: list[str], attempts: int = 1) -> bool:
+        """Schedule a new attempt, returns False once the attempts are exhausted."""
+        if attempts >= self.max_attempts:
+            return False
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO deliveries (payloads, attempts, next_attempt_at) "
+                "VALUES (?, ?, ?)",
+                (json.dumps(payloads), attempts, time.time() + self._delay(attempts)),
+            )
+            self._connection.commit()
+        return True
+
+    def pop_due(self, limit: int = 100) -> list[tuple[list[str], int]]:
+        """Remove and return the deliveries to attempt again now."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, payloads, attempts FROM deliveries "
+                "WHERE next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+            self._connection.executemany(
+                "DELETE FROM deliveries WHERE id = ?", [(row[0],) for row in rows]
+            )
+            self._connection.commit()
+        return [(json.loads(payloads), attempts) for _, payloads, attempts in rows]
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM deliveries"
+            ).fetchone()[0]
+
+
 class WebhookConnector:
     def __init__(
         self,
@@ -82,6 +204,8 @@ class WebhookConnector:
         webhook_reference: WebhookReference,
         queue: Queue,
         consumer_count: int,
+        retry_queue: RetryQueue,
+        batch_size: int = 1,
         metrics: Metrics | None = None,
     ) -> None:
         self.queue = queue
@@ -89,6 +213,8 @@ class WebhookConnector:
         self.metrics = metrics
         self.webhook_reference = webhook_reference
         self.consumer_count = consumer_count
+        self.retry_queue = retry_queue
+        self.batch_size = batch_size
 
     def is_filtered(self, data: dict):
         return "type" in data and data["type"] in self.ignore_types
@@ -101,10 +227,61 @@ class WebhookConnector:
 
     def start_consumers(self):
         self.helper.log_info(f"starting {self.consumer_count} consumer threads")
-        with ThreadPoolExecutor() as executor:
+        with ThreadPoolExecutor(max_workers=self.consumer_count + 1) as executor:
+            executor.submit(self.retry)
             for _ in range(self.consumer_count):
                 executor.submit(self.consume)
 
+    def deliver(self, payloads: list[str], attempts: int = 0) -> bool:
+        """Send payloads to the webhook, failed deliveries are put in the retry queue."""
+        start = time.monotonic()
+        try:
+            if self.batch_size > 1:
+                self.webhook_reference.send_events(payloads)
+            else:
+                self.webhook_reference.send_event(payloads[0])
+            success = True
+        except requests.exceptions.RequestException as e:
+            self.helper.log_warning(f"delivery failed (attempt {attempts + 1}): {e}")
+            success = False
+            if not self.retry_queue.push(payloads, attempts + 1):
+                self.helper.log_error(
+                    f"dropping {len(payloads)} events after {attempts + 1} attempts"
+                )
+
+        if self.metrics is not None:
+            self.metrics.delivery(
+                self.webhook_reference.endpoint, time.monotonic() - start, success
+            )
+            self.metrics.retry_queue_size(self.retry_queue.size())
+        return success
+
+    def retry(self):
+        try:
+            while True:
+                due = self.retry_queue.pop_due()
+                for payloads, attempts in due:
+                    self.deliver(payloads, attempts)
+                if not due:
+                    time.sleep(RETRY_POLL_INTERVAL)
+        except Exception as e:
+            self.helper.log_error("an error occurred while retrying deliveries")
+            self.helper.log_error(e)
+            os._exit(1)  # exit the current process, killing all threads
+
+    def get_batch(self) -> list:
+        msgs = [self.queue.get()]
+        deadline = time.monotonic() + BATCH_WINDOW
+        while len(msgs) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                msgs.append(self.queue.get(timeout=timeout))
+            except Empty:
+                break
+        return msgs
+
     def consume(self):
         # ensure the process stop when there is an issue while
         # processing message
@@ -118,16 +295,18 @@ class WebhookConnector:
     def _consume(self):
         while True:
 
-            msg = self.queue.get()
-            payload = json.loads(msg.data)["data"]
-            id = OpenCTIConnectorHelper.get_attribute_in_extension("id", payload)
-            self.helper.log_debug(f"processing message with id {id}")
-            self.webhook_reference.send_event(msg.data)
-            self.helper.log_info("messange sent")
+            msgs = self.get_batch()
+            for msg in msgs:
+                payload = json.loads(msg.data)["data"]
+                id = OpenCTIConnectorHelper.get_attribute_in_extension("id", payload)
+                self.helper.log_debug(f"processing message with id {id}")
+            if self.deliver([msg.data for msg in msgs]):
+                self.helper.log_info(f"{len(msgs)} messages sent")
 
             if self.metrics is not None:
-                self.metrics.msg(msg.event)
-                self.metrics.state(msg.id)
+                for msg in msgs:
+                    self.metrics.msg(msg.event)
+                self.metrics.state(msgs[-1].id)
 
     def start(self):
         helper.log_info("register_producer")
@@ -178,6 +357,37 @@ if __name__ == "__main__":
         "WEBHOOK_AUTH_TYPE", ["webhook", "auth_type"], config
     )
 
+    webhook_timeout: int = get_config_variable(
+        "WEBHOOK_TIMEOUT", ["webhook", "timeout"], config, isNumber=True, default=30
+    )
+    webhook_batch_size: int = get_config_variable(
+        "WEBHOOK_BATCH_SIZE",
+        ["webhook", "batch_size"],
+        config,
+        isNumber=True,
+        default=1,
+    )
+    webhook_retry_queue_path: str = get_config_variable(
+        "WEBHOOK_RETRY_QUEUE_PATH",
+        ["webhook", "retry_queue_path"],
+        config,
+        default="/data/webhook_retry_queue.db",
+    )
+    webhook_retry_backoff: int = get_config_variable(
+        "WEBHOOK_RETRY_BACKOFF",
+        ["webhook", "retry_backoff"],
+        config,
+        isNumber=True,
+        default=10,
+    )
+    webhook_retry_max_attempts: int = get_config_variable(
+        "WEBHOOK_RETRY_MAX_ATTEMPTS",
+        ["webhook", "retry_max_attempts"],
+        config,
+        isNumber=True,
+        default=10,
+    )
+
     # additional connector conf
     consumer_count: int = get_config_variable(
         "CONNECTOR_CONSUMER_COUNT",
@@ -206,10 +416,15 @@ if __name__ == "__main__":
         auth_type=webhook_auth_type,
         token=webhook_token,
         dest_type=webhook_type,
+        timeout=webhook_timeout,
+        pool_size=consumer_count + 1,
     )
 
-    # create queue
-    queue = Queue(maxsize=2 * consumer_count)
+    # create queues
+    queue = Queue(maxsize=2 * consumer_count * webhook_batch_size)
+    retry_queue = RetryQueue(
+        webhook_retry_queue_path, webhook_retry_backoff, webhook_retry_max_attempts
+    )
 
     # create prom metrics
     if enable_prom_metrics:
@@ -225,5 +440,7 @@ if __name__ == "__main__":
         webhook_reference=webhook_reference,
         queue=queue,
         consumer_count=consumer_count,
+        retry_queue=retry_queue,
+        batch_size=webhook_batch_size,
         metrics=metrics,
     ).start()